@@ -0,0 +1,297 @@
+"""
+Benchmark del pipeline de ventaneo y características
+
+Mide por separado cada etapa (preparación, ventaneo, validación, remuestreo,
+características e inferencia) sobre streams sintéticos de varios tamaños y
+guarda los resultados en JSON para compararlos con una línea base.
+
+Uso (desde har-backend/app):
+    python -m benchmarks.pipeline_benchmark --minutes 5,30 --output resultados.json
+    python -m benchmarks.pipeline_benchmark --baseline benchmarks/baseline.json --max-slowdown 1.25
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import polars as pl
+
+from benchmarks.synthetic import generate_accelerometer_streams
+from logic.features import extract_features_batch
+from logic.kernels import KERNEL_BACKENDS
+from logic.multimodal import (
+    create_multimodal_windows_robust, prepare_sensor_dataframe, prepare_sensor_dataframe_polars,
+    resample_window_robust, split_sensor_groups, validate_window_data
+)
+from logic.resampling import resample_windows_batch
+from logic.window_features_multimodal import create_multimodal_windows_bulk
+from logic.windowing import compute_window_bounds, validate_windows_batch
+
+
+# Mismos parámetros de ventaneo que el servicio de inferencia
+WINDOW_PARAMS = {
+    'window_seconds': 5,
+    'overlap_percent': 50,
+    'sampling_rate': 20,
+    'target_timesteps': 100,
+    'min_data_threshold': 0.8,
+    'max_gap_seconds': 1.0,
+}
+
+
+def time_best(fn, repeat):
+    """Mejor tiempo de pared de `repeat` ejecuciones y el resultado de la última"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _entry(seconds, items, unit):
+    return {
+        'seconds': seconds,
+        'items': int(items),
+        'unit': unit,
+        'per_second': items / seconds if seconds > 0 else float('inf'),
+    }
+
+
+def _reference_windows(df_prepared, n_windows):
+    """Primeras `n_windows` ventanas del pipeline como slices para las funciones por ventana"""
+    window_duration_ns = int(WINDOW_PARAMS['window_seconds'] * 1e9)
+    step_duration_ns = int(window_duration_ns * (100 - WINDOW_PARAMS['overlap_percent']) / 100)
+
+    samples = []
+    for times_ns, values in split_sensor_groups(df_prepared).values():
+        if len(times_ns) == 0:
+            continue
+        _, lo, hi = compute_window_bounds(
+            times_ns, times_ns[0], times_ns[-1], window_duration_ns, step_duration_ns
+        )
+        for start, end in zip(lo, hi):
+            samples.append((times_ns, values, start, end))
+            if len(samples) == n_windows:
+                return samples
+    return samples
+
+
+def benchmark_size(minutes, args):
+    """Todas las etapas sobre un dataset de `minutes` por usuario"""
+    df = generate_accelerometer_streams(
+        minutes=minutes, users=args.users, gap_rate=args.gap_rate,
+        nan_rate=args.nan_rate, seed=args.seed
+    )
+    n_samples = len(df)
+    results = {}
+
+    seconds, df_prepared = time_best(lambda: prepare_sensor_dataframe_polars(df, 'accel'), args.repeat)
+    results['prepare_sensor_dataframe_polars'] = _entry(seconds, n_samples, 'muestras')
+
+    seconds, _ = time_best(lambda: prepare_sensor_dataframe(df, 'accel'), args.repeat)
+    results['prepare_sensor_dataframe'] = _entry(seconds, n_samples, 'muestras')
+
+    # Ventaneo completo por grupos, con el desglose por etapa del WindowingReport
+    seconds, windowed = time_best(
+        lambda: create_multimodal_windows_robust(
+            df, **WINDOW_PARAMS, engine='polars', return_report=True
+        ),
+        args.repeat
+    )
+    X, report = windowed[0], windowed[4]
+    results['windowing'] = _entry(seconds, report.windows_attempted, 'ventanas')
+    for stage, stage_seconds in report.stage_seconds.items():
+        results[f'windowing.{stage}'] = _entry(stage_seconds, report.windows_attempted, 'ventanas')
+
+    seconds, _ = time_best(
+        lambda: create_multimodal_windows_bulk(df, **WINDOW_PARAMS),
+        args.repeat
+    )
+    results['windowing_bulk'] = _entry(seconds, report.windows_attempted, 'ventanas')
+
+    # Funciones por ventana de referencia frente a sus versiones en bloque
+    samples = _reference_windows(df_prepared, args.reference_windows)
+    slices = [
+        pl.DataFrame({
+            'Timestamp': pl.Series(times_ns[start:end]).cast(pl.Datetime('ns')),
+            'X': values[start:end, 0], 'Y': values[start:end, 1], 'Z': values[start:end, 2],
+        }).to_pandas()
+        for times_ns, values, start, end in samples
+    ]
+
+    seconds, _ = time_best(
+        lambda: [
+            validate_window_data(
+                window, WINDOW_PARAMS['window_seconds'], WINDOW_PARAMS['sampling_rate'],
+                WINDOW_PARAMS['min_data_threshold'], WINDOW_PARAMS['max_gap_seconds']
+            )
+            for window in slices
+        ],
+        args.repeat
+    )
+    results['validate_window_data'] = _entry(seconds, len(slices), 'ventanas')
+
+    seconds, _ = time_best(
+        lambda: [
+            resample_window_robust(
+                values[start:end], times_ns[start:end],
+                WINDOW_PARAMS['target_timesteps'], WINDOW_PARAMS['window_seconds']
+            )
+            for times_ns, values, start, end in samples if end > start
+        ],
+        args.repeat
+    )
+    results['resample_window_robust'] = _entry(seconds, len(samples), 'ventanas')
+
+    if samples:
+        times_ns, values = samples[0][0], samples[0][1]
+        same_series = [s for s in samples if s[0] is times_ns]
+        lo = np.array([s[2] for s in same_series])
+        hi = np.array([s[3] for s in same_series])
+
+        seconds, _ = time_best(
+            lambda: validate_windows_batch(
+                times_ns, values, lo, hi, WINDOW_PARAMS['window_seconds'],
+                WINDOW_PARAMS['sampling_rate'], WINDOW_PARAMS['min_data_threshold'],
+                WINDOW_PARAMS['max_gap_seconds']
+            ),
+            args.repeat
+        )
+        results['validate_windows_batch'] = _entry(seconds, len(lo), 'ventanas')
+
+        seconds, _ = time_best(
+            lambda: resample_windows_batch(values, times_ns, lo, hi, WINDOW_PARAMS['target_timesteps']),
+            args.repeat
+        )
+        results['resample_windows_batch'] = _entry(seconds, len(lo), 'ventanas')
+
+    seconds, _ = time_best(lambda: extract_features_batch(X, WINDOW_PARAMS['sampling_rate']), args.repeat)
+    results['extract_features_batch'] = _entry(seconds, len(X), 'ventanas')
+
+    inference = benchmark_inference(X, args)
+    if inference is not None:
+        results['inference'] = inference
+
+    return {'samples': n_samples, 'windows': int(len(X)), 'stages': results}
+
+
+def benchmark_inference(X, args):
+    """Inferencia del SavedModel sobre las ventanas; None si no hay TensorFlow o modelo"""
+    if not args.model:
+        print("  ⏭️  Inferencia omitida: sin --model ni MODEL_PATH")
+        return None
+    try:
+        import tensorflow as tf
+        infer = tf.saved_model.load(args.model).signatures['serving_default']
+    except Exception as e:
+        print(f"  ⏭️  Inferencia omitida: {e}")
+        return None
+
+    X_tensor = tf.convert_to_tensor(X)
+    infer(X_tensor[:1])  # Calentamiento: trazado de la función
+    seconds, _ = time_best(lambda: infer(X_tensor), args.repeat)
+    return _entry(seconds, len(X), 'ventanas')
+
+
+def compare_with_baseline(current, baseline, max_slowdown=None):
+    """
+    Imprime la relación actual/base por tamaño y etapa
+
+    Returns:
+        Lista de (tamaño, etapa, relación) que superan `max_slowdown`
+    """
+    regressions = []
+    print(f"\n{'tamaño':>8} {'etapa':<40} {'base (s)':>10} {'actual (s)':>10} {'relación':>9}")
+    for size, result in current['results'].items():
+        base_result = baseline.get('results', {}).get(size)
+        if base_result is None:
+            continue
+        for stage, entry in result['stages'].items():
+            base_entry = base_result['stages'].get(stage)
+            if base_entry is None or base_entry['seconds'] <= 0:
+                continue
+            ratio = entry['seconds'] / base_entry['seconds']
+            flag = ''
+            if max_slowdown is not None and ratio > max_slowdown:
+                regressions.append((size, stage, ratio))
+                flag = ' ⚠️'
+            print(f"{size:>8} {stage:<40} {base_entry['seconds']:>10.4f} "
+                  f"{entry['seconds']:>10.4f} {ratio:>8.2f}x{flag}")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline de ventaneo y características")
+    parser.add_argument('--minutes', default='5,30',
+                        help="Tamaños a medir: minutos por usuario separados por comas")
+    parser.add_argument('--users', type=int, default=4)
+    parser.add_argument('--gap-rate', type=float, default=0.0005)
+    parser.add_argument('--nan-rate', type=float, default=0.0005)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help="Se guarda el mejor de N tiempos")
+    parser.add_argument('--reference-windows', type=int, default=200,
+                        help="Ventanas para las funciones por ventana de referencia")
+    parser.add_argument('--model', default=os.getenv('MODEL_PATH'),
+                        help="SavedModel para medir la inferencia (por defecto MODEL_PATH)")
+    parser.add_argument('--output', help="Ruta del JSON de resultados")
+    parser.add_argument('--baseline', help="JSON de una ejecución anterior con el que comparar")
+    parser.add_argument('--max-slowdown', type=float,
+                        help="Relación actual/base a partir de la cual se falla (p. ej. 1.25)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sizes = [float(m) for m in args.minutes.split(',')]
+
+    current = {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'polars': pl.__version__,
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'kernel_backends': KERNEL_BACKENDS,
+        },
+        'params': {
+            'users': args.users, 'gap_rate': args.gap_rate, 'nan_rate': args.nan_rate,
+            'seed': args.seed, 'repeat': args.repeat, 'window_params': WINDOW_PARAMS,
+        },
+        'results': {},
+    }
+
+    # Calentamiento: imports perezosos, cachés y compilación de kernels fuera de la medida
+    benchmark_size(0.5, argparse.Namespace(**{**vars(args), 'repeat': 1, 'model': None}))
+
+    for minutes in sizes:
+        size = f"{minutes:g}min"
+        print(f"📏 {size} x {args.users} usuarios...")
+        current['results'][size] = benchmark_size(minutes, args)
+        for stage, entry in current['results'][size]['stages'].items():
+            print(f"  {stage:<40} {entry['seconds']:>9.4f}s  {entry['per_second']:>12,.0f} {entry['unit']}/s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f"\n💾 Resultados guardados en {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(current, baseline, args.max_slowdown)
+        if regressions:
+            print(f"\n❌ {len(regressions)} etapas más lentas que {args.max_slowdown}x la línea base")
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Benchmark de arranque en frío del servicio de inferencia
+
+Lanza procesos nuevos que importan la app (run.py) y mide, desde el lanzamiento:
+cuándo existe la app Flask (el worker ya puede escuchar), cuándo está listo
+(imports pesados + carga y calentamiento del modelo) y la memoria máxima.
+Guarda los resultados etiquetados con la versión para seguirlos entre releases.
+
+Uso (desde har-backend/app, con MODEL_PATH o MODEL_REGISTRY_DIR configurados):
+    python -m benchmarks.startup_benchmark --repeat 3 --output arranque.json
+    python -m benchmarks.startup_benchmark --baseline arranque_anterior.json --max-slowdown 1.25
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from benchmarks.pipeline_benchmark import compare_with_baseline
+
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Proceso hijo: marcas de tiempo de pared para compararlas con el lanzamiento
+_CHILD = r"""
+import json, resource, sys, time
+import run
+app_created_at = time.time()
+from services.model_loader import model_loader
+model_loader.wait(float(sys.argv[1]))
+print(json.dumps({
+    'app_created_at': app_created_at,
+    'ready_at': time.time(),
+    'state': model_loader.state(),
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+"""
+
+
+def _release_label():
+    try:
+        return subprocess.run(
+            ['git', 'describe', '--always', '--dirty'], cwd=APP_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure_cold_start(timeout):
+    """Un arranque en un proceso nuevo; None si no llega a estar listo"""
+    launched_at = time.time()
+    completed = subprocess.run(
+        [sys.executable, '-c', _CHILD, str(timeout)],
+        cwd=APP_DIR, capture_output=True, text=True, timeout=timeout + 60
+    )
+    lines = completed.stdout.strip().splitlines()
+    if completed.returncode != 0 or not lines:
+        print(f"  ❌ El proceso terminó con código {completed.returncode}: {completed.stderr.strip()[-500:]}")
+        return None
+
+    child = json.loads(lines[-1])
+    if child['state']['status'] != 'ready':
+        print(f"  ❌ Servicio no listo: {child['state']}")
+        return None
+
+    timings = child['state']['timings']
+    return {
+        'app_created': child['app_created_at'] - launched_at,
+        'ready': child['ready_at'] - launched_at,
+        'heavy_imports': timings['import_seconds'],
+        'model_load': timings['model_load_seconds'],
+        'max_rss_mb': child['max_rss_mb'],
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de arranque en frío del servicio")
+    parser.add_argument('--repeat', type=int, default=3, help="Se guarda el mejor de N arranques")
+    parser.add_argument('--timeout', type=float, default=300, help="Segundos máximos hasta estar listo")
+    parser.add_argument('--release', default=_release_label(), help="Etiqueta de la versión medida")
+    parser.add_argument('--output', help="Ruta del JSON de resultados")
+    parser.add_argument('--baseline', help="JSON de una ejecución anterior con el que comparar")
+    parser.add_argument('--max-slowdown', type=float,
+                        help="Relación actual/base a partir de la cual se falla (p. ej. 1.25)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    runs = []
+    for i in range(args.repeat):
+        print(f"🚀 Arranque {i + 1}/{args.repeat}...")
+        result = measure_cold_start(args.timeout)
+        if result is None:
+            return 1
+        runs.append(result)
+        print(f"  app {result['app_created']:.2f}s, listo {result['ready']:.2f}s, "
+              f"RSS máx {result['max_rss_mb']:.0f} MB")
+
+    best = {stage: min(run[stage] for run in runs) for stage in runs[0] if stage != 'max_rss_mb'}
+    current = {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'release': args.release,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'inference_backend': os.getenv('INFERENCE_BACKEND', 'savedmodel'),
+        },
+        'params': {'repeat': args.repeat},
+        # Misma forma que pipeline_benchmark para reutilizar la comparación
+        'results': {
+            'cold_start': {
+                'max_rss_mb': max(run['max_rss_mb'] for run in runs),
+                'stages': {stage: {'seconds': seconds} for stage, seconds in best.items()},
+            }
+        },
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f"\n💾 Resultados guardados en {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(current, baseline, args.max_slowdown)
+        if regressions:
+            print(f"\n❌ {len(regressions)} etapas más lentas que {args.max_slowdown}x la línea base")
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+import numpy as np
+import polars as pl
+
+
+# Actividades simuladas: (nombre, frecuencia dominante en Hz, amplitud en m/s²)
+SYNTHETIC_ACTIVITIES = (
+    ('Sit', 0.2, 0.3),
+    ('Walk', 1.8, 4.0),
+    ('Type', 4.0, 0.8),
+    ('Workouts', 2.5, 8.0),
+)
+
+
+def generate_accelerometer_streams(minutes=10, users=4, sampling_rate=20, gap_rate=0.0005,
+                                   nan_rate=0.0005, segment_minutes=2, seed=0,
+                                   start_ns=1_700_000_000_000_000_000):
+    """
+    Genera streams sintéticos de acelerómetro con la forma de los datos reales
+
+    Cada usuario recorre segmentos de actividad de `segment_minutes` con una
+    señal periódica + ruido + gravedad en Z; el intervalo entre muestras tiene
+    jitter y, con probabilidad `gap_rate` por muestra, un hueco de 1 a 5 s.
+
+    Args:
+        minutes: Duración por usuario en minutos
+        users: Número de usuarios
+        sampling_rate: Frecuencia nominal en Hz
+        gap_rate: Probabilidad por muestra de un hueco de conexión
+        nan_rate: Probabilidad por valor de una lectura NaN
+        segment_minutes: Duración de cada segmento de actividad
+        seed: Semilla del generador (mismos parámetros -> mismos datos)
+        start_ns: Epoch-ns de la primera muestra
+
+    Returns:
+        DataFrame Polars con Subject-id, Timestamp (Datetime ns),
+        Activity Label, X, Y, Z ordenado como lo deja la preparación
+    """
+    rng = np.random.default_rng(seed)
+    n_samples = int(minutes * 60 * sampling_rate)
+    period_ns = 1e9 / sampling_rate
+    frames = []
+
+    for user in range(users):
+        deltas = rng.normal(period_ns, period_ns * 0.05, n_samples).clip(period_ns * 0.5)
+        gaps = rng.random(n_samples) < gap_rate
+        deltas[gaps] += rng.uniform(1e9, 5e9, gaps.sum())
+        times_ns = start_ns + np.cumsum(deltas).astype(np.int64)
+
+        elapsed_s = (times_ns - times_ns[0]) / 1e9
+        segment = (elapsed_s // (segment_minutes * 60)).astype(np.int64)
+        activity_idx = (segment + user) % len(SYNTHETIC_ACTIVITIES)
+
+        freqs = np.array([a[1] for a in SYNTHETIC_ACTIVITIES])[activity_idx]
+        amplitudes = np.array([a[2] for a in SYNTHETIC_ACTIVITIES])[activity_idx]
+        phase = 2 * np.pi * freqs * elapsed_s
+
+        values = np.column_stack([
+            amplitudes * np.sin(phase),
+            amplitudes * 0.5 * np.cos(phase),
+            9.81 + amplitudes * 0.3 * np.sin(2 * phase),
+        ]) + rng.normal(0, 0.2, (n_samples, 3))
+        values[rng.random((n_samples, 3)) < nan_rate] = np.nan
+
+        frames.append(pl.DataFrame({
+            'Subject-id': np.full(n_samples, f'user_{user}'),
+            'Timestamp': times_ns,
+            'Activity Label': np.array([a[0] for a in SYNTHETIC_ACTIVITIES])[activity_idx],
+            'X': values[:, 0],
+            'Y': values[:, 1],
+            'Z': values[:, 2],
+        }))
+
+    return (
+        pl.concat(frames)
+        .with_columns(pl.col('Timestamp').cast(pl.Datetime('ns')))
+        .sort(['Subject-id', 'Activity Label', 'Timestamp'])
+    )
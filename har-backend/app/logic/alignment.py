@@ -0,0 +1,112 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import polars as pl
+
+
+GROUP_KEYS = ['Subject-id', 'Activity Label']
+
+
+def match_nearest(ref_times_ns, times_ns, tolerance_ns):
+    """
+    Empareja cada timestamp de referencia con el más cercano de otra serie
+
+    Búsqueda binaria O(n log m) en lugar de la matriz densa de distancias
+    n x m: cada referencia solo compara con sus dos vecinos en `times_ns`.
+
+    Args:
+        ref_times_ns: Array int64 de timestamps de referencia (p. ej. acelerómetro)
+        times_ns: Array int64 ordenado de la otra serie (p. ej. giroscopio)
+        tolerance_ns: Distancia máxima en nanosegundos para aceptar el par
+
+    Returns:
+        nearest_idx: Índice en `times_ns` del vecino más cercano de cada referencia
+        diff_ns: Distancia absoluta al vecino más cercano
+        matched: Array bool con True si la distancia está dentro de la tolerancia
+    """
+    ref_times_ns = np.asarray(ref_times_ns, dtype=np.int64)
+    times_ns = np.asarray(times_ns, dtype=np.int64)
+
+    if len(times_ns) == 0:
+        empty = np.zeros(len(ref_times_ns), dtype=np.int64)
+        return empty, np.full(len(ref_times_ns), np.iinfo(np.int64).max), np.zeros(len(ref_times_ns), dtype=bool)
+
+    right = np.clip(np.searchsorted(times_ns, ref_times_ns, side='left'), 0, len(times_ns) - 1)
+    left = np.clip(right - 1, 0, len(times_ns) - 1)
+
+    diff_left = np.abs(ref_times_ns - times_ns[left])
+    diff_right = np.abs(times_ns[right] - ref_times_ns)
+
+    use_left = diff_left <= diff_right
+    nearest_idx = np.where(use_left, left, right)
+    diff_ns = np.where(use_left, diff_left, diff_right)
+
+    return nearest_idx, diff_ns, diff_ns <= tolerance_ns
+
+
+def align_gyro_to_accel(df_accel, df_gyro, sync_tolerance_ms):
+    """
+    Alinea el giroscopio sobre la rejilla temporal del acelerómetro
+
+    Empareja cada muestra de acelerómetro con la muestra de giroscopio más
+    cercana del mismo usuario/actividad (merge_asof / join_asof 'nearest',
+    O(n log m)) y descarta los pares fuera de `sync_tolerance_ms`. El
+    giroscopio resultante comparte los timestamps del acelerómetro, de modo
+    que ambos sensores se ventanean sobre la misma rejilla.
+
+    Args:
+        df_accel: DataFrame preparado de acelerómetro (Polars o Pandas)
+        df_gyro: DataFrame preparado de giroscopio del mismo tipo
+        sync_tolerance_ms: Tolerancia de emparejamiento en milisegundos
+
+    Returns:
+        df_gyro_aligned: Giroscopio con Subject-id, Activity Label, Timestamp,
+            X, Y, Z en los timestamps del acelerómetro emparejados
+        stats: dict con 'matched', 'total', 'match_rate' y 'mean_diff_ms'
+    """
+    tolerance = timedelta(milliseconds=sync_tolerance_ms)
+
+    if isinstance(df_accel, pl.DataFrame):
+        gyro = df_gyro.select(
+            GROUP_KEYS + ['Timestamp', 'X', 'Y', 'Z']
+        ).with_columns(pl.col('Timestamp').alias('gyro_Timestamp'))
+
+        joined = df_accel.select(GROUP_KEYS + ['Timestamp']).join_asof(
+            gyro, on='Timestamp', by=GROUP_KEYS, strategy='nearest',
+            tolerance=tolerance, check_sortedness=False
+        )
+        aligned = joined.filter(pl.col('gyro_Timestamp').is_not_null())
+        diff_ns = (
+            (aligned['Timestamp'].cast(pl.Int64) - aligned['gyro_Timestamp'].cast(pl.Int64))
+            .abs().to_numpy()
+        )
+        df_gyro_aligned = aligned.drop('gyro_Timestamp')
+    else:
+        gyro = df_gyro[GROUP_KEYS + ['Timestamp', 'X', 'Y', 'Z']].copy()
+        gyro['gyro_Timestamp'] = gyro['Timestamp']
+
+        # merge_asof exige orden global por la clave temporal
+        joined = pd.merge_asof(
+            df_accel[GROUP_KEYS + ['Timestamp']].sort_values('Timestamp', kind='stable'),
+            gyro.sort_values('Timestamp', kind='stable'),
+            on='Timestamp', by=GROUP_KEYS, direction='nearest',
+            tolerance=pd.Timedelta(tolerance)
+        )
+        aligned = joined[joined['gyro_Timestamp'].notna()]
+        diff_ns = np.abs(
+            aligned['Timestamp'].astype('int64').to_numpy()
+            - aligned['gyro_Timestamp'].astype('int64').to_numpy()
+        )
+        df_gyro_aligned = aligned.drop(columns='gyro_Timestamp').reset_index(drop=True)
+
+    total = len(df_accel)
+    matched = len(df_gyro_aligned)
+    stats = {
+        'matched': matched,
+        'total': total,
+        'match_rate': matched / total if total > 0 else 0.0,
+        'mean_diff_ms': float(diff_ns.mean() / 1e6) if matched > 0 else float('nan'),
+    }
+
+    return df_gyro_aligned, stats
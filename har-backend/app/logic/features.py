@@ -0,0 +1,624 @@
+import mmap
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack
+from functools import lru_cache
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+from scipy import fft as sp_fft
+
+from logic.kernels import count_sign_changes
+
+
+# Orden fijo de las estadísticas por canal (mismo que extract_temporal_features)
+CHANNEL_STATS = (
+    'mean', 'std', 'var', 'min', 'max', 'range', 'median',
+    'q25', 'q75', 'iqr', 'skewness', 'kurtosis', 'rms', 'energy', 'zcr', 'mad',
+)
+DIFF_STATS = ('diff_mean', 'diff_std', 'diff_max')
+DIFF2_STATS = ('diff2_mean', 'diff2_std', 'diff2_max')
+MAGNITUDE_STATS = ('magnitude_mean', 'magnitude_std', 'magnitude_max', 'magnitude_min')
+
+# Orden fijo de las estadísticas espectrales por canal (mismo que extract_frequency_features)
+FREQUENCY_STATS = (
+    'spectral_energy', 'spectral_mean', 'spectral_std', 'spectral_max',
+    'dominant_freq', 'dominant_freq_magnitude', 'spectral_centroid',
+    'spectral_rolloff', 'spectral_spread', 'spectral_skewness', 'spectral_kurtosis',
+    'spectral_entropy', 'low_band_energy', 'mid_band_energy', 'high_band_energy',
+    'low_band_ratio', 'mid_band_ratio', 'high_band_ratio',
+)
+
+# Bandas de frecuencia (Hz): baja [0, 2], media (2, 5], alta (5, 10]
+FREQUENCY_BANDS = (('low', 0, 2), ('mid', 2, 5), ('high', 5, 10))
+
+
+# ---------------------------------------------------------------------------------
+#                               ESQUEMA DE COLUMNAS
+# ---------------------------------------------------------------------------------
+
+def temporal_feature_names(n_timesteps, n_channels):
+    """
+    Nombres de columna de extract_temporal_features_batch
+
+    El esquema solo depende de la forma de las ventanas, así que es estable
+    entre ejecuciones y coincide con las claves de extract_temporal_features.
+    """
+    per_channel = _channel_stat_names(n_timesteps)
+    names = [f'ch{ch}_{stat}' for ch in range(n_channels) for stat in per_channel]
+
+    if n_channels > 1:
+        names += [
+            f'corr_ch{i}_ch{j}'
+            for i in range(n_channels) for j in range(i + 1, n_channels)
+        ]
+        if n_channels == 3:
+            names += list(MAGNITUDE_STATS)
+
+    return names
+
+
+def frequency_feature_names(n_channels):
+    """Nombres de columna de extract_frequency_features_batch"""
+    return [f'ch{ch}_{stat}' for ch in range(n_channels) for stat in FREQUENCY_STATS]
+
+
+def feature_names(n_timesteps, n_channels):
+    """Nombres de columna de extract_features_batch (temporales + frecuenciales)"""
+    return temporal_feature_names(n_timesteps, n_channels) + frequency_feature_names(n_channels)
+
+
+def _channel_stat_names(n_timesteps):
+    """Estadísticas por canal según las diferencias que admite la longitud de la ventana"""
+    per_channel = CHANNEL_STATS
+    if n_timesteps > 1:
+        per_channel += DIFF_STATS
+    if n_timesteps > 2:
+        per_channel += DIFF2_STATS
+    return per_channel
+
+
+# ---------------------------------------------------------------------------------
+#                               INTERMEDIOS COMPARTIDOS
+# ---------------------------------------------------------------------------------
+# Cada intermedio declara de qué otros depende; se calcula una sola vez por
+# extracción y solo si alguna característica del plan lo necesita. 'X' (el
+# tensor en float64) y 'spectral_plan' los aporta el propio plan.
+
+def _skew_kurtosis(centered, mean, m2):
+    """Asimetría y curtosis (Fisher) sesgadas, igual que scipy.stats con sus valores por defecto"""
+    m3 = np.mean(centered**3, axis=1)
+    m4 = np.mean(centered**4, axis=1)
+
+    # scipy devuelve NaN cuando la varianza se pierde por precisión numérica
+    degenerate = m2 <= (np.finfo(m2.dtype).resolution * mean)**2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        skewness = np.where(degenerate, np.nan, m3 / m2**1.5)
+        kurt = np.where(degenerate, np.nan, m4 / m2**2 - 3.0)
+
+    return skewness, kurt
+
+
+def _pairwise_correlation(centered, m2):
+    """Correlación de Pearson de cada par de canales (i < j); 0.0 si no está definida"""
+    n_channels = centered.shape[2]
+    i, j = np.triu_indices(n_channels, k=1)
+
+    covariance = np.mean(centered[:, :, i] * centered[:, :, j], axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = covariance / np.sqrt(m2[:, i] * m2[:, j])
+
+    corr = np.clip(corr, -1, 1)
+    return np.where(np.isnan(corr), 0.0, corr)
+
+
+def _spectrum(c):
+    """Magnitud normalizada de las frecuencias positivas (n_ventanas, bins, canales)"""
+    taper, freqs, _ = c['spectral_plan']
+    n_timesteps = c['X'].shape[1]
+    spectrum = sp_fft.rfft(c['X'] * taper[None, :, None], axis=1)[:, :len(freqs)]
+    return np.abs(spectrum) / n_timesteps
+
+
+def _centroid(c):
+    freqs = c['spectral_plan'][1]
+    total = c['psd_total']
+    return np.einsum('k,nkc->nc', freqs, c['psd']) / np.where(total > 0, total, 1.0)
+
+
+def _band_ratio(c):
+    band_total = c['band_energy'].sum(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(band_total > 0, c['band_energy'] / band_total, 0.0)
+
+
+INTERMEDIATES = {
+    # Dominio temporal: arrays (n_ventanas, canales) salvo indicación
+    'mean': (('X',), lambda c: c['X'].mean(axis=1)),
+    'centered': (('X', 'mean'), lambda c: c['X'] - c['mean'][:, None, :]),
+    'm2': (('centered',), lambda c: np.mean(c['centered']**2, axis=1)),
+    'min': (('X',), lambda c: c['X'].min(axis=1)),
+    'max': (('X',), lambda c: c['X'].max(axis=1)),
+    'quartiles': (('X',), lambda c: np.percentile(c['X'], [25, 50, 75], axis=1)),
+    'shape': (('centered', 'mean', 'm2'), lambda c: _skew_kurtosis(c['centered'], c['mean'], c['m2'])),
+    'energy': (('X',), lambda c: np.sum(c['X']**2, axis=1)),
+    'diff': (('X',), lambda c: np.diff(c['X'], axis=1)),
+    'diff2': (('diff',), lambda c: np.diff(c['diff'], axis=1)),
+    'corr': (('centered', 'm2'), lambda c: _pairwise_correlation(c['centered'], c['m2'])),
+    'magnitude': (('X',), lambda c: np.sqrt(np.sum(c['X']**2, axis=2))),  # (n_ventanas, timesteps)
+
+    # Dominio frecuencial
+    'spectrum': (('X', 'spectral_plan'), _spectrum),
+    'psd': (('spectrum',), lambda c: c['spectrum']**2),
+    'psd_total': (('psd',), lambda c: c['psd'].sum(axis=1)),
+    'spectrum_mean': (('spectrum',), lambda c: c['spectrum'].mean(axis=1)),
+    'spectrum_centered': (('spectrum', 'spectrum_mean'), lambda c: c['spectrum'] - c['spectrum_mean'][:, None, :]),
+    'spectrum_m2': (('spectrum_centered',), lambda c: np.mean(c['spectrum_centered']**2, axis=1)),
+    'spectrum_shape': (('spectrum_centered', 'spectrum_mean', 'spectrum_m2'), lambda c: _skew_kurtosis(
+        c['spectrum_centered'], c['spectrum_mean'], c['spectrum_m2']
+    )),
+    'dominant': (('psd',), lambda c: np.argmax(c['psd'][:, 1:], axis=1) + 1),  # sin DC
+    'centroid': (('psd', 'psd_total', 'spectral_plan'), _centroid),
+    'band_energy': (('psd', 'spectral_plan'), lambda c: np.einsum(
+        'nkc,kb->nbc', c['psd'], c['spectral_plan'][2]
+    )),
+    'band_ratio': (('band_energy',), _band_ratio),
+}
+
+
+def _zcr(c):
+    return count_sign_changes(c['X']) / c['X'].shape[1]
+
+
+def _rolloff(c):
+    """Primer bin donde la energía acumulada alcanza el 85%"""
+    cumulative = np.cumsum(c['psd'], axis=1)
+    rolloff = np.argmax(cumulative >= 0.85 * cumulative[:, -1:, :], axis=1)
+    return np.where(c['psd_total'] > 0, c['spectral_plan'][1][rolloff], 0.0)
+
+
+def _spread(c):
+    freqs = c['spectral_plan'][1]
+    total = c['psd_total']
+    deviation = (freqs[None, :, None] - c['centroid'][:, None, :])**2
+    spread = np.sqrt(np.sum(deviation * c['psd'], axis=1) / np.where(total > 0, total, 1.0))
+    return np.where(total > 0, spread, 0.0)
+
+
+def _entropy(c):
+    psd_normalized = c['psd'] / (c['psd_total'][:, None, :] + 1e-12)
+    return -np.sum(psd_normalized * np.log2(psd_normalized + 1e-12), axis=1)
+
+
+# ---------------------------------------------------------------------------------
+#                               REGISTRO DE CARACTERÍSTICAS
+# ---------------------------------------------------------------------------------
+# Por canal: estadística -> (intermedios requeridos, función -> (n_ventanas, canales));
+# las columnas se llaman ch{canal}_{estadística}
+
+CHANNEL_FEATURES = {
+    'mean': (('mean',), lambda c: c['mean']),
+    'std': (('m2',), lambda c: np.sqrt(c['m2'])),
+    'var': (('m2',), lambda c: c['m2']),
+    'min': (('min',), lambda c: c['min']),
+    'max': (('max',), lambda c: c['max']),
+    'range': (('min', 'max'), lambda c: c['max'] - c['min']),
+    'median': (('quartiles',), lambda c: c['quartiles'][1]),
+    'q25': (('quartiles',), lambda c: c['quartiles'][0]),
+    'q75': (('quartiles',), lambda c: c['quartiles'][2]),
+    'iqr': (('quartiles',), lambda c: c['quartiles'][2] - c['quartiles'][0]),
+    'skewness': (('shape',), lambda c: c['shape'][0]),
+    'kurtosis': (('shape',), lambda c: c['shape'][1]),
+    'rms': (('X', 'energy'), lambda c: np.sqrt(c['energy'] / c['X'].shape[1])),
+    'energy': (('energy',), lambda c: c['energy']),
+    'zcr': (('X',), _zcr),
+    'mad': (('centered',), lambda c: np.mean(np.abs(c['centered']), axis=1)),
+    'diff_mean': (('diff',), lambda c: c['diff'].mean(axis=1)),
+    'diff_std': (('diff',), lambda c: c['diff'].std(axis=1)),
+    'diff_max': (('diff',), lambda c: np.abs(c['diff']).max(axis=1)),
+    'abs_diff_mean': (('diff',), lambda c: np.abs(c['diff']).mean(axis=1)),  # fuera del esquema por defecto
+    'diff2_mean': (('diff2',), lambda c: c['diff2'].mean(axis=1)),
+    'diff2_std': (('diff2',), lambda c: c['diff2'].std(axis=1)),
+    'diff2_max': (('diff2',), lambda c: np.abs(c['diff2']).max(axis=1)),
+
+    'spectral_energy': (('psd_total',), lambda c: c['psd_total']),
+    'spectral_mean': (('spectrum_mean',), lambda c: c['spectrum_mean']),
+    'spectral_std': (('spectrum_m2',), lambda c: np.sqrt(c['spectrum_m2'])),
+    'spectral_max': (('spectrum',), lambda c: c['spectrum'].max(axis=1)),
+    'dominant_freq': (('dominant', 'spectral_plan'), lambda c: c['spectral_plan'][1][c['dominant']]),
+    'dominant_freq_magnitude': (('dominant', 'spectrum'), lambda c: np.take_along_axis(
+        c['spectrum'], c['dominant'][:, None, :], axis=1
+    )[:, 0]),
+    'spectral_centroid': (('centroid', 'psd_total'), lambda c: np.where(c['psd_total'] > 0, c['centroid'], 0.0)),
+    'spectral_rolloff': (('psd', 'psd_total', 'spectral_plan'), _rolloff),
+    'spectral_spread': (('psd', 'psd_total', 'centroid', 'spectral_plan'), _spread),
+    'spectral_skewness': (('spectrum_shape',), lambda c: c['spectrum_shape'][0]),
+    'spectral_kurtosis': (('spectrum_shape',), lambda c: c['spectrum_shape'][1]),
+    'spectral_entropy': (('psd', 'psd_total'), _entropy),
+}
+
+for _index, (_band, _, _) in enumerate(FREQUENCY_BANDS):
+    CHANNEL_FEATURES[f'{_band}_band_energy'] = (('band_energy',), lambda c, b=_index: c['band_energy'][:, b])
+    CHANNEL_FEATURES[f'{_band}_band_ratio'] = (('band_ratio',), lambda c, b=_index: c['band_ratio'][:, b])
+
+# De ventana completa: nombre -> (intermedios requeridos, función -> (n_ventanas,))
+WINDOW_FEATURES = {
+    'magnitude_mean': (('magnitude',), lambda c: c['magnitude'].mean(axis=1)),
+    'magnitude_std': (('magnitude',), lambda c: c['magnitude'].std(axis=1)),
+    'magnitude_max': (('magnitude',), lambda c: c['magnitude'].max(axis=1)),
+    'magnitude_min': (('magnitude',), lambda c: c['magnitude'].min(axis=1)),
+}
+
+_CHANNEL_NAME = re.compile(r'ch(\d+)_(\w+)')
+_CORR_NAME = re.compile(r'corr_ch(\d+)_ch(\d+)')
+
+
+@lru_cache(maxsize=32)
+def _spectral_plan(n_timesteps, sampling_rate):
+    """
+    Ventana de Hann, vector de frecuencias y máscaras de banda para una forma
+    de ventana (cacheados por (timesteps, sampling_rate))
+    """
+    n_bins = n_timesteps // 2
+    taper = np.hanning(n_timesteps)
+    freqs = sp_fft.rfftfreq(n_timesteps, 1 / sampling_rate)[:n_bins]
+
+    band_masks = []
+    for _, low, high in FREQUENCY_BANDS:
+        # La banda baja incluye la componente DC
+        lower = freqs >= low if low == 0 else freqs > low
+        band_masks.append(lower & (freqs <= high))
+    band_masks = np.stack(band_masks, axis=1).astype(np.float64)  # (bins, bandas)
+
+    for array in (taper, freqs, band_masks):
+        array.setflags(write=False)
+    return taper, freqs, band_masks
+
+
+def _resolve_order(required):
+    """Ordena los intermedios requeridos (y sus dependencias) topológicamente"""
+    order = []
+    visiting = set()
+
+    def visit(name):
+        if name in order:
+            return
+        if name in visiting:
+            raise ValueError(f"Dependencia circular en el intermedio {name}")
+        visiting.add(name)
+        for dependency in INTERMEDIATES.get(name, ((), None))[0]:
+            visit(dependency)
+        visiting.discard(name)
+        order.append(name)
+
+    for name in sorted(required):
+        visit(name)
+    return order
+
+
+class FeaturePlan:
+    """
+    Plan de extracción compilado para una lista de características
+
+    Resuelve qué estadísticas e intermedios hacen falta para las columnas
+    pedidas y en qué orden calcularlos; `extract` solo evalúa esos.
+    """
+
+    def __init__(self, names, n_timesteps, n_channels, sampling_rate=20):
+        self.names = list(names)
+        self.n_timesteps = n_timesteps
+        self.n_channels = n_channels
+        self.sampling_rate = sampling_rate
+
+        pair_index = {
+            (int(i), int(j)): k
+            for k, (i, j) in enumerate(zip(*np.triu_indices(n_channels, k=1)))
+        }
+
+        # Columnas agrupadas por estadística: {estadística: [(columna, canal)]}
+        self._channel_columns = {}
+        self._corr_columns = []
+        self._window_columns = {}
+
+        required = set()
+        for column, name in enumerate(self.names):
+            corr_match = _CORR_NAME.fullmatch(name)
+            channel_match = _CHANNEL_NAME.fullmatch(name)
+
+            if corr_match:
+                pair = (int(corr_match.group(1)), int(corr_match.group(2)))
+                if pair not in pair_index:
+                    raise ValueError(f"Correlación no válida para {n_channels} canales: {name}")
+                self._corr_columns.append((column, pair_index[pair]))
+                required.add('corr')
+            elif channel_match and channel_match.group(2) in CHANNEL_FEATURES:
+                channel, stat = int(channel_match.group(1)), channel_match.group(2)
+                if channel >= n_channels:
+                    raise ValueError(f"Canal fuera de rango para {n_channels} canales: {name}")
+                if ((stat in DIFF_STATS + ('abs_diff_mean',) and n_timesteps < 2) or
+                        (stat in DIFF2_STATS and n_timesteps < 3)):
+                    raise ValueError(f"Ventana demasiado corta para {name}")
+                self._channel_columns.setdefault(stat, []).append((column, channel))
+                required.update(CHANNEL_FEATURES[stat][0])
+            elif name in WINDOW_FEATURES:
+                self._window_columns[name] = column
+                required.update(WINDOW_FEATURES[name][0])
+            else:
+                raise KeyError(f"Característica no registrada: {name}")
+
+        self.intermediates = tuple(_resolve_order(required))
+
+    def __len__(self):
+        return len(self.names)
+
+    def extract(self, X):
+        """
+        Calcula las características del plan para todas las ventanas
+
+        Args:
+            X: Array (n_ventanas, timesteps, canales) con la forma del plan
+
+        Returns:
+            Array float32 (n_ventanas, len(names)) en el orden de `names`
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.shape[1:] != (self.n_timesteps, self.n_channels):
+            raise ValueError(
+                f"Forma de ventana {X.shape[1:]} distinta de la del plan "
+                f"{(self.n_timesteps, self.n_channels)}"
+            )
+
+        context = {'X': X}
+        for name in self.intermediates:
+            if name == 'spectral_plan':
+                context[name] = _spectral_plan(self.n_timesteps, self.sampling_rate)
+            elif name != 'X':
+                context[name] = INTERMEDIATES[name][1](context)
+
+        features = np.empty((len(X), len(self.names)), dtype=np.float32)
+
+        for stat, columns in self._channel_columns.items():
+            values = CHANNEL_FEATURES[stat][1](context)
+            column_idx, channel_idx = zip(*columns)
+            features[:, list(column_idx)] = values[:, list(channel_idx)]
+
+        if self._corr_columns:
+            column_idx, pair_idx = zip(*self._corr_columns)
+            features[:, list(column_idx)] = context['corr'][:, list(pair_idx)]
+
+        for name, column in self._window_columns.items():
+            features[:, column] = WINDOW_FEATURES[name][1](context)
+
+        return features
+
+
+@lru_cache(maxsize=64)
+def _compile_cached(names, n_timesteps, n_channels, sampling_rate):
+    return FeaturePlan(names, n_timesteps, n_channels, sampling_rate)
+
+
+def compile_feature_plan(names, n_timesteps, n_channels, sampling_rate=20):
+    """
+    Compila (y cachea) el plan de extracción de una lista de características
+
+    Args:
+        names: Nombres de columna requeridos (p. ej. los que consume un modelo)
+        n_timesteps: Timesteps por ventana
+        n_channels: Canales por ventana
+        sampling_rate: Frecuencia de muestreo en Hz
+
+    Returns:
+        FeaturePlan
+    """
+    return _compile_cached(tuple(names), n_timesteps, n_channels, sampling_rate)
+
+
+# ---------------------------------------------------------------------------------
+#                               EXTRACCIÓN COMPLETA
+# ---------------------------------------------------------------------------------
+
+def extract_temporal_features_batch(X):
+    """
+    Extrae las características temporales de todas las ventanas a la vez
+
+    Versión vectorizada de `extract_temporal_features`: cada estadística se
+    calcula sobre el eje temporal del tensor completo en lugar de por ventana
+    y canal, y el resultado es una matriz en lugar de una lista de dicts.
+
+    Args:
+        X: Array (n_ventanas, timesteps, canales)
+
+    Returns:
+        features: Array float32 (n_ventanas, n_features)
+        names: Lista con el nombre de cada columna (ver temporal_feature_names)
+    """
+    _, n_timesteps, n_channels = np.shape(X)
+    names = temporal_feature_names(n_timesteps, n_channels)
+    return compile_feature_plan(names, n_timesteps, n_channels).extract(X), names
+
+
+def extract_frequency_features_batch(X, sampling_rate=20):
+    """
+    Extrae las características frecuenciales de todas las ventanas a la vez
+
+    Versión vectorizada de `extract_frequency_features`: una sola `rfft` sobre
+    el eje temporal de todas las ventanas y canales, con la ventana de Hann,
+    las frecuencias y las máscaras de banda cacheadas por forma de ventana;
+    el resto de estadísticas son reducciones sobre el eje de frecuencias.
+
+    Args:
+        X: Array (n_ventanas, timesteps, canales)
+        sampling_rate: Frecuencia de muestreo en Hz
+
+    Returns:
+        features: Array float32 (n_ventanas, n_features)
+        names: Lista con el nombre de cada columna (ver frequency_feature_names)
+    """
+    _, n_timesteps, n_channels = np.shape(X)
+    names = frequency_feature_names(n_channels)
+    return compile_feature_plan(names, n_timesteps, n_channels, sampling_rate).extract(X), names
+
+
+def extract_features_batch(X, sampling_rate=20, names=None):
+    """
+    Características temporales y frecuenciales de todas las ventanas
+
+    Equivale a `extract_combined_features` aplicado a cada ventana. Con
+    `names` (p. ej. las columnas que consume un modelo) solo se calculan
+    esas características y sus intermedios.
+
+    Returns:
+        features: Array float32 (n_ventanas, n_features)
+        names: Lista con el nombre de cada columna (ver feature_names)
+    """
+    _, n_timesteps, n_channels = np.shape(X)
+    if names is None:
+        names = feature_names(n_timesteps, n_channels)
+    plan = compile_feature_plan(names, n_timesteps, n_channels, sampling_rate)
+    return plan.extract(X), list(names)
+
+
+# ---------------------------------------------------------------------------------
+#                               EXTRACCIÓN PARALELA
+# ---------------------------------------------------------------------------------
+
+def extract_features_parallel(X, sampling_rate=20, names=None, n_jobs=-1,
+                              chunk_windows=8192, progress=None):
+    """
+    Extracción por bloques en un pool de procesos sin serializar ventanas
+
+    `X` se comparte con los workers sin copiarlo por pickle: si ya es un
+    `.npy` abierto con mmap (np.load(..., mmap_mode='r')) cada worker abre
+    el mismo fichero; si no, se copia una vez a memoria compartida. Cada
+    worker escribe su bloque directamente en una matriz de salida también
+    compartida.
+
+    Args:
+        X: Array o memmap (n_ventanas, timesteps, canales)
+        sampling_rate: Frecuencia de muestreo en Hz
+        names: Columnas a calcular (por defecto el esquema completo)
+        n_jobs: Número de procesos (-1 = todos los núcleos, 1 = sin pool)
+        chunk_windows: Ventanas por bloque de trabajo
+        progress: Callable opcional progress(hechas, total, segundos)
+
+    Returns:
+        features: Array float32 (n_ventanas, n_features)
+        names: Lista con el nombre de cada columna
+        stats: dict con 'windows', 'seconds', 'windows_per_second' y 'n_jobs'
+    """
+    n_windows, n_timesteps, n_channels = X.shape
+    if names is None:
+        names = feature_names(n_timesteps, n_channels)
+    names = tuple(names)
+
+    # Compilar en el proceso principal para fallar pronto con nombres no válidos
+    plan = compile_feature_plan(names, n_timesteps, n_channels, sampling_rate)
+
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = max(1, min(n_jobs, -(-n_windows // chunk_windows)))
+
+    start = time.perf_counter()
+
+    if n_jobs == 1:
+        features = np.empty((n_windows, len(names)), dtype=np.float32)
+        for begin in range(0, n_windows, chunk_windows):
+            end = min(begin + chunk_windows, n_windows)
+            features[begin:end] = plan.extract(X[begin:end])
+            if progress is not None:
+                progress(end, n_windows, time.perf_counter() - start)
+    else:
+        features = _extract_shared(X, names, sampling_rate, n_jobs, chunk_windows, progress, start)
+
+    seconds = time.perf_counter() - start
+    stats = {
+        'windows': n_windows,
+        'seconds': seconds,
+        'windows_per_second': n_windows / seconds if seconds > 0 else float('inf'),
+        'n_jobs': n_jobs,
+    }
+    return features, list(names), stats
+
+
+def _extract_shared(X, names, sampling_rate, n_jobs, chunk_windows, progress, start):
+    """Reparte los bloques entre procesos usando memoria compartida para entrada y salida"""
+    n_windows = len(X)
+    output_shape = (n_windows, len(names))
+
+    with ExitStack() as stack:
+        offset = _memmap_offset(X)
+        if offset is not None:
+            input_spec = ('memmap', X.filename, offset, X.dtype.str, X.shape)
+        else:
+            X = np.ascontiguousarray(X)
+            shm_in = _create_shared(stack, X.nbytes)
+            np.ndarray(X.shape, X.dtype, buffer=shm_in.buf)[:] = X
+            input_spec = ('shm', shm_in.name, 0, X.dtype.str, X.shape)
+
+        shm_out = _create_shared(stack, n_windows * len(names) * np.dtype(np.float32).itemsize)
+
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            futures = [
+                executor.submit(
+                    _extract_chunk, input_spec, shm_out.name, output_shape,
+                    begin, min(begin + chunk_windows, n_windows), names, sampling_rate
+                )
+                for begin in range(0, n_windows, chunk_windows)
+            ]
+            done = 0
+            for future in as_completed(futures):
+                done += future.result()
+                if progress is not None:
+                    progress(done, n_windows, time.perf_counter() - start)
+
+        # Copiar fuera del segmento compartido antes de liberarlo
+        return np.ndarray(output_shape, np.float32, buffer=shm_out.buf).copy()
+
+
+def _memmap_offset(X):
+    """
+    Offset real en bytes de X dentro de su fichero, o None si no se puede abrir desde él
+
+    numpy no actualiza `.offset` al trocear un memmap (np.load(..., mmap_mode='r')[1000:]
+    conserva el del array original), así que se calcula con el puntero de datos
+    respecto al memmap raíz, el que envuelve directamente el objeto mmap.
+    """
+    if not isinstance(X, np.memmap) or X.filename is None or not X.flags.c_contiguous:
+        return None
+    root = X
+    while isinstance(root.base, np.ndarray):
+        root = root.base
+    if not isinstance(root, np.memmap) or not isinstance(root.base, mmap.mmap):
+        return None
+    return root.offset + (X.ctypes.data - root.ctypes.data)
+
+
+def _create_shared(stack, nbytes):
+    """Crea un segmento de memoria compartida que se libera al cerrar `stack`"""
+    shm = SharedMemory(create=True, size=max(int(nbytes), 1))
+    stack.callback(shm.unlink)
+    stack.callback(shm.close)
+    return shm
+
+
+def _extract_chunk(input_spec, output_name, output_shape, begin, end, names, sampling_rate):
+    """Worker: calcula las características de X[begin:end] y las escribe en la salida compartida"""
+    kind, location, offset, dtype, shape = input_spec
+    plan = compile_feature_plan(names, shape[1], shape[2], sampling_rate)
+
+    with ExitStack() as stack:
+        if kind == 'memmap':
+            X = np.memmap(location, dtype=dtype, mode='r', offset=offset, shape=shape)
+            features = plan.extract(X[begin:end])
+        else:
+            shm_in = SharedMemory(name=location)
+            stack.callback(shm_in.close)
+            features = plan.extract(np.ndarray(shape, dtype, buffer=shm_in.buf)[begin:end])
+
+        shm_out = SharedMemory(name=output_name)
+        stack.callback(shm_out.close)
+        np.ndarray(output_shape, np.float32, buffer=shm_out.buf)[begin:end] = features
+
+    return end - begin
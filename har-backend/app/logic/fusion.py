@@ -0,0 +1,210 @@
+import os
+
+import joblib
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+
+class FeatureFusionScaler:
+    """
+    Escalado global para fusionar ventanas crudas con sus características
+
+    Se ajusta en una sola pasada en streaming (`partial_fit` por lotes) sobre
+    todo el dataset, de modo que todas las ventanas se escalan igual, y se
+    persiste con joblib para aplicar exactamente la misma transformación en
+    inferencia.
+
+    Modos:
+        'weighted_concat': características estandarizadas (StandardScaler) y
+            reescaladas para que su desviación global iguale la de los datos crudos
+        otro valor: características sin transformar
+    """
+
+    def __init__(self, mode='weighted_concat', feature_names=None):
+        self.mode = mode
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        self.feature_scaler = StandardScaler()
+        self.n_windows = 0
+        # Media y suma de cuadrados centrada de todos los valores crudos (Chan et al.)
+        self.raw_count = 0
+        self.raw_mean = 0.0
+        self.raw_m2 = 0.0
+
+    def partial_fit(self, X_raw_batch, X_features_batch):
+        """Acumula las estadísticas de un lote (n, T, C) / (n, F)"""
+        self.n_windows += len(X_features_batch)
+        if self.mode != 'weighted_concat' or len(X_features_batch) == 0:
+            return self
+
+        self.feature_scaler.partial_fit(np.asarray(X_features_batch, dtype=np.float64))
+
+        raw = np.asarray(X_raw_batch, dtype=np.float64)
+        count = raw.size
+        mean = raw.mean()
+        m2 = np.square(raw - mean).sum()
+
+        total = self.raw_count + count
+        delta = mean - self.raw_mean
+        self.raw_mean += delta * count / total
+        self.raw_m2 += m2 + delta ** 2 * self.raw_count * count / total
+        self.raw_count = total
+        return self
+
+    @property
+    def raw_std(self):
+        """Desviación estándar global de los datos crudos (equivale a np.std(X_raw))"""
+        if self.raw_count == 0:
+            return 0.0
+        return float(np.sqrt(self.raw_m2 / self.raw_count))
+
+    @property
+    def feature_std(self):
+        """Desviación estándar global de las características ya estandarizadas"""
+        if not hasattr(self.feature_scaler, 'var_'):
+            return 0.0
+        # Tras estandarizar, cada columna tiene media 0 y varianza var_/scale_²
+        # (0 en columnas constantes), así que no hace falta una segunda pasada
+        normalized_var = self.feature_scaler.var_ / np.square(self.feature_scaler.scale_)
+        return float(np.sqrt(np.nanmean(normalized_var)))
+
+    @property
+    def feature_weight(self):
+        """Factor aplicado a las características estandarizadas"""
+        feature_std = self.feature_std
+        return self.raw_std / feature_std if feature_std > 0 else 1.0
+
+    def transform_features(self, X_features_batch):
+        """Escala un lote de características (n, F) y lo devuelve en float32"""
+        if self.mode != 'weighted_concat':
+            return np.asarray(X_features_batch, dtype=np.float32)
+
+        normalized = self.feature_scaler.transform(np.asarray(X_features_batch, dtype=np.float64))
+        normalized *= self.feature_weight
+        return normalized.astype(np.float32, copy=False)
+
+    def combine(self, X_raw_batch, X_features_batch, out=None):
+        """
+        Concatena un lote de ventanas crudas con sus características escaladas
+
+        Las características de cada ventana se repiten en todos los timesteps por
+        broadcasting al escribir en `out`: no se materializa ninguna copia con
+        np.repeat.
+
+        Args:
+            X_raw_batch: Array (n, T, C)
+            X_features_batch: Array (n, F)
+            out: Destino opcional (n, T, C+F), p. ej. un tramo de un memmap
+
+        Returns:
+            out: Array (n, T, C+F) float32
+        """
+        n_samples, n_timesteps, n_channels = X_raw_batch.shape
+        features = self.transform_features(X_features_batch)
+
+        if out is None:
+            out = np.empty((n_samples, n_timesteps, n_channels + features.shape[1]), dtype=np.float32)
+
+        out[:, :, :n_channels] = X_raw_batch
+        out[:, :, n_channels:] = features[:, np.newaxis, :]
+        return out
+
+    def save(self, path):
+        """Persiste el escalador (joblib) para usarlo en inferencia"""
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path):
+        return joblib.load(path)
+
+
+def fit_fusion_scaler(X_raw, X_features, mode='weighted_concat', batch_size=5000,
+                      feature_names=None):
+    """
+    Ajusta un FeatureFusionScaler recorriendo el dataset por lotes
+
+    Solo mantiene un lote en memoria: X_raw y X_features pueden ser memmaps.
+    """
+    scaler = FeatureFusionScaler(mode=mode, feature_names=feature_names)
+    for start_idx in range(0, len(X_raw), batch_size):
+        end_idx = min(start_idx + batch_size, len(X_raw))
+        scaler.partial_fit(X_raw[start_idx:end_idx], X_features[start_idx:end_idx])
+    return scaler
+
+
+def combine_raw_and_features_batched(X_raw, X_features, mode='weighted_concat',
+                                     batch_size=5000, target_timesteps=100,
+                                     scaler=None, output_path=None, shard_windows=None):
+    """
+    Combina datos en lotes para evitar problemas de memoria
+
+    Primera pasada: ajusta un escalador global (si no se pasa `scaler`).
+    Segunda pasada: escribe cada lote directamente en el destino, sin
+    mantener el tensor completo (N, T, C+F) en RAM cuando hay `output_path`.
+
+    Args:
+        X_raw: Array (N, T, C), puede ser un memmap
+        X_features: Array (N, F), puede ser un memmap
+        mode: Estrategia de fusión (ver FeatureFusionScaler)
+        batch_size: Ventanas por lote
+        scaler: FeatureFusionScaler ya ajustado (p. ej. el de entrenamiento)
+        output_path: Ruta .npy para un memmap de salida; si se indica
+            `shard_windows`, directorio donde escribir los fragmentos
+        shard_windows: Ventanas por fragmento .npy (requiere output_path)
+
+    Returns:
+        X_combined: Array/memmap (N, T, C+F) float32, o lista de memmaps de
+            solo lectura (uno por fragmento) si se usa `shard_windows`
+    """
+    n_samples = X_raw.shape[0]
+    n_timesteps = X_raw.shape[1]
+    n_channels = X_raw.shape[2]
+    n_features = X_features.shape[1]
+
+    print(f"🔄 Procesando {n_samples} muestras en lotes de {batch_size}")
+    print(f"📊 Tamaño de salida: {(n_samples * n_timesteps * (n_channels + n_features) * 4) / 1e9:.2f} GB"
+          f"{' (en disco)' if output_path else ''}")
+
+    if scaler is None:
+        scaler = fit_fusion_scaler(X_raw, X_features, mode, batch_size)
+
+    if shard_windows is not None:
+        if output_path is None:
+            raise ValueError("shard_windows requiere output_path")
+        os.makedirs(output_path, exist_ok=True)
+
+        shards = []
+        for shard_idx, shard_start in enumerate(range(0, n_samples, shard_windows)):
+            shard_end = min(shard_start + shard_windows, n_samples)
+            shard_path = os.path.join(output_path, f"combined_{shard_idx:05d}.npy")
+            shard = np.lib.format.open_memmap(
+                shard_path, mode='w+', dtype=np.float32,
+                shape=(shard_end - shard_start, n_timesteps, n_channels + n_features)
+            )
+            _combine_into(shard, X_raw, X_features, scaler, shard_start, shard_end, batch_size)
+            shard.flush()
+            del shard
+            shards.append(np.load(shard_path, mmap_mode='r'))
+        return shards
+
+    final_shape = (n_samples, n_timesteps, n_channels + n_features)
+    if output_path is not None:
+        X_combined = np.lib.format.open_memmap(output_path, mode='w+', dtype=np.float32, shape=final_shape)
+    else:
+        X_combined = np.empty(final_shape, dtype=np.float32)
+
+    _combine_into(X_combined, X_raw, X_features, scaler, 0, n_samples, batch_size)
+
+    if output_path is not None:
+        X_combined.flush()
+    return X_combined
+
+
+def _combine_into(out, X_raw, X_features, scaler, start, end, batch_size):
+    """Escribe las ventanas [start, end) en `out` (indexado desde start) por lotes"""
+    for batch_start in range(start, end, batch_size):
+        batch_end = min(batch_start + batch_size, end)
+        print(f"    Procesando lote {batch_start//batch_size + 1}: {batch_start}-{batch_end}")
+        scaler.combine(
+            X_raw[batch_start:batch_end], X_features[batch_start:batch_end],
+            out=out[batch_start - start:batch_end - start]
+        )
@@ -0,0 +1,267 @@
+import os
+
+import numpy as np
+from loguru import logger
+
+try:
+    import numba
+except ImportError:  # Dependencia opcional: sin ella se usan las versiones NumPy
+    numba = None
+
+
+# ---------------------------------------------------------------------------------
+#                               REFERENCIAS NUMPY
+# ---------------------------------------------------------------------------------
+
+def _segment_max_gap_numpy(times_ns, lo, hi):
+    """Gap máximo (s) entre muestras consecutivas de cada ventana [lo, hi); 0 si n <= 1"""
+    max_gap = np.zeros(len(lo))
+    multi = (hi - lo) > 1
+    if len(lo) > 0 and len(times_ns) > 0:
+        gaps_s = np.append(np.diff(times_ns) / 1e9, 0.0)
+        bounds = np.column_stack([lo, hi - 1]).ravel()
+        bounds = np.clip(bounds, 0, len(gaps_s) - 1)
+        segment_max = np.maximum.reduceat(gaps_s, bounds)[::2]
+        max_gap[multi] = segment_max[multi]
+    return max_gap
+
+
+def _count_sign_changes_numpy(X):
+    """Cambios de signo (signbit) entre timesteps consecutivos, (n_ventanas, canales)"""
+    signbit = np.signbit(X)
+    return np.count_nonzero(signbit[:, 1:] != signbit[:, :-1], axis=1)
+
+
+def _run_bounds_numpy(codes):
+    """Índices [inicio, fin) de cada tramo de valores iguales consecutivos"""
+    run_lo = np.flatnonzero(np.diff(codes, prepend=codes[:1] - 1)) if len(codes) else np.empty(0, np.int64)
+    run_hi = np.append(run_lo[1:], len(codes))[:len(run_lo)]
+    return run_lo.astype(np.int64), run_hi.astype(np.int64)
+
+
+def _solve_tridiagonal_numpy(lower, diag, upper, rhs):
+    """
+    Algoritmo de Thomas por ventana: (n_ventanas, n) x (n_ventanas, n, canales)
+
+    Modifica `diag` y `rhs` en el sitio y devuelve la solución.
+    """
+    n = diag.shape[1]
+
+    # Eliminación hacia adelante
+    for i in range(1, n):
+        factor = lower[:, i] / diag[:, i - 1]
+        diag[:, i] -= factor * upper[:, i - 1]
+        rhs[:, i] -= factor[:, None] * rhs[:, i - 1]
+
+    # Sustitución hacia atrás
+    s = np.empty_like(rhs)
+    s[:, -1] = rhs[:, -1] / diag[:, -1, None]
+    for i in range(n - 2, -1, -1):
+        s[:, i] = (rhs[:, i] - upper[:, i, None] * s[:, i + 1]) / diag[:, i, None]
+    return s
+
+
+# ---------------------------------------------------------------------------------
+#                               KERNELS COMPILADOS
+# ---------------------------------------------------------------------------------
+# Misma aritmética operación a operación que las referencias (sin fastmath), de
+# modo que pueden ser idénticos bit a bit; la comprobación de _select lo decide.
+
+def _cache_enabled():
+    """
+    Caché en disco de numba solo con NUMBA_CACHE_DIR escribible
+
+    Sin esa variable numba escribe junto al código fuente, que en despliegue
+    puede ser de solo lectura o compartido entre versiones.
+    """
+    cache_dir = os.getenv('NUMBA_CACHE_DIR')
+    if not cache_dir:
+        return False
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+    except OSError:
+        return False
+    return os.access(cache_dir, os.W_OK)
+
+
+def _compile_kernels():
+    jit = numba.njit(cache=_cache_enabled(), nogil=True)
+
+    @jit
+    def segment_max_gap(times_ns, lo, hi):
+        max_gap = np.zeros(len(lo))
+        for w in range(len(lo)):
+            best = 0.0
+            for i in range(lo[w], hi[w] - 1):
+                gap = (times_ns[i + 1] - times_ns[i]) / 1e9
+                if i == lo[w] or gap > best:
+                    best = gap
+            max_gap[w] = best
+        return max_gap
+
+    @jit
+    def count_sign_changes(X):
+        n_windows, n_timesteps, n_channels = X.shape
+        counts = np.zeros((n_windows, n_channels), dtype=np.int64)
+        for w in range(n_windows):
+            for c in range(n_channels):
+                previous = np.signbit(X[w, 0, c])
+                total = 0
+                for t in range(1, n_timesteps):
+                    current = np.signbit(X[w, t, c])
+                    if current != previous:
+                        total += 1
+                    previous = current
+                counts[w, c] = total
+        return counts
+
+    @jit
+    def run_bounds(codes):
+        n = len(codes)
+        starts = np.empty(n, dtype=np.int64)
+        n_runs = 0
+        for i in range(n):
+            if i == 0 or codes[i] != codes[i - 1]:
+                starts[n_runs] = i
+                n_runs += 1
+        run_lo = starts[:n_runs].copy()
+        run_hi = np.empty(n_runs, dtype=np.int64)
+        for r in range(n_runs - 1):
+            run_hi[r] = run_lo[r + 1]
+        if n_runs > 0:
+            run_hi[n_runs - 1] = n
+        return run_lo, run_hi
+
+    @jit
+    def solve_tridiagonal(lower, diag, upper, rhs):
+        n_windows, n = diag.shape
+        n_channels = rhs.shape[2]
+        s = np.empty_like(rhs)
+        for w in range(n_windows):
+            for i in range(1, n):
+                factor = lower[w, i] / diag[w, i - 1]
+                diag[w, i] -= factor * upper[w, i - 1]
+                for c in range(n_channels):
+                    rhs[w, i, c] -= factor * rhs[w, i - 1, c]
+            for c in range(n_channels):
+                s[w, n - 1, c] = rhs[w, n - 1, c] / diag[w, n - 1]
+            for i in range(n - 2, -1, -1):
+                for c in range(n_channels):
+                    s[w, i, c] = (rhs[w, i, c] - upper[w, i] * s[w, i + 1, c]) / diag[w, i]
+        return s
+
+    return {
+        'segment_max_gap': segment_max_gap,
+        'count_sign_changes': count_sign_changes,
+        'run_bounds': run_bounds,
+        'solve_tridiagonal': solve_tridiagonal,
+    }
+
+
+# ---------------------------------------------------------------------------------
+#                               SELECCIÓN DE BACKEND
+# ---------------------------------------------------------------------------------
+
+REFERENCE_KERNELS = {
+    'segment_max_gap': _segment_max_gap_numpy,
+    'count_sign_changes': _count_sign_changes_numpy,
+    'run_bounds': _run_bounds_numpy,
+    'solve_tridiagonal': _solve_tridiagonal_numpy,
+}
+
+
+# Tipos de coma flotante que llegan a los kernels (el pipeline trabaja en float32)
+CHECK_DTYPES = (np.float32, np.float64)
+
+
+def _check_cases(name):
+    """
+    Entradas fijas con casos límite (ventanas vacías, de una muestra, NaN, ±0)
+
+    Una por cada combinación de tipos con que se llama al kernel: numba
+    compila una especialización por tipo y cada una se comprueba por separado.
+    """
+    rng = np.random.default_rng(0)
+
+    if name == 'segment_max_gap':
+        times_ns = np.cumsum(rng.integers(1, 2_000_000_000, 500)).astype(np.int64)
+        lo = np.array([0, 0, 3, 10, 499, 100, 250], dtype=np.int64)
+        hi = np.array([0, 1, 4, 60, 500, 400, 500], dtype=np.int64)
+        return [(times_ns, lo, hi)]
+
+    if name == 'count_sign_changes':
+        X = rng.normal(size=(40, 33, 6))
+        X[0, ::2] = 0.0
+        X[1, ::3] = -0.0
+        X[2, 5] = np.nan
+        return [(X.astype(dtype),) for dtype in CHECK_DTYPES]
+
+    if name == 'run_bounds':
+        return [(np.repeat(rng.integers(0, 4, 60), rng.integers(1, 5, 60)).astype(np.int64),)]
+
+    # Sistemas tridiagonales como los de la spline not-a-knot: los coeficientes
+    # salen de los tiempos y el lado derecho de los valores, con tipos independientes
+    n_windows, n, n_channels = 30, 12, 3
+    diag = rng.uniform(1, 3, (n_windows, n))
+    lower = rng.uniform(0, 1, (n_windows, n))
+    upper = rng.uniform(0, 1, (n_windows, n))
+    rhs = rng.normal(size=(n_windows, n, n_channels))
+    return [
+        (lower.astype(coef_dtype), diag.astype(coef_dtype), upper.astype(coef_dtype), rhs.astype(value_dtype))
+        for coef_dtype in CHECK_DTYPES for value_dtype in CHECK_DTYPES
+    ]
+
+
+def _same_bits(a, b):
+    if isinstance(a, tuple):
+        return len(a) == len(b) and all(_same_bits(x, y) for x, y in zip(a, b))
+    a, b = np.asarray(a), np.asarray(b)
+    return a.shape == b.shape and a.dtype == b.dtype and a.tobytes() == b.tobytes()
+
+
+def _select():
+    """
+    Elige por kernel el compilado solo si reproduce bit a bit la referencia NumPy
+
+    HAR_KERNEL_BACKEND=numpy fuerza las referencias; sin numba también se usan.
+    """
+    selected = dict(REFERENCE_KERNELS)
+    backends = {name: 'numpy' for name in REFERENCE_KERNELS}
+
+    if numba is None or os.getenv('HAR_KERNEL_BACKEND', 'auto').lower() == 'numpy':
+        return selected, backends
+
+    try:
+        compiled = _compile_kernels()
+    except Exception as e:
+        logger.warning(f"No se pudieron compilar los kernels numba: {e}")
+        return selected, backends
+
+    for name, reference in REFERENCE_KERNELS.items():
+        try:
+            # Copias: solve_tridiagonal modifica sus entradas
+            identical = all(
+                _same_bits(reference(*[np.copy(arg) for arg in case]),
+                           compiled[name](*[np.copy(arg) for arg in case]))
+                for case in _check_cases(name)
+            )
+        except Exception as e:
+            logger.warning(f"Kernel numba {name} descartado: {e}")
+            continue
+
+        if identical:
+            selected[name] = compiled[name]
+            backends[name] = 'numba'
+        else:
+            logger.warning(f"Kernel numba {name} no es idéntico a la referencia NumPy; se usa NumPy")
+
+    return selected, backends
+
+
+_KERNELS, KERNEL_BACKENDS = _select()
+logger.debug("Backends de kernels: {}", KERNEL_BACKENDS)
+
+segment_max_gap = _KERNELS['segment_max_gap']
+count_sign_changes = _KERNELS['count_sign_changes']
+run_bounds = _KERNELS['run_bounds']
+solve_tridiagonal = _KERNELS['solve_tridiagonal']
@@ -4,6 +4,14 @@ import numpy as np
 import warnings
 from scipy.interpolate import interp1d
 from scipy import signal
+from loguru import logger
+from logic.windowing import (
+    compute_window_bounds, validate_windows_batch, quality_gate_batch,
+    REASON_VALID, WINDOW_METADATA_DTYPE
+)
+from logic.window_cache import resample_windows_cached
+from logic.alignment import align_gyro_to_accel, match_nearest
+from logic.windowing_report import WindowingReport
 
 
 def prepare_sensor_dataframe(df, sensor_type):
@@ -27,43 +35,109 @@ def prepare_sensor_dataframe(df, sensor_type):
     df_clean = df_clean.dropna(subset=['X', 'Y', 'Z', 'Timestamp'])
     df_clean = df_clean.sort_values('Timestamp').reset_index(drop=True)
     
-    print(f"  {sensor_type.upper()} preparado: {len(df_clean)} muestras")
+    return df_clean
+
+
+def prepare_sensor_dataframe_polars(df, sensor_type):
+    """Prepara y limpia DataFrame de sensor sin salir de Polars"""
+    if df is None:
+        return None
+    
+    lazy_df = df.lazy() if isinstance(df, pl.DataFrame) else pl.from_pandas(df).lazy()
+    
+    # Asegurar timestamp en nanosegundos: las cadenas se parsean (como
+    # pd.to_datetime), los tipos numéricos y temporales se convierten
+    if lazy_df.collect_schema()['Timestamp'] == pl.String:
+        timestamp = pl.col('Timestamp').str.to_datetime(time_unit='ns')
+    else:
+        timestamp = pl.col('Timestamp').cast(pl.Datetime('ns'))
+    
+    # Limpiar y ordenar una sola vez
+    df_clean = (
+        lazy_df
+        .with_columns(timestamp)
+        .drop_nulls(subset=['X', 'Y', 'Z', 'Timestamp'])
+        .filter(pl.all_horizontal(pl.col(['X', 'Y', 'Z']).is_not_nan()))  # dropna también elimina NaN
+        .sort(['Subject-id', 'Activity Label', 'Timestamp'])
+        .collect()
+    )
     
     return df_clean
 
 
-def synchronize_multimodal_data(df_accel, df_gyro, sync_tolerance_ms):
+def split_sensor_groups(df):
+    """
+    Divide un DataFrame preparado (Pandas o Polars) por usuario y actividad
+    
+    Returns:
+        dict {(user_id, activity): (timestamps_ns, valores_xyz)} con arrays NumPy
+    """
+    groups = {}
+    
+    if isinstance(df, pl.DataFrame):
+        partitions = df.partition_by(
+            ['Subject-id', 'Activity Label'], maintain_order=True, as_dict=True
+        )
+        for key, part in partitions.items():
+            groups[key] = (
+                part['Timestamp'].cast(pl.Int64).to_numpy(),
+                part.select(['X', 'Y', 'Z']).to_numpy()
+            )
+        return groups
+    
+    for key, group in df.groupby(['Subject-id', 'Activity Label']):
+        groups[key] = (
+            group['Timestamp'].astype('int64').to_numpy(),
+            group[['X', 'Y', 'Z']].to_numpy()
+        )
+    return groups
+
+
+def synchronize_multimodal_data(df_accel, df_gyro, sync_tolerance_ms, report=None):
     """
     Sincroniza datos de acelerómetro y giroscopio con tolerancia temporal optimizada
+    
+    Recorta ambos sensores al rango temporal común y empareja cada muestra de
+    acelerómetro con el giroscopio más cercano dentro de `sync_tolerance_ms`
+    (ver align_gyro_to_accel): el giroscopio devuelto comparte la rejilla
+    temporal del acelerómetro.
+    
+    Args:
+        report: WindowingReport opcional donde registrar la tasa de emparejamiento
     """
     
-    # Convertir timestamps a nanosegundos para precisión
-    accel_times_ns = df_accel['Timestamp'].astype('int64')
-    gyro_times_ns = df_gyro['Timestamp'].astype('int64')
+    if len(df_accel) == 0 or len(df_gyro) == 0:
+        return df_accel, df_gyro.head(0)
     
-    print(f"  📊 Datos originales:")
-    print(f"    Acelerómetro: {len(df_accel):,} muestras")
-    print(f"    Giroscopio: {len(df_gyro):,} muestras")
+    # Convertir timestamps a nanosegundos para precisión
+    if isinstance(df_accel, pl.DataFrame):
+        accel_times_ns = df_accel['Timestamp'].cast(pl.Int64)
+        gyro_times_ns = df_gyro['Timestamp'].cast(pl.Int64)
+    else:
+        accel_times_ns = df_accel['Timestamp'].astype('int64')
+        gyro_times_ns = df_gyro['Timestamp'].astype('int64')
     
     # Encontrar rango temporal común
     common_start = max(accel_times_ns.min(), gyro_times_ns.min())
     common_end = min(accel_times_ns.max(), gyro_times_ns.max())
     
-    print(f"  ⏰ Rango temporal común: {(common_end - common_start) / 1e9:.1f}s")
-    
     # Filtrar datos al rango común
     accel_mask = (accel_times_ns >= common_start) & (accel_times_ns <= common_end)
     gyro_mask = (gyro_times_ns >= common_start) & (gyro_times_ns <= common_end)
     
-    df_accel_sync = df_accel[accel_mask].copy()
-    df_gyro_sync = df_gyro[gyro_mask].copy()
+    if isinstance(df_accel, pl.DataFrame):
+        df_accel_sync = df_accel.filter(accel_mask)
+        df_gyro_sync = df_gyro.filter(gyro_mask)
+    else:
+        df_accel_sync = df_accel[accel_mask].copy()
+        df_gyro_sync = df_gyro[gyro_mask].copy()
     
-    print(f"  📊 Datos sincronizados:")
-    print(f"    Acelerómetro: {len(df_accel_sync):,} muestras")
-    print(f"    Giroscopio: {len(df_gyro_sync):,} muestras")
+    # Emparejar giroscopio con acelerómetro sobre una rejilla común
+    df_gyro_sync, stats = align_gyro_to_accel(df_accel_sync, df_gyro_sync, sync_tolerance_ms)
     
-    # Análisis rápido de calidad de sincronización
-    # analyze_sync_quality_fast(df_accel_sync, df_gyro_sync, sync_tolerance_ms)
+    if report is not None:
+        report.sync_pairs_matched += stats['matched']
+        report.sync_pairs_total += stats['total']
     
     return df_accel_sync, df_gyro_sync
 
@@ -71,10 +145,10 @@ def synchronize_multimodal_data(df_accel, df_gyro, sync_tolerance_ms):
 def analyze_sync_quality_fast(df_accel, df_gyro, tolerance_ms, sample_size=10000):
     """Análisis rápido de calidad de sincronización"""
     
-    print(f"  🔍 Análisis de sincronización (muestra de {sample_size:,})...")
+    logger.debug("🔍 Análisis de sincronización (muestra de {:,})...", sample_size)
     
-    accel_times = df_accel['Timestamp'].values.astype('int64')
-    gyro_times = df_gyro['Timestamp'].values.astype('int64')
+    accel_times = df_accel['Timestamp'].to_numpy().astype('int64')
+    gyro_times = np.sort(df_gyro['Timestamp'].to_numpy().astype('int64'))
     
     # Muestreo estratificado
     total_accel = len(accel_times)
@@ -84,22 +158,18 @@ def analyze_sync_quality_fast(df_accel, df_gyro, tolerance_ms, sample_size=10000
     else:
         accel_sample = accel_times
     
-    # Análisis vectorizado en muestra
-    tolerance_ns = tolerance_ms * 1e6
-    diffs_ns = np.abs(accel_sample[:, None] - gyro_times[None, :])
-    min_diffs_ns = np.min(diffs_ns, axis=1)
-    min_diffs_ms = min_diffs_ns / 1e6
-    
-    valid_diffs = min_diffs_ms[min_diffs_ms <= tolerance_ms]
+    # Vecino más cercano por búsqueda binaria (sin matriz de distancias)
+    _, min_diffs_ns, matched = match_nearest(accel_sample, gyro_times, tolerance_ms * 1e6)
+    valid_diffs = min_diffs_ns[matched] / 1e6
     matched_pairs = len(valid_diffs)
     
     if matched_pairs > 0:
         sync_rate = (matched_pairs / len(accel_sample)) * 100
         avg_diff = float(np.mean(valid_diffs))
         
-        print(f"    ✅ Sincronización: {sync_rate:.1f}% (diff. promedio: {avg_diff:.1f}ms)")
+        logger.debug("✅ Sincronización: {:.1f}% (diff. promedio: {:.1f}ms)", sync_rate, avg_diff)
     else:
-        print(f"    ⚠️ Baja sincronización: <{tolerance_ms}ms")
+        logger.debug("⚠️ Baja sincronización: <{}ms", tolerance_ms)
 
 
 def process_multimodal_window_robust(window_accel, window_gyro, target_timesteps,
@@ -279,18 +349,19 @@ def validate_window_data(window_data_df, window_seconds, sampling_rate,
     }
 
 
-def resample_window_robust(sensor_data, timestamps, target_timesteps, window_seconds):
-    """Versión robusta de remuestreo con múltiples estrategias"""
+def resample_window_robust(sensor_data, timestamps, target_timesteps, window_seconds,
+                           dtype=np.float32):
+    """Versión robusta de remuestreo con múltiples estrategias (salida en `dtype`)"""
     if len(sensor_data) == 0:
-        return np.zeros((target_timesteps, 3))
+        return np.zeros((target_timesteps, 3), dtype=dtype)
     
     original_timesteps = len(sensor_data)
     
     if original_timesteps == target_timesteps:
-        return sensor_data.copy()
+        return sensor_data.astype(dtype)
     
     if original_timesteps == 1:
-        return np.tile(sensor_data[0], (target_timesteps, 1))
+        return np.tile(sensor_data[0], (target_timesteps, 1)).astype(dtype)
     
     try:
         if hasattr(timestamps[0], 'timestamp'):
@@ -309,7 +380,7 @@ def resample_window_robust(sensor_data, timestamps, target_timesteps, window_sec
             relative_times = np.linspace(0, 1, len(time_seconds))
         
         target_times = np.linspace(0, 1, target_timesteps)
-        resampled_data = np.zeros((target_timesteps, 3))
+        resampled_data = np.zeros((target_timesteps, 3), dtype=dtype)
         
         for axis in range(3):
             try:
@@ -338,7 +409,7 @@ def resample_window_robust(sensor_data, timestamps, target_timesteps, window_sec
         return resampled_data
     
     except Exception:
-        return np.tile(sensor_data[0], (target_timesteps, 1))
+        return np.tile(sensor_data[0], (target_timesteps, 1)).astype(dtype)
 
 
 def is_window_quality_good(resampled_window, max_std_threshold=50.0):
@@ -360,7 +431,9 @@ def is_window_quality_good(resampled_window, max_std_threshold=50.0):
 def create_multimodal_windows_robust(df_accel, df_gyro=None, window_seconds=5, 
                                    overlap_percent=50, sampling_rate=20, 
                                    target_timesteps=250, min_data_threshold=0.8, 
-                                   max_gap_seconds=1.0, sync_tolerance_ms=50):
+                                   max_gap_seconds=1.0, sync_tolerance_ms=50,
+                                   engine='pandas', return_report=False, dtype=np.float32,
+                                   cache=None):
     """
     Versión MULTIMODAL ROBUSTA: Crea ventanas sincronizadas de acelerómetro y giroscopio
     
@@ -373,195 +446,147 @@ def create_multimodal_windows_robust(df_accel, df_gyro=None, window_seconds=5,
         target_timesteps: Número objetivo de timesteps por ventana (default: 250)
         min_data_threshold: Umbral mínimo de datos válidos (0.5 = 50%)
         max_gap_seconds: Máximo gap permitido en segundos (1.0s)
-        sync_tolerance_ms: Tolerancia de sincronización en milisegundos (50ms)
+        sync_tolerance_ms: Distancia máxima para emparejar cada muestra de
+            acelerómetro con el giroscopio más cercano, en milisegundos (50ms)
+        engine: 'pandas' (default) o 'polars' para preparar, ordenar y agrupar
+            los datos en Polars sin convertirlos a pandas
+        return_report: Si True, devuelve además un WindowingReport con conteos
+            por motivo de rechazo y tiempos por etapa
+        dtype: Tipo de dato de X desde la primera asignación (default: float32,
+            el que consume el modelo, sin conversiones posteriores)
+        cache: WindowCache opcional; las ventanas cuyas muestras crudas ya se
+            remuestrearon (reenvíos, reprocesados) se sirven desde la caché
         
     Returns:
         X: Array con forma (n_windows, timesteps, channels) - datos de ventanas
         y: Array con etiquetas de actividad
         subjects: Array con IDs de usuario
-        metadata: DataFrame con información de las ventanas
+        metadata: Array estructurado (WINDOW_METADATA_DTYPE) con información de
+            las ventanas; ver metadata_to_dataframe para obtener un DataFrame
+        report: WindowingReport (solo si return_report=True)
     """
     
     # Determinar número de canales objetivo
     if df_gyro is not None:
         target_channels = 6  # 3 accel + 3 gyro
-        print(f"🔧 CONFIGURACIÓN MULTIMODAL (Accel + Gyro):")
         mode = 'multimodal'
     else:
         target_channels = 3  # Solo accel
-        print(f"🔧 CONFIGURACIÓN MONOMODAL (Solo Accel):")
         mode = 'monomodal'
     
-    print(f"  Duración: {window_seconds}s")
-    print(f"  Timesteps objetivo: {target_timesteps}")
-    print(f"  Canales objetivo: {target_channels}")
-    print(f"  Frecuencia de muestreo: {sampling_rate}Hz")
-    print(f"  Solapamiento: {overlap_percent}%")
-    print(f"  Umbral mínimo de datos: {min_data_threshold*100:.1f}%")
-    print(f"  Máximo gap permitido: {max_gap_seconds}s")
-    print(f"  Tolerancia sincronización: {sync_tolerance_ms}ms")
+    report = WindowingReport(mode=mode)
     
     # Preparar DataFrames
-    df_accel_clean = prepare_sensor_dataframe(df_accel, 'accel')
-    
-    if df_gyro is not None:
-        df_gyro_clean = prepare_sensor_dataframe(df_gyro, 'gyro')
-        
-        # Sincronizar datasets si ambos están disponibles
-        print(f"\n🔄 SINCRONIZANDO SENSORES...")
-        df_accel_sync, df_gyro_sync = synchronize_multimodal_data(
-            df_accel_clean, df_gyro_clean, sync_tolerance_ms
-        )
+    if engine == 'polars':
+        prepare = prepare_sensor_dataframe_polars
+    elif engine == 'pandas':
+        prepare = prepare_sensor_dataframe
     else:
-        df_accel_sync = df_accel_clean
-        df_gyro_sync = None
+        raise ValueError(f"Engine no soportado: {engine}")
     
-    # Calcular parámetros temporales
-    window_duration_ns = int(window_seconds * 1e9)
-    step_duration_ns = int(window_duration_ns * (100 - overlap_percent) / 100)
+    with report.stage('prepare'):
+        df_accel_clean = prepare(df_accel, 'accel')
+        df_gyro_clean = prepare(df_gyro, 'gyro') if df_gyro is not None else None
     
-    print(f"\n📏 PARÁMETROS TEMPORALES:")
-    print(f"  Duración de ventana: {window_seconds}s")
-    print(f"  Paso entre ventanas: {step_duration_ns / 1e9:.2f}s")
+    # Sincronizar datasets si ambos están disponibles
+    with report.stage('sync'):
+        if df_gyro_clean is not None:
+            df_accel_sync, df_gyro_sync = synchronize_multimodal_data(
+                df_accel_clean, df_gyro_clean, sync_tolerance_ms, report=report
+            )
+        else:
+            df_accel_sync = df_accel_clean
+            df_gyro_sync = None
+        
+        # Separar en arrays por usuario y actividad
+        accel_groups = split_sensor_groups(df_accel_sync)
+        gyro_groups = split_sensor_groups(df_gyro_sync) if df_gyro_sync is not None else {}
     
-    # Almacenar resultados con forma consistente
-    X_windows = []
-    y_labels = []
-    subjects_list = []
-    metadata_list = []
+    # Almacenar resultados por grupo (se concatenan al final)
+    X_parts = []
+    y_parts = []
+    subjects_parts = []
+    metadata_parts = []
     
-    total_windows_attempted = 0
-    total_windows_created = 0
-    windows_with_gyro = 0
-    windows_accel_only = 0
+    min_samples = window_seconds * sampling_rate
     
     # Procesar por usuario y actividad
-    for (user_id, activity), accel_group in df_accel_sync.groupby(['Subject-id', 'Activity Label']):
+    for (user_id, activity), (accel_times_ns, accel_values) in accel_groups.items():
         
         # Obtener grupo correspondiente de giroscopio
-        if df_gyro_sync is not None:
-            gyro_group = df_gyro_sync[
-                (df_gyro_sync['Subject-id'] == user_id) & 
-                (df_gyro_sync['Activity Label'] == activity)
-            ]
-            if len(gyro_group) == 0:
-                print(f"⚠️ Usuario {user_id}, {activity}: Sin datos de giroscopio correspondientes")
-                gyro_group = None
-        else:
-            gyro_group = None
+        gyro_times_ns, gyro_values = gyro_groups.get((user_id, activity), (None, None))
         
-        print(f"\n👤 Usuario {user_id}, {activity}:")
-        print(f"   Accel: {len(accel_group)} muestras")
-        if gyro_group is not None:
-            print(f"   Gyro: {len(gyro_group)} muestras")
+        report.accel_samples += len(accel_times_ns)
+        if gyro_times_ns is not None:
+            report.gyro_samples += len(gyro_times_ns)
         
         # Verificar datos mínimos
-        min_samples = window_seconds * sampling_rate
-        if len(accel_group) < min_samples:
-            print(f"   ⚠️ Muy pocos datos de acelerómetro ({len(accel_group)} < {min_samples})")
+        if len(accel_times_ns) < min_samples:
+            report.groups_skipped += 1
             continue
         
         # Crear ventanas multimodales
-        windows_data = create_synchronized_windows_robust(
-            accel_group, gyro_group, window_seconds, overlap_percent,
-            target_timesteps, min_data_threshold, max_gap_seconds,
-            sync_tolerance_ms, sampling_rate, target_channels, mode
+        X_group, metadata_group = create_synchronized_windows_arrays(
+            accel_times_ns, accel_values, gyro_times_ns, gyro_values,
+            window_seconds, overlap_percent, target_timesteps,
+            min_data_threshold, max_gap_seconds, sampling_rate, target_channels,
+            report=report, dtype=dtype, cache=cache
         )
         
-        # Procesar ventanas creadas
-        window_count = 0
-        for window_data in windows_data:
-            total_windows_attempted += 1
-            
-            if window_data['is_valid']:
-                # VERIFICAR FORMA CONSISTENTE
-                window_shape = window_data['sensor_data'].shape
-                expected_shape = (target_timesteps, target_channels)
-                
-                if window_shape == expected_shape:
-                    X_windows.append(window_data['sensor_data'])
-                    y_labels.append(activity)
-                    subjects_list.append(user_id)
-                    
-                    # Contar tipos de ventana
-                    if window_data['sensor_data'].shape[1] == 6:
-                        windows_with_gyro += 1
-                    else:
-                        windows_accel_only += 1
-                    
-                    # Metadata detallada
-                    metadata_list.append({
-                        'Subject-id': user_id,
-                        'Activity Label': activity,
-                        'window_start': window_data['start_time'],
-                        'window_end': window_data['end_time'],
-                        'window_idx': window_count,
-                        'accel_samples': window_data['accel_samples'],
-                        'gyro_samples': window_data.get('gyro_samples', 0),
-                        'sync_quality': window_data.get('sync_quality', 1.0),
-                        'channels': target_channels,
-                        'actual_channels': window_data['sensor_data'].shape[1],
-                        'data_coverage': window_data['data_coverage'],
-                        'max_gap_s': window_data['max_gap'],
-                        'resampled_timesteps': target_timesteps
-                    })
-                    
-                    window_count += 1
-                    total_windows_created += 1
-                else:
-                    print(f"   ⚠️ Ventana con forma incorrecta: {window_shape} vs {expected_shape}")
+        report.groups_processed += 1
+        report.windows_attempted += len(metadata_group)
+        report.add_reasons(metadata_group['reason'])
         
-        print(f"   ✅ Creadas {window_count} ventanas válidas")
-    
-    # Resumen y resultados
-    print(f"\n📊 RESUMEN MULTIMODAL:")
-    print(f"  Ventanas intentadas: {total_windows_attempted}")
-    print(f"  Ventanas creadas: {total_windows_created}")
-    print(f"  Ventanas con gyro: {windows_with_gyro}")
-    print(f"  Ventanas solo accel: {windows_accel_only}")
-    if total_windows_attempted > 0:
-        print(f"  Tasa de éxito: {(total_windows_created/total_windows_attempted)*100:.1f}%")
-    
-    if len(X_windows) > 0:
-        # VERIFICAR CONSISTENCIA ANTES DE CREAR ARRAY
-        shapes = [w.shape for w in X_windows]
-        unique_shapes = list(set(shapes))
+        # Conservar solo la metadata de las ventanas aceptadas (alineada con X)
+        metadata_group = metadata_group[metadata_group['reason'] == REASON_VALID]
+        window_count = len(X_group)
         
-        if len(unique_shapes) > 1:
-            print(f"⚠️ ADVERTENCIA: Formas inconsistentes detectadas: {unique_shapes}")
-            print("Filtrando solo ventanas con forma correcta...")
-            
-            # Filtrar solo ventanas con la forma correcta
-            correct_shape = (target_timesteps, target_channels)
-            valid_indices = [i for i, shape in enumerate(shapes) if shape == correct_shape]
-            
-            X_windows = [X_windows[i] for i in valid_indices]
-            y_labels = [y_labels[i] for i in valid_indices]
-            subjects_list = [subjects_list[i] for i in valid_indices]
-            metadata_list = [metadata_list[i] for i in valid_indices]
-            
-            print(f"Ventanas filtradas: {len(X_windows)}")
-        
-        if len(X_windows) > 0:
-            X = np.array(X_windows)
-            y = np.array(y_labels)
-            subjects = np.array(subjects_list)
-            metadata_df = pd.DataFrame(metadata_list)
-            
-            print(f"\n✅ RESULTADO FINAL MULTIMODAL:")
-            print(f"  Forma de X: {X.shape} (samples, timesteps, channels)")
-            print(f"  Canales: {X.shape[2]} ({'accel_xyz + gyro_xyz' if target_channels == 6 else 'solo accel_xyz'})")
-            print(f"  Total ventanas: {len(X)}")
-            print(f"  Usuarios únicos: {len(np.unique(subjects))}")
-            print(f"  Actividades: {sorted(np.unique(y))}")
-            
-            return X, y, subjects, metadata_df
+        # Contar tipos de ventana según si el giroscopio aportó datos válidos
+        if target_channels == 6:
+            with_gyro = int(np.count_nonzero(metadata_group['sync_quality'] == 1.0))
         else:
-            print("❌ No quedaron ventanas válidas después del filtrado")
-            return None, None, None, None
+            with_gyro = 0
+        report.windows_created += window_count
+        report.windows_with_gyro += with_gyro
+        report.windows_accel_only += window_count - with_gyro
+        
+        X_parts.append(X_group)
+        y_parts.append(np.full(window_count, activity))
+        subjects_parts.append(np.full(window_count, user_id))
+        metadata_parts.append(metadata_group)
+    
+    report.log()
+    
+    if report.windows_created > 0:
+        X = np.concatenate(X_parts)
+        y = np.concatenate(y_parts)
+        subjects = np.concatenate(subjects_parts)
+        metadata = np.concatenate(metadata_parts)
     else:
-        print("❌ No se crearon ventanas válidas")
-        return None, None, None, None
+        X, y, subjects, metadata = None, None, None, None
+    
+    if return_report:
+        return X, y, subjects, metadata, report
+    return X, y, subjects, metadata
+
+
+def metadata_to_dataframe(metadata, y=None, subjects=None):
+    """
+    Convierte la metadata columnar de las ventanas en un DataFrame de pandas
+    
+    Útil para análisis y entrenamiento; convierte los timestamps epoch-ns en
+    datetime con una sola operación vectorizada.
+    """
+    metadata_df = pd.DataFrame(metadata)
+    metadata_df['window_start'] = pd.to_datetime(metadata_df['window_start'])
+    metadata_df['window_end'] = pd.to_datetime(metadata_df['window_end'])
+    
+    if y is not None:
+        metadata_df.insert(0, 'Activity Label', y)
+    if subjects is not None:
+        metadata_df.insert(0, 'Subject-id', subjects)
+    
+    return metadata_df
 
 
 def create_synchronized_windows_robust(accel_group, gyro_group, window_seconds, 
@@ -571,63 +596,164 @@ def create_synchronized_windows_robust(accel_group, gyro_group, window_seconds,
                                      target_channels, mode):
     """Crea ventanas sincronizadas de múltiples sensores con forma consistente"""
     
-    windows_data = []
+    accel_times_ns = accel_group['Timestamp'].astype('int64').to_numpy()
+    accel_values = accel_group[['X', 'Y', 'Z']].to_numpy()
+    
+    if gyro_group is not None:
+        gyro_times_ns = gyro_group['Timestamp'].astype('int64').to_numpy()
+        gyro_values = gyro_group[['X', 'Y', 'Z']].to_numpy()
+    else:
+        gyro_times_ns, gyro_values = None, None
+    
+    return create_synchronized_windows_arrays(
+        accel_times_ns, accel_values, gyro_times_ns, gyro_values,
+        window_seconds, overlap_percent, target_timesteps,
+        min_data_threshold, max_gap_seconds, sampling_rate, target_channels
+    )
+
+
+def create_synchronized_windows_arrays(accel_times_ns, accel_values, gyro_times_ns, gyro_values,
+                                       window_seconds, overlap_percent, target_timesteps,
+                                       min_data_threshold, max_gap_seconds, sampling_rate,
+                                       target_channels, report=None, start_time_ns=None,
+                                       dtype=np.float32, cache=None):
+    """
+    Crea ventanas sincronizadas a partir de arrays NumPy de un grupo usuario/actividad
+    
+    Args:
+        accel_times_ns: Timestamps int64 (ns) del acelerómetro, orden ascendente
+        accel_values: Array (n_muestras, 3) con X, Y, Z del acelerómetro
+        gyro_times_ns: Timestamps int64 (ns) del giroscopio o None
+        gyro_values: Array (n_muestras, 3) del giroscopio o None
+        report: WindowingReport opcional donde acumular tiempos por etapa
+        start_time_ns: Inicio de la primera ventana; por defecto el primer
+            timestamp (el ventaneo en streaming lo usa para continuar la rejilla)
+        dtype: Tipo de dato de las ventanas remuestreadas y de X_group
+        cache: WindowCache opcional con ventanas ya remuestreadas
+    
+    Returns:
+        X_group: Array (n_aceptadas, target_timesteps, target_channels)
+        metadata: Array estructurado WINDOW_METADATA_DTYPE con una fila por
+            ventana intentada; las aceptadas tienen reason == REASON_VALID
+    """
+    
+    if report is None:
+        report = WindowingReport()
     
     # Parámetros temporales
     window_duration_ns = int(window_seconds * 1e9)
     step_duration_ns = int(window_duration_ns * (100 - overlap_percent) / 100)
     
-    # Rango temporal
-    accel_times_ns = accel_group['Timestamp'].astype('int64')
-    start_time_ns = accel_times_ns.min()
-    end_time_ns = accel_times_ns.max()
+    # Rango temporal (timestamps ya ordenados al preparar el DataFrame)
+    if start_time_ns is None:
+        start_time_ns = accel_times_ns[0]
+    end_time_ns = accel_times_ns[-1]
+    
+    has_gyro = gyro_times_ns is not None and len(gyro_times_ns) > 0
+    if has_gyro:
+        start_time_ns = max(start_time_ns, gyro_times_ns[0])
+        end_time_ns = min(end_time_ns, gyro_times_ns[-1])
+    
+    # Calcular todos los límites de ventana de una sola vez
+    with report.stage('slice'):
+        window_starts_ns, accel_lo, accel_hi = compute_window_bounds(
+            accel_times_ns, start_time_ns, end_time_ns,
+            window_duration_ns, step_duration_ns
+        )
     
-    if gyro_group is not None:
-        gyro_times_ns = gyro_group['Timestamp'].astype('int64')
-        start_time_ns = max(start_time_ns, gyro_times_ns.min())
-        end_time_ns = min(end_time_ns, gyro_times_ns.max())
+        if has_gyro:
+            _, gyro_lo, gyro_hi = compute_window_bounds(
+                gyro_times_ns, start_time_ns, end_time_ns,
+                window_duration_ns, step_duration_ns
+            )
     
-    # Crear ventanas deslizantes
-    current_start_ns = start_time_ns
+    n_windows = len(window_starts_ns)
+    window_ends_ns = window_starts_ns + window_duration_ns
+    use_gyro = target_channels == 6 and has_gyro
     
-    while current_start_ns + window_duration_ns <= end_time_ns:
-        current_end_ns = current_start_ns + window_duration_ns
-        
-        # Extraer datos de acelerómetro para esta ventana
-        accel_mask = (
-            (accel_times_ns >= current_start_ns) & 
-            (accel_times_ns < current_end_ns)
+    # 1. Validar todas las ventanas de una sola vez
+    with report.stage('validate'):
+        accel_checks = validate_windows_batch(
+            accel_times_ns, accel_values, accel_lo, accel_hi,
+            window_seconds, sampling_rate, min_data_threshold, max_gap_seconds
         )
-        window_accel = accel_group[accel_mask]
-        
-        # Extraer datos de giroscopio si está disponible
-        if gyro_group is not None:
-            gyro_mask = (
-                (gyro_times_ns >= current_start_ns) & 
-                (gyro_times_ns < current_end_ns)
+        accel_valid = accel_checks['reason'] == REASON_VALID
+    
+        gyro_valid = np.zeros(n_windows, dtype=bool)
+        if use_gyro:
+            gyro_checks = validate_windows_batch(
+                gyro_times_ns, gyro_values, gyro_lo, gyro_hi,
+                window_seconds, sampling_rate, min_data_threshold, max_gap_seconds
             )
-            window_gyro = gyro_group[gyro_mask]
-        else:
-            window_gyro = None
-        
-        # Validar y procesar ventana CON FORMA CONSISTENTE
-        window_data = process_multimodal_window_consistent(
-            window_accel, window_gyro, target_timesteps, 
-            window_seconds, min_data_threshold, max_gap_seconds,
-            current_start_ns, current_end_ns, sampling_rate,
-            target_channels, mode
+            gyro_valid = accel_valid & (gyro_checks['reason'] == REASON_VALID)
+    
+    # 2. Remuestrear en bloque todas las ventanas válidas
+    with report.stage('resample'):
+        accel_idx = np.flatnonzero(accel_valid)
+        accel_resampled = resample_windows_cached(
+            accel_values, accel_times_ns,
+            accel_lo[accel_idx], accel_hi[accel_idx], target_timesteps, dtype=dtype, cache=cache
         )
-        
-        windows_data.append(window_data)
-        current_start_ns += step_duration_ns
-    
-    return windows_data
+        accel_slot = np.full(n_windows, -1)
+        accel_slot[accel_idx] = np.arange(len(accel_idx))
+    
+        gyro_idx = np.flatnonzero(gyro_valid)
+        if len(gyro_idx) > 0:
+            gyro_resampled = resample_windows_cached(
+                gyro_values, gyro_times_ns,
+                gyro_lo[gyro_idx], gyro_hi[gyro_idx], target_timesteps, dtype=dtype, cache=cache
+            )
+        gyro_slot = np.full(n_windows, -1)
+        gyro_slot[gyro_idx] = np.arange(len(gyro_idx))
+    
+    # 3. Control de calidad en bloque
+    with report.stage('quality'):
+        accel_quality_ok = np.zeros(n_windows, dtype=bool)
+        accel_quality_reason = np.full(n_windows, REASON_VALID, dtype=np.uint8)
+        accel_quality_ok[accel_idx], accel_quality_reason[accel_idx] = quality_gate_batch(accel_resampled)
+    
+        gyro_success = np.zeros(n_windows, dtype=bool)
+        if len(gyro_idx) > 0:
+            gyro_success[gyro_idx], _ = quality_gate_batch(gyro_resampled)
+    
+        # 4. Ensamblar tensor de ventanas aceptadas con forma CONSISTENTE
+        #    (columnas de gyro en ceros si no es válido)
+        accepted_idx = np.flatnonzero(accel_valid & accel_quality_ok)
+        X_group = np.zeros(
+            (len(accepted_idx), target_timesteps, target_channels), dtype=dtype
+        )
+        X_group[:, :, 0:3] = accel_resampled[accel_slot[accepted_idx]]
+        gyro_rows = np.flatnonzero(gyro_success[accepted_idx])
+        if len(gyro_rows) > 0:
+            X_group[gyro_rows, :, 3:6] = gyro_resampled[gyro_slot[accepted_idx[gyro_rows]]]
+    
+    # 5. Metadata columnar de todas las ventanas intentadas
+    metadata = np.zeros(n_windows, dtype=WINDOW_METADATA_DTYPE)
+    metadata['window_start'] = window_starts_ns
+    metadata['window_end'] = window_ends_ns
+    metadata['window_idx'] = -1
+    metadata['window_idx'][accepted_idx] = np.arange(len(accepted_idx))
+    metadata['accel_samples'] = accel_hi - accel_lo
+    if has_gyro:
+        metadata['gyro_samples'] = np.where(accel_valid & ~gyro_valid, 0, gyro_hi - gyro_lo)
+    if target_channels == 6:
+        metadata['sync_quality'][accepted_idx] = np.where(gyro_success[accepted_idx], 1.0, 0.5)
+    else:
+        metadata['sync_quality'][accepted_idx] = 1.0
+    metadata['channels'] = target_channels
+    metadata['actual_channels'] = target_channels
+    metadata['data_coverage'] = accel_checks['data_coverage']
+    metadata['max_gap_s'] = accel_checks['max_gap']
+    metadata['resampled_timesteps'] = target_timesteps
+    metadata['reason'] = np.where(accel_valid, accel_quality_reason, accel_checks['reason'])
+    
+    return X_group, metadata
 
 
 def process_multimodal_window_consistent(window_accel, window_gyro, target_timesteps,
                                        window_seconds, min_data_threshold, max_gap_seconds,
                                        start_time_ns, end_time_ns, sampling_rate,
-                                       target_channels, mode):
+                                       target_channels, mode, dtype=np.float32):
     """
     Procesa una ventana multimodal con forma CONSISTENTE
     Siempre devuelve target_channels canales, rellenando con ceros si es necesario
@@ -657,7 +783,7 @@ def process_multimodal_window_consistent(window_accel, window_gyro, target_times
     
     try:
         accel_resampled = resample_window_robust(
-            accel_data, accel_timestamps, target_timesteps, window_seconds
+            accel_data, accel_timestamps, target_timesteps, window_seconds, dtype
         )
     except Exception as e:
         return {
@@ -673,7 +799,7 @@ def process_multimodal_window_consistent(window_accel, window_gyro, target_times
         }
     
     # CREAR ARRAY CON FORMA CONSISTENTE
-    final_data = np.zeros((target_timesteps, target_channels))
+    final_data = np.zeros((target_timesteps, target_channels), dtype=dtype)
     
     # Copiar datos de acelerómetro (primeras 3 columnas)
     final_data[:, 0:3] = accel_resampled
@@ -694,7 +820,7 @@ def process_multimodal_window_consistent(window_accel, window_gyro, target_times
             
             try:
                 gyro_resampled = resample_window_robust(
-                    gyro_data, gyro_timestamps, target_timesteps, window_seconds
+                    gyro_data, gyro_timestamps, target_timesteps, window_seconds, dtype
                 )
                 
                 # Verificar calidad del giroscopio
@@ -0,0 +1,178 @@
+from functools import lru_cache
+
+import numpy as np
+from scipy import signal
+
+from logic.kernels import solve_tridiagonal
+
+
+@lru_cache(maxsize=32)
+def _target_grid(target_timesteps):
+    """Rejilla objetivo normalizada [0, 1] (cacheada por número de timesteps)"""
+    grid = np.linspace(0, 1, target_timesteps)
+    grid.setflags(write=False)
+    return grid
+
+
+def resample_windows_batch(values, times_ns, lo, hi, target_timesteps, dtype=np.float32):
+    """
+    Remuestrea en bloque todas las ventanas de una serie continua
+
+    Reproduce las estrategias de `resample_window_robust` pero agrupando las
+    ventanas por número de muestras para resolverlas con pocas llamadas
+    vectorizadas:
+      - n == target_timesteps: copia directa
+      - n > target_timesteps: `signal.resample` (FFT) sobre todo el grupo
+      - 4 <= n < target_timesteps: spline cúbica not-a-knot sobre el tiempo real
+      - 2 <= n < 4: interpolación lineal sobre el tiempo real
+      - n == 1: repetición de la única muestra
+
+    Args:
+        values: Array (n_muestras, canales) de la serie continua ordenada
+        times_ns: Array int64 (n_muestras,) con timestamps en nanosegundos
+        lo: Índice inicial (inclusive) de cada ventana
+        hi: Índice final (exclusivo) de cada ventana
+        target_timesteps: Número de timesteps por ventana remuestreada
+        dtype: Tipo de dato del tensor de salida
+
+    Returns:
+        Array (n_ventanas, target_timesteps, canales)
+    """
+    values = np.asarray(values)
+    times_ns = np.asarray(times_ns, dtype=np.int64)
+    lo = np.asarray(lo, dtype=np.int64)
+    hi = np.asarray(hi, dtype=np.int64)
+
+    n_channels = values.shape[1]
+    output = np.zeros((len(lo), target_timesteps, n_channels), dtype=dtype)
+    if len(lo) == 0:
+        return output
+
+    counts = hi - lo
+    grid = _target_grid(target_timesteps)
+
+    for n in np.unique(counts):
+        slots = np.flatnonzero(counts == n)
+        if n == 0:
+            continue
+
+        # Índices (ventanas, n) de las muestras de cada ventana del grupo
+        sample_idx = lo[slots, None] + np.arange(n)
+        data = values[sample_idx].astype(np.float64)
+
+        if n == 1:
+            output[slots] = data
+        elif n == target_timesteps:
+            output[slots] = data
+        elif n > target_timesteps:
+            output[slots] = signal.resample(data, target_timesteps, axis=1)
+        else:
+            output[slots] = _interpolate_group(data, times_ns[sample_idx], grid)
+
+    return output
+
+
+def _interpolate_group(data, times_ns, grid):
+    """Interpola un grupo de ventanas con el mismo número de muestras"""
+    n_windows, n = times_ns.shape
+
+    # Tiempo relativo [0, 1] de cada ventana
+    relative_ns = times_ns - times_ns[:, :1]
+    span_ns = relative_ns[:, -1:]
+    relative_times = np.where(
+        span_ns > 0,
+        relative_ns / np.where(span_ns > 0, span_ns, 1),
+        np.linspace(0, 1, n)
+    )
+
+    result = np.empty((n_windows, len(grid), data.shape[2]))
+
+    # Timestamps repetidos: mismo fallback lineal que la versión por ventana
+    strictly_increasing = np.all(np.diff(relative_times, axis=1) > 0, axis=1)
+    for w in np.flatnonzero(~strictly_increasing):
+        for axis in range(data.shape[2]):
+            result[w, :, axis] = np.interp(grid, relative_times[w], data[w, :, axis])
+
+    ok = np.flatnonzero(strictly_increasing)
+    if len(ok) == 0:
+        return result
+
+    x = relative_times[ok]
+    y = data[ok]
+    interval = _locate_intervals(x, grid)
+
+    if n >= 4:
+        result[ok] = _cubic_not_a_knot(x, y, grid, interval)
+    else:
+        result[ok] = _linear(x, y, grid, interval)
+
+    return result
+
+
+def _locate_intervals(x, grid):
+    """Índice del intervalo [x_i, x_i+1] que contiene cada punto de la rejilla"""
+    n_windows, n = x.shape
+    # Desplazar cada fila para resolver todas las búsquedas con un solo searchsorted
+    offsets = 2.0 * np.arange(n_windows)[:, None]
+    flat_x = (x + offsets).ravel()
+    flat_grid = (grid[None, :] + offsets).ravel()
+    interval = np.searchsorted(flat_x, flat_grid, side='right').reshape(n_windows, -1) - 1
+    interval -= np.arange(n_windows)[:, None] * n
+    return np.clip(interval, 0, n - 2)
+
+
+def _linear(x, y, grid, interval):
+    rows = np.arange(x.shape[0])[:, None]
+    x0 = x[rows, interval]
+    x1 = x[rows, interval + 1]
+    t = ((grid[None, :] - x0) / (x1 - x0))[:, :, None]
+    return y[rows, interval] * (1 - t) + y[rows, interval + 1] * t
+
+
+def _cubic_not_a_knot(x, y, grid, interval):
+    """
+    Spline cúbica con condiciones not-a-knot (la misma que `interp1d(kind='cubic')`)
+    resuelta para todas las ventanas del grupo a la vez con el algoritmo de Thomas
+    """
+    dx = np.diff(x, axis=1)
+    slope = np.diff(y, axis=1) / dx[:, :, None]
+
+    # Sistema tridiagonal sobre las pendientes en los nodos
+    lower = np.zeros_like(x)
+    diag = np.zeros_like(x)
+    upper = np.zeros_like(x)
+    rhs = np.zeros_like(y)
+
+    diag[:, 1:-1] = 2 * (dx[:, :-1] + dx[:, 1:])
+    lower[:, 1:-1] = dx[:, 1:]
+    upper[:, 1:-1] = dx[:, :-1]
+    rhs[:, 1:-1] = 3 * (dx[:, 1:, None] * slope[:, :-1] + dx[:, :-1, None] * slope[:, 1:])
+
+    d = x[:, 2] - x[:, 0]
+    diag[:, 0] = dx[:, 1]
+    upper[:, 0] = d
+    rhs[:, 0] = (((dx[:, 0] + 2 * d) * dx[:, 1])[:, None] * slope[:, 0]
+                 + (dx[:, 0] ** 2)[:, None] * slope[:, 1]) / d[:, None]
+
+    d = x[:, -1] - x[:, -3]
+    diag[:, -1] = dx[:, -2]
+    lower[:, -1] = d
+    rhs[:, -1] = ((dx[:, -1] ** 2)[:, None] * slope[:, -2]
+                  + ((2 * d + dx[:, -1]) * dx[:, -2])[:, None] * slope[:, -1]) / d[:, None]
+
+    s = solve_tridiagonal(lower, diag, upper, rhs)
+
+    # Evaluar los polinomios de Hermite en la rejilla
+    rows = np.arange(x.shape[0])[:, None]
+    h = dx[rows, interval][:, :, None]
+    t = (grid[None, :] - x[rows, interval])[:, :, None]
+    y0 = y[rows, interval]
+    s0 = s[rows, interval]
+    s1 = s[rows, interval + 1]
+    m = slope[rows, interval]
+
+    c3 = (s0 + s1 - 2 * m) / h
+    c0 = c3 / h
+    c1 = (m - s0) / h - c3
+
+    return ((c0 * t + c1) * t + s0) * t + y0
@@ -0,0 +1,157 @@
+import math
+from fractions import Fraction
+
+import numpy as np
+
+
+# Estadísticas por canal que admiten diferencias de sumas prefijas (mismas
+# definiciones que logic.features.CHANNEL_FEATURES)
+SLIDING_STATS = ('mean', 'std', 'var', 'rms', 'energy', 'zcr', 'diff_mean', 'abs_diff_mean')
+
+
+def sliding_feature_names(n_channels):
+    """Nombres de columna de extract_sliding_stats"""
+    return [f'ch{ch}_{stat}' for ch in range(n_channels) for stat in SLIDING_STATS]
+
+
+def is_sliding_feature(name):
+    """True si la columna ch{canal}_{estadística} se puede calcular con sumas prefijas"""
+    channel, _, stat = name[2:].partition('_')
+    return name.startswith('ch') and channel.isdigit() and stat in SLIDING_STATS
+
+
+def resample_to_grid(values, times_ns, sampling_rate, origin_ns=0):
+    """
+    Remuestrea la serie de un grupo una sola vez sobre una rejilla absoluta
+
+    La rejilla son los instantes `origin_ns + k / sampling_rate` que caen
+    entre la primera y la última muestra; al ser común a todas las ventanas,
+    una ventana que empieza en un punto de la rejilla es exactamente un tramo
+    de `stream` y las ventanas solapadas comparten sus timesteps.
+
+    Args:
+        values: Array (n_muestras, canales) sin NaN
+        times_ns: Array int64 (n_muestras,) ordenado
+        sampling_rate: Frecuencia de la rejilla en Hz
+        origin_ns: Instante de referencia de la rejilla en epoch-ns
+
+    Returns:
+        grid_ns: Array int64 con el instante de cada punto de la rejilla
+        stream: Array float64 (len(grid_ns), canales) por interpolación lineal
+    """
+    times_ns = np.asarray(times_ns, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+
+    # Aritmética exacta para el primer punto: k·periodo en epoch-ns no cabe en float64
+    period_ns = Fraction(10**9) / Fraction(sampling_rate).limit_denominator(10**6)
+    first = math.ceil(Fraction(int(times_ns[0]) - origin_ns) / period_ns)
+    last = math.floor(Fraction(int(times_ns[-1]) - origin_ns) / period_ns)
+    first_ns = first * period_ns
+    base_ns = origin_ns + round(first_ns)
+    steps = np.arange(max(last - first + 1, 0)) * float(period_ns) + float(first_ns - round(first_ns))
+    grid_ns = base_ns + np.round(steps).astype(np.int64)
+
+    # Tiempos relativos a la primera muestra: epoch-ns no cabe exacto en float64
+    t = (times_ns - times_ns[0]).astype(np.float64)
+    grid_t = (grid_ns - times_ns[0]).astype(np.float64)
+    stream = np.column_stack([np.interp(grid_t, t, values[:, ch]) for ch in range(values.shape[1])])
+    return grid_ns, stream
+
+
+def grid_window_offsets(grid_ns, window_start_ns, window_timesteps):
+    """
+    Posición en la rejilla del primer timestep de cada ventana
+
+    Returns:
+        offsets: Índice del primer punto de la rejilla >= inicio de la ventana
+        valid: False para las ventanas que no caben enteras en la rejilla
+    """
+    offsets = np.searchsorted(grid_ns, np.asarray(window_start_ns, dtype=np.int64))
+    valid = offsets + window_timesteps <= len(grid_ns)
+    return offsets, valid
+
+
+def extract_sliding_stats(stream, offsets, window_timesteps, names=None):
+    """
+    Estadísticas de momentos de ventanas solapadas de una serie uniforme
+
+    Calcula una sola vez las sumas acumuladas de x, x², |Δx| y cambios de
+    signo sobre `stream` y obtiene cada ventana `stream[o:o + window_timesteps]`
+    como diferencia O(1) de esas sumas: el coste no crece con el solapamiento
+    (50%, 75%, 90%...). Equivale a extract_features_batch sobre esas mismas
+    ventanas (salvo redondeo de las sumas acumuladas).
+
+    No sustituye a las características del modelo: esas se calculan sobre
+    ventanas remuestreadas cada una en su propio intervalo, no sobre una
+    rejilla común (ver resample_to_grid).
+
+    Args:
+        stream: Array (n_muestras, canales) con muestreo uniforme
+        offsets: Primer timestep de cada ventana en `stream`
+        window_timesteps: Timesteps por ventana
+        names: Columnas ch{canal}_{estadística} con estadísticas de SLIDING_STATS
+            (por defecto todas)
+
+    Returns:
+        features: Array float32 (n_ventanas, len(names))
+        names: Lista con el nombre de cada columna
+    """
+    stream = np.asarray(stream, dtype=np.float64)
+    n_channels = stream.shape[1]
+    n_windows = len(offsets)
+    n_timesteps = window_timesteps
+    if names is None:
+        names = sliding_feature_names(n_channels)
+
+    start = np.asarray(offsets, dtype=np.int64)
+    end = start + n_timesteps
+    if n_windows and (start.min() < 0 or end.max() > len(stream)):
+        raise IndexError("Hay ventanas fuera de la serie")
+
+    # Centrar por canal antes de acumular reduce la cancelación en la varianza
+    shift = stream.mean(axis=0) if len(stream) else np.zeros(n_channels)
+    centered = stream - shift
+
+    def prefix(values):
+        out = np.zeros((len(values) + 1, n_channels))
+        np.cumsum(values, axis=0, out=out[1:])
+        return out
+
+    centered_sum = _window_sum(prefix(centered), start, end)
+    centered_sq_sum = _window_sum(prefix(centered**2), start, end)
+
+    mean_centered = centered_sum / n_timesteps
+    stats = {
+        'mean': mean_centered + shift,
+        'var': np.maximum(centered_sq_sum / n_timesteps - mean_centered**2, 0.0),
+    }
+    stats['std'] = np.sqrt(stats['var'])
+    # Σx² = Σ(x - s)² + 2sΣ(x - s) + T·s²
+    stats['energy'] = np.maximum(centered_sq_sum + 2 * shift * centered_sum + n_timesteps * shift**2, 0.0)
+    stats['rms'] = np.sqrt(stats['energy'] / n_timesteps)
+
+    if n_timesteps > 1:
+        # Pares (t, t+1) dentro de la ventana: índices [start, end - 1) de las diferencias
+        signbit = np.signbit(stream)
+        crossings = prefix(signbit[1:] != signbit[:-1])
+        abs_diff = prefix(np.abs(np.diff(stream, axis=0)))
+
+        stats['zcr'] = _window_sum(crossings, start, end - 1) / n_timesteps
+        stats['abs_diff_mean'] = _window_sum(abs_diff, start, end - 1) / (n_timesteps - 1)
+        stats['diff_mean'] = (stream[end - 1] - stream[start]) / (n_timesteps - 1)
+    else:
+        stats['zcr'] = np.zeros((n_windows, n_channels))
+
+    features = np.empty((n_windows, len(names)), dtype=np.float32)
+    for column, name in enumerate(names):
+        channel, _, stat = name[2:].partition('_')
+        if not is_sliding_feature(name) or stat not in stats or int(channel) >= n_channels:
+            raise KeyError(f"Característica no disponible con sumas prefijas: {name}")
+        features[:, column] = stats[stat][:, int(channel)]
+
+    return features, list(names)
+
+
+def _window_sum(prefix_sums, start, end):
+    """Suma de las filas [start, end) de cada ventana a partir de las sumas prefijas"""
+    return prefix_sums[end] - prefix_sums[start]
@@ -0,0 +1,160 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from logic.multimodal import create_synchronized_windows_arrays
+from logic.windowing import REASON_VALID, WINDOW_METADATA_DTYPE
+from logic.windowing_report import WindowingReport
+
+
+class _StreamState:
+    """Estado de un dispositivo: reloj, rejilla de ventanas y muestras pendientes"""
+
+    def __init__(self, clock_offset_ns):
+        self.clock_offset_ns = clock_offset_ns
+        self.next_window_start_ns = None
+        self.last_time_ns = None
+        self.tail_times_ns = np.empty(0, dtype=np.int64)
+        self.tail_values = np.empty((0, 3))
+        self.last_seen = time.monotonic()
+        self.lock = threading.Lock()
+
+
+class StreamingWindower:
+    """
+    Ventaneo incremental por dispositivo/usuario entre peticiones sucesivas
+
+    Conserva las muestras finales aún no consumidas de cada stream para que las
+    ventanas que cruzan dos envíos se generen cuando llegan los datos nuevos, y
+    emite solo las ventanas nuevas. El estado vive en memoria, acotado por
+    número de streams (LRU) y por TTL de inactividad.
+    """
+
+    def __init__(self, window_seconds=5, overlap_percent=50, sampling_rate=20,
+                 target_timesteps=100, min_data_threshold=0.8, max_gap_seconds=1.0,
+                 ttl_seconds=900, max_streams=10000, clock_tolerance_seconds=60,
+                 dtype=np.float32, cache=None):
+        self.window_seconds = window_seconds
+        self.overlap_percent = overlap_percent
+        self.sampling_rate = sampling_rate
+        self.target_timesteps = target_timesteps
+        self.min_data_threshold = min_data_threshold
+        self.max_gap_seconds = max_gap_seconds
+        self.ttl_seconds = ttl_seconds
+        self.max_streams = max_streams
+        self.clock_tolerance_ns = int(clock_tolerance_seconds * 1e9)
+        self.dtype = dtype
+        self.cache = cache
+
+        self.window_duration_ns = int(window_seconds * 1e9)
+        self.step_duration_ns = int(self.window_duration_ns * (100 - overlap_percent) / 100)
+        # La cola nunca supera una ventana; el margen cubre ráfagas a mayor frecuencia
+        self.max_tail_samples = int(window_seconds * sampling_rate * 4)
+
+        self._streams = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._streams)
+
+    def _get_state(self, key, clock_offset_ns):
+        """Obtiene (o crea) el estado del stream y aplica la expulsión por TTL/LRU"""
+        now = time.monotonic()
+        with self._lock:
+            while self._streams:
+                oldest_key, oldest = next(iter(self._streams.items()))
+                if len(self._streams) < self.max_streams and now - oldest.last_seen <= self.ttl_seconds:
+                    break
+                del self._streams[oldest_key]
+
+            state = self._streams.get(key)
+            # Reinicio del dispositivo o cambio de reloj: empezar un stream nuevo
+            if state is None or abs(state.clock_offset_ns - clock_offset_ns) > self.clock_tolerance_ns:
+                state = _StreamState(clock_offset_ns)
+                self._streams[key] = state
+
+            state.last_seen = now
+            self._streams.move_to_end(key)
+            return state
+
+    def push(self, key, raw_times_ns, values, target_timestamp, report=None):
+        """
+        Añade lecturas de un stream y devuelve solo las ventanas nuevas completas
+
+        Args:
+            key: Identificador del stream (p. ej. (userId, deviceId))
+            raw_times_ns: Timestamps int64 del reloj del sensor en nanosegundos
+            values: Array (n_muestras, 3) con X, Y, Z
+            target_timestamp: Timestamp del dispositivo (epoch en ms) usado para
+                fijar el offset de reloj del stream
+            report: WindowingReport opcional
+
+        Returns:
+            X: Array (n_ventanas_nuevas, target_timesteps, 3)
+            metadata: Array estructurado WINDOW_METADATA_DTYPE de las ventanas aceptadas
+        """
+        if report is None:
+            report = WindowingReport()
+
+        raw_times_ns = np.asarray(raw_times_ns, dtype=np.int64)
+        values = np.asarray(values)
+        order = np.argsort(raw_times_ns, kind='stable')
+        raw_times_ns = raw_times_ns[order]
+        values = values[order]
+
+        empty = (
+            np.empty((0, self.target_timesteps, 3), dtype=self.dtype),
+            np.empty(0, dtype=WINDOW_METADATA_DTYPE),
+        )
+        if len(raw_times_ns) == 0:
+            return empty
+
+        clock_offset_ns = int(target_timestamp) * 1_000_000 - int(raw_times_ns[0])
+        state = self._get_state(key, clock_offset_ns)
+
+        with state.lock:
+            times_ns = raw_times_ns + state.clock_offset_ns
+
+            # Descartar muestras ya vistas (reenvíos del mismo batch)
+            if state.last_time_ns is not None:
+                fresh = times_ns > state.last_time_ns
+                times_ns = times_ns[fresh]
+                values = values[fresh]
+
+            times_ns = np.concatenate([state.tail_times_ns, times_ns])
+            values = np.concatenate([state.tail_values, values])
+            report.accel_samples += len(times_ns)
+            if len(times_ns) == 0:
+                return empty
+
+            # Primer envío o hueco mayor que una ventana: reiniciar la rejilla
+            if (state.next_window_start_ns is None or
+                    times_ns[0] >= state.next_window_start_ns + self.window_duration_ns):
+                state.next_window_start_ns = int(times_ns[0])
+
+            X, metadata = create_synchronized_windows_arrays(
+                times_ns, values, None, None,
+                self.window_seconds, self.overlap_percent, self.target_timesteps,
+                self.min_data_threshold, self.max_gap_seconds, self.sampling_rate,
+                target_channels=3, report=report,
+                start_time_ns=state.next_window_start_ns, dtype=self.dtype,
+                cache=self.cache
+            )
+
+            # Avanzar la rejilla y conservar solo lo que necesitan las próximas ventanas
+            state.next_window_start_ns += len(metadata) * self.step_duration_ns
+            keep = times_ns >= state.next_window_start_ns
+            state.tail_times_ns = times_ns[keep][-self.max_tail_samples:]
+            state.tail_values = values[keep][-self.max_tail_samples:]
+            state.last_time_ns = int(times_ns[-1])
+
+        report.groups_processed += 1
+        report.windows_attempted += len(metadata)
+        report.add_reasons(metadata['reason'])
+        metadata = metadata[metadata['reason'] == REASON_VALID]
+        report.windows_created += len(X)
+        report.windows_accel_only += len(X)
+
+        return X, metadata
@@ -0,0 +1,208 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from logic.features import extract_features_batch, feature_names
+from logic.resampling import resample_windows_batch
+
+
+class WindowCache:
+    """
+    Caché LRU direccionada por contenido para ventanas remuestreadas y características
+
+    La clave es un hash del contenido de entrada (muestras crudas de la ventana
+    o ventana remuestreada) más los parámetros que afectan al resultado, así
+    que un batch reenviado o un día reprocesado produce las mismas claves y se
+    sirve desde la caché. Nivel en memoria acotado por número de entradas;
+    nivel opcional en disco (un .npy por entrada) compartible entre procesos.
+    """
+
+    def __init__(self, max_entries=50000, disk_dir=None):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        if disk_dir is not None:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+        }
+
+    def get(self, key):
+        """Devuelve el array cacheado (solo lectura) o None"""
+        with self._lock:
+            array = self._entries.get(key)
+            if array is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return array
+
+        array = self._load(key)
+        with self._lock:
+            if array is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, array)
+        return array
+
+    def put(self, key, array):
+        array = np.array(array)
+        array.setflags(write=False)
+        with self._lock:
+            self._remember(key, array)
+        self._store(key, array)
+
+    def _remember(self, key, array):
+        self._entries[key] = array
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.npy")
+
+    def _load(self, key):
+        if self.disk_dir is None:
+            return None
+        try:
+            array = np.load(self._path(key))
+        except (OSError, ValueError):
+            return None
+        array.setflags(write=False)
+        return array
+
+    def _store(self, key, array):
+        if self.disk_dir is None:
+            return
+        path = self._path(key)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Escritura atómica: otros procesos nunca leen un fichero a medias
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, array)
+        os.replace(tmp_path, path)
+
+
+def window_keys(values, times_ns, lo, hi, namespace):
+    """
+    Claves de contenido de cada ventana [lo, hi) de una serie continua
+
+    Args:
+        values: Array (n_muestras, canales)
+        times_ns: Array int64 (n_muestras,)
+        lo, hi: Límites de cada ventana
+        namespace: Parámetros que afectan al resultado (p. ej. timesteps y dtype)
+
+    Returns:
+        Lista de claves hexadecimales (blake2b de 128 bits)
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    times_ns = np.ascontiguousarray(times_ns, dtype=np.int64)
+    prefix = hashlib.blake2b(repr(namespace).encode(), digest_size=16)
+
+    keys = []
+    for start, end in zip(lo.tolist(), hi.tolist()):
+        h = prefix.copy()
+        h.update(times_ns[start:end])
+        h.update(values[start:end])
+        keys.append(h.hexdigest())
+    return keys
+
+
+def resample_windows_cached(values, times_ns, lo, hi, target_timesteps, dtype=np.float32, cache=None):
+    """
+    resample_windows_batch que solo remuestrea las ventanas ausentes de la caché
+
+    Sin `cache` equivale exactamente a resample_windows_batch.
+    """
+    if cache is None or len(lo) == 0:
+        return resample_windows_batch(values, times_ns, lo, hi, target_timesteps, dtype=dtype)
+
+    keys = window_keys(values, times_ns, lo, hi, ('window', target_timesteps, np.dtype(dtype).str))
+    output = np.empty((len(lo), target_timesteps, np.shape(values)[1]), dtype=dtype)
+
+    missing = []
+    for slot, key in enumerate(keys):
+        cached = cache.get(key)
+        if cached is None:
+            missing.append(slot)
+        else:
+            output[slot] = cached
+
+    if missing:
+        missing = np.asarray(missing)
+        output[missing] = resample_windows_batch(
+            values, times_ns, lo[missing], hi[missing], target_timesteps, dtype=dtype
+        )
+        for slot in missing.tolist():
+            cache.put(keys[slot], output[slot])
+
+    return output
+
+
+def extract_features_cached(X, sampling_rate=20, names=None, cache=None):
+    """
+    extract_features_batch que solo calcula las ventanas ausentes de la caché
+
+    La clave de cada fila es el hash de la ventana remuestreada más las
+    columnas pedidas y la frecuencia de muestreo.
+    """
+    if cache is None or len(X) == 0:
+        return extract_features_batch(X, sampling_rate, names)
+
+    X = np.ascontiguousarray(X)
+    _, n_timesteps, n_channels = X.shape
+    names = list(names) if names is not None else feature_names(n_timesteps, n_channels)
+
+    prefix = hashlib.blake2b(
+        repr(('features', X.dtype.str, X.shape[1:], sampling_rate, tuple(names))).encode(),
+        digest_size=16
+    )
+    keys = []
+    for window in X:
+        h = prefix.copy()
+        h.update(window)
+        keys.append(h.hexdigest())
+
+    features = np.empty((len(X), len(names)), dtype=np.float32)
+    missing = []
+    for row, key in enumerate(keys):
+        cached = cache.get(key)
+        if cached is None:
+            missing.append(row)
+        else:
+            features[row] = cached
+
+    if missing:
+        missing = np.asarray(missing)
+        features[missing], _ = extract_features_batch(X[missing], sampling_rate, names)
+        for row in missing.tolist():
+            cache.put(keys[row], features[row])
+
+    return features, names
@@ -1,85 +1,32 @@
+import os
 import pandas as pd
 import polars as pl
 import numpy as np
 import warnings
+from concurrent.futures import ProcessPoolExecutor
 from scipy.interpolate import interp1d
 from scipy import signal
 from scipy.stats import skew, kurtosis
 from scipy.fft import fft, fftfreq
-
-def combine_raw_and_features_batched(X_raw, X_features, mode='weighted_concat', 
-                                   batch_size=5000, target_timesteps=100):
-    """
-    Combina datos en lotes para evitar problemas de memoria
-    """
-    n_samples = X_raw.shape[0]
-    n_timesteps = X_raw.shape[1] 
-    n_channels = X_raw.shape[2]
-    n_features = X_features.shape[1]
-    
-    print(f"🔄 Procesando {n_samples} muestras en lotes de {batch_size}")
-    print(f"📊 Memoria estimada: {(n_samples * n_timesteps * (n_channels + n_features) * 4) / 1e9:.2f} GB")
-    
-    # Crear array de salida
-    final_shape = (n_samples, n_timesteps, n_channels + n_features)
-    X_combined = np.empty(final_shape, dtype=np.float32)
-    
-    # Procesar por lotes
-    for start_idx in range(0, n_samples, batch_size):
-        end_idx = min(start_idx + batch_size, n_samples)
-        
-        print(f"    Procesando lote {start_idx//batch_size + 1}: {start_idx}-{end_idx}")
-        
-        # Extraer lote
-        X_raw_batch = X_raw[start_idx:end_idx]
-        X_features_batch = X_features[start_idx:end_idx]
-        
-        # Combinar lote
-        batch_combined = _combine_batch(X_raw_batch, X_features_batch, mode, n_timesteps)
-        
-        # Guardar en array final
-        X_combined[start_idx:end_idx] = batch_combined
-        
-        # Limpiar memoria del lote
-        del X_raw_batch, X_features_batch, batch_combined
-    
-    return X_combined
-
-def _combine_batch(X_raw_batch, X_features_batch, mode, timesteps):
-    """Función auxiliar para combinar un lote"""
-    if mode == 'weighted_concat':
-        # Normalizar
-        from sklearn.preprocessing import StandardScaler
-        scaler = StandardScaler()
-        X_features_normalized = scaler.fit_transform(X_features_batch)
-        
-        # Escalar
-        raw_std = np.std(X_raw_batch)
-        feature_std = np.std(X_features_normalized)
-        
-        if feature_std > 0:
-            X_features_scaled = X_features_normalized * (raw_std / feature_std)
-        else:
-            X_features_scaled = X_features_normalized
-        
-        # Expandir
-        X_features_expanded = np.repeat(
-            X_features_scaled[:, np.newaxis, :], 
-            timesteps, 
-            axis=1
-        )
-        
-        # Concatenar
-        return np.concatenate([X_raw_batch, X_features_expanded], axis=2)
-    
-    else:
-        # Modo simple
-        X_features_expanded = np.repeat(
-            X_features_batch[:, np.newaxis, :], 
-            timesteps, 
-            axis=1
-        )
-        return np.concatenate([X_raw_batch, X_features_expanded], axis=2)
+from loguru import logger
+from logic.windowing import (
+    compute_window_bounds, plan_group_windows, locate_group_windows,
+    validate_windows_batch, quality_gate_batch, REASON_VALID, WINDOW_METADATA_DTYPE
+)
+from logic.resampling import resample_windows_batch
+from logic.alignment import align_gyro_to_accel, match_nearest
+from logic.features import extract_features_batch, extract_features_parallel
+from logic.window_cache import extract_features_cached
+from logic.kernels import run_bounds
+from logic.windowing_report import WindowingReport
+from logic.fusion import combine_raw_and_features_batched, fit_fusion_scaler
+from logic.sliding_stats import (
+    SLIDING_STATS, extract_sliding_stats, grid_window_offsets, resample_to_grid, sliding_feature_names
+)
+from logic.multimodal import (
+    prepare_sensor_dataframe_polars, metadata_to_dataframe, split_sensor_groups,
+    synchronize_multimodal_data as synchronize_multimodal_data_polars
+)
 
 
 # ---------------------------------------------------------------------------------
@@ -307,121 +254,220 @@ def create_multimodal_windows_with_features(df_accel, df_gyro=None, window_secon
                                           target_timesteps=250, min_data_threshold=0.8, 
                                           max_gap_seconds=1.0, sync_tolerance_ms=50,
                                           extract_features=True,
-                                          fusion_strategy="weighted_concat"):
+                                          fusion_strategy="weighted_concat",
+                                          bulk=False, n_jobs=1, required_features=None,
+                                          dtype=np.float32, fusion_output_path=None,
+                                          fusion_scaler_path=None,
+                                          cache=None, stats_mode=None):
     """
     Versión EXTENDIDA: Crea ventanas con extracción opcional de características
     
     Args:
         extract_features: Si True, extrae características temporales y frecuenciales
+        bulk: Si True, usa create_multimodal_windows_bulk (una sola pasada sobre
+            todos los usuarios/actividades) en lugar del ventaneo por grupo
+        n_jobs: Procesos para el remuestreo en modo bulk y para la extracción de
+            características (1 = sin pool, -1 = todos los núcleos)
+        required_features: Lista opcional de columnas que consume el modelo; solo
+            se calculan esas (ver logic.features.compile_feature_plan)
+        dtype: Tipo de dato de X_raw (default: float32)
+        fusion_output_path: Si se indica, fusiona crudos y características
+            (`fusion_strategy`) en un memmap .npy en esa ruta, con un escalador
+            global ajustado en streaming, y lo devuelve en lugar de X_raw
+        fusion_scaler_path: Ruta donde persistir el escalador de la fusión
+            para reutilizarlo en inferencia
+        cache: WindowCache opcional; con n_jobs=1 las características de
+            ventanas ya procesadas (reprocesados) se sirven desde la caché
+        stats_mode: 'grid' añade a metadata columnas grid_ch{canal}_{estadística}
+            (mean, std, var, rms, energy, zcr, diff_mean, abs_diff_mean) calculadas
+            con sumas prefijas sobre una rejilla absoluta por grupo (ver
+            grid_window_stats); su coste no crece con el solapamiento (75%, 90%).
+            Son estadísticas de análisis, NO las características del modelo, que
+            siguen saliendo de cada ventana remuestreada por separado
         
     Returns:
         Si extract_features=True:
-            X_raw: Array con datos crudos
+            X_raw: Array con datos crudos (o memmap fusionado si fusion_output_path)
             X_features: Array con características extraídas  
             y, subjects, metadata: Como antes
         Si extract_features=False:
             X, y, subjects, metadata: Solo datos crudos
     """
     
-    # Llamar a la función original
-    X_raw, y, subjects, metadata_df = create_multimodal_windows_robust(
-        df_accel=df_accel,
-        df_gyro=df_gyro,
-        window_seconds=window_seconds,
-        overlap_percent=overlap_percent,
-        sampling_rate=sampling_rate,
-        target_timesteps=target_timesteps,
-        min_data_threshold=min_data_threshold,
-        max_gap_seconds=max_gap_seconds,
-        sync_tolerance_ms=sync_tolerance_ms
-    )
+    if stats_mode not in (None, 'grid'):
+        raise ValueError(f"stats_mode no soportado: {stats_mode}")
+
+    if bulk:
+        X_raw, y, subjects, metadata = create_multimodal_windows_bulk(
+            df_accel=df_accel,
+            df_gyro=df_gyro,
+            window_seconds=window_seconds,
+            overlap_percent=overlap_percent,
+            sampling_rate=sampling_rate,
+            target_timesteps=target_timesteps,
+            min_data_threshold=min_data_threshold,
+            max_gap_seconds=max_gap_seconds,
+            sync_tolerance_ms=sync_tolerance_ms,
+            n_jobs=n_jobs,
+            dtype=dtype
+        )
+        metadata_df = metadata_to_dataframe(metadata, y, subjects) if metadata is not None else None
+    else:
+        # Llamar a la función original
+        X_raw, y, subjects, metadata_df = create_multimodal_windows_robust(
+            df_accel=df_accel,
+            df_gyro=df_gyro,
+            window_seconds=window_seconds,
+            overlap_percent=overlap_percent,
+            sampling_rate=sampling_rate,
+            target_timesteps=target_timesteps,
+            min_data_threshold=min_data_threshold,
+            max_gap_seconds=max_gap_seconds,
+            sync_tolerance_ms=sync_tolerance_ms,
+            dtype=dtype
+        )
     
+    if stats_mode == 'grid' and metadata_df is not None:
+        grid_stats = grid_window_stats(df_accel, df_gyro, metadata_df, window_seconds, sampling_rate)
+        metadata_df = pd.concat([metadata_df, grid_stats], axis=1)
+        logger.debug("➕ {} estadísticas de rejilla por ventana en metadata", grid_stats.shape[1])
+
     if X_raw is None or not extract_features:
         if extract_features:
             return X_raw, None, y, subjects, metadata_df
         else:
             return X_raw, y, subjects, metadata_df
     
-    print(f"\n🔬 EXTRAYENDO CARACTERÍSTICAS AVANZADAS...")
-    print(f"  Procesando {len(X_raw)} ventanas...")
-    
-    # Extraer características de cada ventana
-    feature_list = []
-    
-    for i, window in enumerate(X_raw):
-        if i % 1000 == 0:
-            print(f"    Progreso: {i}/{len(X_raw)} ({100*i/len(X_raw):.1f}%)")
-        
-        try:
-            # Extraer características combinadas
-            window_features = extract_combined_features(window, sampling_rate)
-            feature_list.append(window_features)
-            
-        except Exception as e:
-            print(f"    ⚠️ Error en ventana {i}: {str(e)}")
-            # Crear diccionario vacío con las mismas claves que una ventana válida
-            if len(feature_list) > 0:
-                empty_features = {key: 0.0 for key in feature_list[0].keys()}
-                feature_list.append(empty_features)
-            else:
-                feature_list.append({})
+    logger.debug("🔬 EXTRAYENDO CARACTERÍSTICAS AVANZADAS...")
+    logger.debug("Procesando {} ventanas...", len(X_raw))
     
-    if len(feature_list) > 0 and len(feature_list[0]) > 0:
-        # Convertir lista de diccionarios a array numpy
-        feature_df = pd.DataFrame(feature_list)
-        X_features = feature_df.values
-        
-        print(f"  ✅ Características extraídas:")
-        print(f"    Forma de X_features: {X_features.shape}")
-        print(f"    Características por ventana: {X_features.shape[1]}")
+    # Características temporales y frecuenciales de todas las ventanas en bloque
+    if n_jobs == 1:
+        X_features, feature_names = extract_features_cached(X_raw, sampling_rate, required_features, cache)
+    else:
+        # Pool de procesos con X_raw y la salida en memoria compartida
+        X_features, feature_names, extraction_stats = extract_features_parallel(
+            X_raw, sampling_rate, required_features, n_jobs=n_jobs,
+            progress=lambda done, total, seconds: logger.debug(
+                "Progreso: {}/{} ({:.1f}%) - {:,.0f} ventanas/s", done, total, 100 * done / total, done / seconds
+            )
+        )
+        logger.debug("⚡ {:,.0f} ventanas/s con {} procesos",
+                     extraction_stats['windows_per_second'], extraction_stats['n_jobs'])
+
+    if X_features.shape[1] > 0:
+        logger.debug("✅ Características extraídas:")
+        logger.debug("Forma de X_features: {}", X_features.shape)
+        logger.debug("Características por ventana: {}", X_features.shape[1])
         
         # Agregar información de características a metadata
         if metadata_df is not None:
             metadata_df['n_features'] = X_features.shape[1]
             metadata_df['feature_extraction'] = True
+            metadata_df.attrs['feature_names'] = feature_names
 
-        # X_combined = combine_raw_and_features_batched(
-        #     X_raw,
-        #     X_features,
-        #     mode= fusion_strategy,
-        #     target_timesteps=target_timesteps
-        # )
+        if fusion_output_path is not None:
+            # Escalador global en una primera pasada y escritura por lotes a disco
+            scaler = fit_fusion_scaler(X_raw, X_features, mode=fusion_strategy,
+                                       feature_names=feature_names)
+            if fusion_scaler_path is not None:
+                scaler.save(fusion_scaler_path)
+                logger.debug("💾 Escalador de fusión guardado en {}", fusion_scaler_path)
+
+            X_raw = combine_raw_and_features_batched(
+                X_raw,
+                X_features,
+                mode=fusion_strategy,
+                target_timesteps=target_timesteps,
+                scaler=scaler,
+                output_path=fusion_output_path
+            )
+            logger.debug("✅ Tensor fusionado {} en {}", X_raw.shape, fusion_output_path)
 
         return X_raw, X_features, y, subjects, metadata_df
     else:
-        print("  ❌ No se pudieron extraer características")
+        logger.debug("❌ No se pudieron extraer características")
         return X_raw, None, y, subjects, metadata_df
 
 
+def grid_window_stats(df_accel, df_gyro, metadata_df, window_seconds, sampling_rate):
+    """
+    Estadísticas de momentos de cada ventana sobre una rejilla absoluta común
+
+    Cada grupo (usuario, actividad) y sensor se remuestrea una sola vez sobre
+    los instantes k / sampling_rate; cada ventana de metadata_df son los
+    window_seconds * sampling_rate puntos de la rejilla desde su window_start,
+    y sus estadísticas salen de diferencias de sumas prefijas
+    (logic.sliding_stats). Las ventanas solapadas comparten el trabajo.
+
+    No coinciden con las características del modelo: esas se calculan sobre
+    cada ventana remuestreada en su propio intervalo a target_timesteps.
+
+    Returns:
+        DataFrame con columnas grid_ch{canal}_{estadística} (canales 0-2
+        acelerómetro, 3-5 giroscopio) y el índice de metadata_df; NaN en las
+        ventanas que no caben enteras en la rejilla de su grupo
+    """
+    window_timesteps = int(round(window_seconds * sampling_rate))
+    sensors = [split_sensor_groups(prepare_sensor_dataframe_polars(df_accel, 'accel'))]
+    if df_gyro is not None:
+        sensors.append(split_sensor_groups(prepare_sensor_dataframe_polars(df_gyro, 'gyro')))
+
+    names = sliding_feature_names(3 * len(sensors))
+    columns_per_sensor = 3 * len(SLIDING_STATS)
+    stats = np.full((len(metadata_df), len(names)), np.nan, dtype=np.float32)
+    window_start_ns = metadata_df['window_start'].to_numpy().astype('datetime64[ns]').astype(np.int64)
+
+    rows_by_group = metadata_df.groupby(['Subject-id', 'Activity Label'], sort=False).indices
+    for key, rows in rows_by_group.items():
+        for sensor, groups in enumerate(sensors):
+            if key not in groups:
+                continue
+            times_ns, values = groups[key]
+            grid_ns, stream = resample_to_grid(values, times_ns, sampling_rate)
+            offsets, valid = grid_window_offsets(grid_ns, window_start_ns[rows], window_timesteps)
+            if not valid.any():
+                continue
+            block, _ = extract_sliding_stats(stream, offsets[valid], window_timesteps)
+            columns = slice(sensor * columns_per_sensor, (sensor + 1) * columns_per_sensor)
+            stats[rows[valid], columns] = block
+
+    return pd.DataFrame(stats, columns=[f'grid_{name}' for name in names], index=metadata_df.index)
+
+
 # Actualizar la función principal para incluir características opcionales
 def create_multimodal_windows_robust(df_accel, df_gyro=None, window_seconds=5, 
                                    overlap_percent=50, sampling_rate=20, 
                                    target_timesteps=250, min_data_threshold=0.8, 
-                                   max_gap_seconds=1.0, sync_tolerance_ms=50):
+                                   max_gap_seconds=1.0, sync_tolerance_ms=50,
+                                   dtype=np.float32):
     """
     Versión MULTIMODAL ROBUSTA: Crea ventanas sincronizadas de acelerómetro y giroscopio
     
     [Mantener la implementación original exactamente igual]
+    
+    Args:
+        dtype: Tipo de dato de las ventanas desde la primera asignación (default: float32)
     """
     
     # Determinar número de canales objetivo
     if df_gyro is not None:
         target_channels = 6  # 3 accel + 3 gyro
-        print(f"🔧 CONFIGURACIÓN MULTIMODAL (Accel + Gyro):")
+        logger.debug("🔧 CONFIGURACIÓN MULTIMODAL (Accel + Gyro):")
         mode = 'multimodal'
     else:
         target_channels = 3  # Solo accel
-        print(f"🔧 CONFIGURACIÓN MONOMODAL (Solo Accel):")
+        logger.debug("🔧 CONFIGURACIÓN MONOMODAL (Solo Accel):")
         mode = 'monomodal'
     
-    print(f"  Duración: {window_seconds}s")
-    print(f"  Timesteps objetivo: {target_timesteps}")
-    print(f"  Canales objetivo: {target_channels}")
-    print(f"  Frecuencia de muestreo: {sampling_rate}Hz")
-    print(f"  Solapamiento: {overlap_percent}%")
-    print(f"  Umbral mínimo de datos: {min_data_threshold*100:.1f}%")
-    print(f"  Máximo gap permitido: {max_gap_seconds}s")
-    print(f"  Tolerancia sincronización: {sync_tolerance_ms}ms")
+    logger.debug("Duración: {}s", window_seconds)
+    logger.debug("Timesteps objetivo: {}", target_timesteps)
+    logger.debug("Canales objetivo: {}", target_channels)
+    logger.debug("Frecuencia de muestreo: {}Hz", sampling_rate)
+    logger.debug("Solapamiento: {}%", overlap_percent)
+    logger.debug("Umbral mínimo de datos: {:.1f}%", min_data_threshold * 100)
+    logger.debug("Máximo gap permitido: {}s", max_gap_seconds)
+    logger.debug("Tolerancia sincronización: {}ms", sync_tolerance_ms)
     
     # Preparar DataFrames
     df_accel_clean = prepare_sensor_dataframe(df_accel, 'accel')
@@ -430,7 +476,7 @@ def create_multimodal_windows_robust(df_accel, df_gyro=None, window_seconds=5,
         df_gyro_clean = prepare_sensor_dataframe(df_gyro, 'gyro')
         
         # Sincronizar datasets si ambos están disponibles
-        print(f"\n🔄 SINCRONIZANDO SENSORES...")
+        logger.debug("🔄 SINCRONIZANDO SENSORES...")
         df_accel_sync, df_gyro_sync = synchronize_multimodal_data(
             df_accel_clean, df_gyro_clean, sync_tolerance_ms
         )
@@ -442,9 +488,9 @@ def create_multimodal_windows_robust(df_accel, df_gyro=None, window_seconds=5,
     window_duration_ns = int(window_seconds * 1e9)
     step_duration_ns = int(window_duration_ns * (100 - overlap_percent) / 100)
     
-    print(f"\n📏 PARÁMETROS TEMPORALES:")
-    print(f"  Duración de ventana: {window_seconds}s")
-    print(f"  Paso entre ventanas: {step_duration_ns / 1e9:.2f}s")
+    logger.debug("📏 PARÁMETROS TEMPORALES:")
+    logger.debug("Duración de ventana: {}s", window_seconds)
+    logger.debug("Paso entre ventanas: {:.2f}s", step_duration_ns / 1e9)
     
     # Almacenar resultados con forma consistente
     X_windows = []
@@ -467,27 +513,27 @@ def create_multimodal_windows_robust(df_accel, df_gyro=None, window_seconds=5,
                 (df_gyro_sync['Activity Label'] == activity)
             ]
             if len(gyro_group) == 0:
-                print(f"⚠️ Usuario {user_id}, {activity}: Sin datos de giroscopio correspondientes")
+                logger.debug("⚠️ Usuario {}, {}: Sin datos de giroscopio correspondientes", user_id, activity)
                 gyro_group = None
         else:
             gyro_group = None
         
-        print(f"\n👤 Usuario {user_id}, {activity}:")
-        print(f"   Accel: {len(accel_group)} muestras")
+        logger.debug("👤 Usuario {}, {}:", user_id, activity)
+        logger.debug("Accel: {} muestras", len(accel_group))
         if gyro_group is not None:
-            print(f"   Gyro: {len(gyro_group)} muestras")
+            logger.debug("Gyro: {} muestras", len(gyro_group))
         
         # Verificar datos mínimos
         min_samples = window_seconds * sampling_rate
         if len(accel_group) < min_samples:
-            print(f"   ⚠️ Muy pocos datos de acelerómetro ({len(accel_group)} < {min_samples})")
+            logger.debug("⚠️ Muy pocos datos de acelerómetro ({} < {})", len(accel_group), min_samples)
             continue
         
         # Crear ventanas multimodales
         windows_data = create_synchronized_windows_robust(
             accel_group, gyro_group, window_seconds, overlap_percent,
             target_timesteps, min_data_threshold, max_gap_seconds,
-            sync_tolerance_ms, sampling_rate, target_channels, mode
+            sync_tolerance_ms, sampling_rate, target_channels, mode, dtype
         )
         
         # Procesar ventanas creadas
@@ -531,18 +577,18 @@ def create_multimodal_windows_robust(df_accel, df_gyro=None, window_seconds=5,
                     window_count += 1
                     total_windows_created += 1
                 else:
-                    print(f"   ⚠️ Ventana con forma incorrecta: {window_shape} vs {expected_shape}")
+                    logger.debug("⚠️ Ventana con forma incorrecta: {} vs {}", window_shape, expected_shape)
         
-        print(f"   ✅ Creadas {window_count} ventanas válidas")
+        logger.debug("✅ Creadas {} ventanas válidas", window_count)
     
     # Resumen y resultados
-    print(f"\n📊 RESUMEN MULTIMODAL:")
-    print(f"  Ventanas intentadas: {total_windows_attempted}")
-    print(f"  Ventanas creadas: {total_windows_created}")
-    print(f"  Ventanas con gyro: {windows_with_gyro}")
-    print(f"  Ventanas solo accel: {windows_accel_only}")
+    logger.debug("📊 RESUMEN MULTIMODAL:")
+    logger.debug("Ventanas intentadas: {}", total_windows_attempted)
+    logger.debug("Ventanas creadas: {}", total_windows_created)
+    logger.debug("Ventanas con gyro: {}", windows_with_gyro)
+    logger.debug("Ventanas solo accel: {}", windows_accel_only)
     if total_windows_attempted > 0:
-        print(f"  Tasa de éxito: {(total_windows_created/total_windows_attempted)*100:.1f}%")
+        logger.debug("Tasa de éxito: {:.1f}%", total_windows_created / total_windows_attempted * 100)
     
     if len(X_windows) > 0:
         # VERIFICAR CONSISTENCIA ANTES DE CREAR ARRAY
@@ -550,8 +596,8 @@ def create_multimodal_windows_robust(df_accel, df_gyro=None, window_seconds=5,
         unique_shapes = list(set(shapes))
         
         if len(unique_shapes) > 1:
-            print(f"⚠️ ADVERTENCIA: Formas inconsistentes detectadas: {unique_shapes}")
-            print("Filtrando solo ventanas con forma correcta...")
+            logger.debug("⚠️ ADVERTENCIA: Formas inconsistentes detectadas: {}", unique_shapes)
+            logger.debug("Filtrando solo ventanas con forma correcta...")
             
             # Filtrar solo ventanas con la forma correcta
             correct_shape = (target_timesteps, target_channels)
@@ -562,29 +608,299 @@ def create_multimodal_windows_robust(df_accel, df_gyro=None, window_seconds=5,
             subjects_list = [subjects_list[i] for i in valid_indices]
             metadata_list = [metadata_list[i] for i in valid_indices]
             
-            print(f"Ventanas filtradas: {len(X_windows)}")
+            logger.debug("Ventanas filtradas: {}", len(X_windows))
         
         if len(X_windows) > 0:
-            X = np.array(X_windows)
+            X = np.array(X_windows, dtype=dtype)
             y = np.array(y_labels)
             subjects = np.array(subjects_list)
             metadata_df = pd.DataFrame(metadata_list)
             
-            print(f"\n✅ RESULTADO FINAL MULTIMODAL:")
-            print(f"  Forma de X: {X.shape} (samples, timesteps, channels)")
-            print(f"  Canales: {X.shape[2]} ({'accel_xyz + gyro_xyz' if target_channels == 6 else 'solo accel_xyz'})")
-            print(f"  Total ventanas: {len(X)}")
-            print(f"  Usuarios únicos: {len(np.unique(subjects))}")
-            print(f"  Actividades: {sorted(np.unique(y))}")
+            logger.debug("✅ RESULTADO FINAL MULTIMODAL:")
+            logger.debug("Forma de X: {} (samples, timesteps, channels)", X.shape)
+            logger.debug("Canales: {} ({})", X.shape[2],
+                         'accel_xyz + gyro_xyz' if target_channels == 6 else 'solo accel_xyz')
+            logger.debug("Total ventanas: {}", len(X))
+            logger.debug("Usuarios únicos: {}", len(np.unique(subjects)))
+            logger.debug("Actividades: {}", sorted(np.unique(y)))
             
             return X, y, subjects, metadata_df
         else:
-            print("❌ No quedaron ventanas válidas después del filtrado")
+            logger.debug("❌ No quedaron ventanas válidas después del filtrado")
             return None, None, None, None
     else:
-        print("❌ No se crearon ventanas válidas")
+        logger.debug("❌ No se crearon ventanas válidas")
         return None, None, None, None
 
+def create_multimodal_windows_bulk(df_accel, df_gyro=None, window_seconds=5,
+                                   overlap_percent=50, sampling_rate=20,
+                                   target_timesteps=250, min_data_threshold=0.8,
+                                   max_gap_seconds=1.0, sync_tolerance_ms=50,
+                                   n_jobs=1, chunk_windows=4096, return_report=False,
+                                   dtype=np.float32):
+    """
+    Ventaneo en BLOQUE para datasets de entrenamiento con muchos usuarios/actividades
+    
+    Mismo resultado que create_multimodal_windows_robust, pero sin groupby por
+    grupo: los datos se ordenan una vez por (usuario, actividad, timestamp), los
+    límites de cada grupo se obtienen por run-length encoding y las ventanas de
+    todos los grupos se planifican, validan y remuestrean de forma vectorizada.
+    X, y y subjects se escriben directamente en arrays preasignados.
+    
+    Args:
+        (los mismos que create_multimodal_windows_robust)
+        n_jobs: Procesos para remuestrear los bloques de ventanas
+            (1 = en el proceso actual, -1 = todos los núcleos)
+        chunk_windows: Ventanas por bloque de remuestreo (acota la memoria
+            temporal y es la unidad de trabajo del pool)
+        return_report: Si True, devuelve además un WindowingReport
+        dtype: Tipo de dato de X desde la primera asignación (default: float32)
+        
+    Returns:
+        X: Array (n_windows, timesteps, channels) en `dtype`
+        y: Array con etiquetas de actividad
+        subjects: Array con IDs de usuario
+        metadata: Array estructurado (WINDOW_METADATA_DTYPE) de las ventanas
+            aceptadas; ver metadata_to_dataframe
+        report: WindowingReport (solo si return_report=True)
+    """
+    target_channels = 6 if df_gyro is not None else 3
+    report = WindowingReport(mode='multimodal' if df_gyro is not None else 'monomodal')
+    
+    window_duration_ns = int(window_seconds * 1e9)
+    step_duration_ns = int(window_duration_ns * (100 - overlap_percent) / 100)
+    min_samples = window_seconds * sampling_rate
+    
+    # Preparar, ordenar por grupo una sola vez y sincronizar en Polars
+    with report.stage('prepare'):
+        df_accel_clean = prepare_sensor_dataframe_polars(df_accel, 'accel')
+        df_gyro_clean = prepare_sensor_dataframe_polars(df_gyro, 'gyro') if df_gyro is not None else None
+    
+    with report.stage('sync'):
+        if df_gyro_clean is not None:
+            df_accel_clean, df_gyro_clean = synchronize_multimodal_data_polars(
+                df_accel_clean, df_gyro_clean, sync_tolerance_ms, report=report
+            )
+        
+        subjects_g, activities_g, accel_lo_g, accel_hi_g, accel_times_ns, accel_values = _group_runs(df_accel_clean)
+        n_groups = len(accel_lo_g)
+        
+        # Grupo de giroscopio correspondiente a cada grupo de acelerómetro (-1 si no hay)
+        gyro_of_group = np.full(n_groups, -1)
+        if df_gyro_clean is not None:
+            gyro_subjects, gyro_activities, gyro_lo_g, gyro_hi_g, gyro_times_ns, gyro_values = _group_runs(df_gyro_clean)
+            gyro_index = {key: i for i, key in enumerate(zip(gyro_subjects, gyro_activities))}
+            gyro_of_group = np.array(
+                [gyro_index.get(key, -1) for key in zip(subjects_g, activities_g)], dtype=np.int64
+            ).reshape(n_groups)
+    
+    # Planificar las ventanas de todos los grupos a la vez
+    with report.stage('slice'):
+        accel_counts = accel_hi_g - accel_lo_g
+        start_g = accel_times_ns[accel_lo_g]
+        end_g = accel_times_ns[accel_hi_g - 1]
+        
+        has_gyro = gyro_of_group >= 0
+        if np.any(has_gyro):
+            matched = gyro_of_group[has_gyro]
+            start_g[has_gyro] = np.maximum(start_g[has_gyro], gyro_times_ns[gyro_lo_g[matched]])
+            end_g[has_gyro] = np.minimum(end_g[has_gyro], gyro_times_ns[gyro_hi_g[matched] - 1])
+        
+        # Grupos con muy pocos datos no generan ventanas
+        skipped = accel_counts < min_samples
+        end_g[skipped] = start_g[skipped]
+        
+        window_group, window_starts_ns, _ = plan_group_windows(
+            start_g, end_g, window_duration_ns, step_duration_ns
+        )
+        accel_lo, accel_hi = locate_group_windows(
+            accel_times_ns, accel_lo_g, accel_hi_g, window_group,
+            window_starts_ns, window_duration_ns
+        )
+        if df_gyro_clean is not None:
+            gyro_lo, gyro_hi = locate_group_windows(
+                gyro_times_ns, gyro_lo_g, gyro_hi_g, gyro_of_group[window_group],
+                window_starts_ns, window_duration_ns
+            )
+    
+    n_windows = len(window_starts_ns)
+    use_gyro = target_channels == 6
+    
+    report.accel_samples = len(accel_times_ns)
+    report.gyro_samples = len(gyro_times_ns) if use_gyro else 0
+    report.groups_skipped = int(np.count_nonzero(skipped))
+    report.groups_processed = n_groups - report.groups_skipped
+    
+    # Validar todas las ventanas de todos los grupos
+    with report.stage('validate'):
+        accel_checks = validate_windows_batch(
+            accel_times_ns, accel_values, accel_lo, accel_hi,
+            window_seconds, sampling_rate, min_data_threshold, max_gap_seconds
+        )
+        accel_valid = accel_checks['reason'] == REASON_VALID
+        
+        gyro_valid = np.zeros(n_windows, dtype=bool)
+        if use_gyro:
+            gyro_checks = validate_windows_batch(
+                gyro_times_ns, gyro_values, gyro_lo, gyro_hi,
+                window_seconds, sampling_rate, min_data_threshold, max_gap_seconds
+            )
+            gyro_valid = accel_valid & (gyro_checks['reason'] == REASON_VALID)
+    
+    # Remuestrear por bloques directamente sobre el tensor preasignado
+    accel_idx = np.flatnonzero(accel_valid)
+    X = np.zeros((len(accel_idx), target_timesteps, target_channels), dtype=dtype)
+    accel_slot = np.full(n_windows, -1)
+    accel_slot[accel_idx] = np.arange(len(accel_idx))
+    
+    with report.stage('resample'):
+        accel_quality_ok, accel_quality_reason = _resample_into(
+            X, slice(0, 3), np.arange(len(accel_idx)), accel_values, accel_times_ns,
+            accel_lo[accel_idx], accel_hi[accel_idx], target_timesteps, n_jobs, chunk_windows,
+            dtype
+        )
+        
+        gyro_success = np.zeros(n_windows, dtype=bool)
+        gyro_idx = np.flatnonzero(gyro_valid)
+        if len(gyro_idx) > 0:
+            gyro_quality_ok, _ = _resample_into(
+                X, slice(3, 6), accel_slot[gyro_idx], gyro_values, gyro_times_ns,
+                gyro_lo[gyro_idx], gyro_hi[gyro_idx], target_timesteps, n_jobs, chunk_windows,
+                dtype
+            )
+            # Giroscopio de mala calidad: sus columnas quedan en ceros
+            X[accel_slot[gyro_idx[~gyro_quality_ok]], :, 3:6] = 0
+            gyro_success[gyro_idx] = gyro_quality_ok
+    
+    # Ventanas aceptadas (solo se compacta si el control de calidad rechazó alguna)
+    with report.stage('quality'):
+        if not np.all(accel_quality_ok):
+            X = X[accel_quality_ok]
+        accepted_idx = accel_idx[accel_quality_ok]
+        accepted_group = window_group[accepted_idx]
+        
+        y = activities_g[accepted_group]
+        subjects = subjects_g[accepted_group]
+    
+    # Metadata columnar de las ventanas aceptadas
+    reason = np.where(accel_valid, REASON_VALID, accel_checks['reason']).astype(np.uint8)
+    reason[accel_idx] = accel_quality_reason
+    report.windows_attempted = n_windows
+    report.add_reasons(reason)
+    
+    metadata = np.zeros(len(accepted_idx), dtype=WINDOW_METADATA_DTYPE)
+    metadata['window_start'] = window_starts_ns[accepted_idx]
+    metadata['window_end'] = window_starts_ns[accepted_idx] + window_duration_ns
+    metadata['window_idx'] = (
+        np.arange(len(accepted_idx)) - np.searchsorted(accepted_group, accepted_group, side='left')
+    )
+    metadata['accel_samples'] = (accel_hi - accel_lo)[accepted_idx]
+    if use_gyro:
+        metadata['gyro_samples'] = np.where(gyro_valid, gyro_hi - gyro_lo, 0)[accepted_idx]
+        metadata['sync_quality'] = np.where(gyro_success[accepted_idx], 1.0, 0.5)
+    else:
+        metadata['sync_quality'] = 1.0
+    metadata['channels'] = target_channels
+    metadata['actual_channels'] = target_channels
+    metadata['data_coverage'] = accel_checks['data_coverage'][accepted_idx]
+    metadata['max_gap_s'] = accel_checks['max_gap'][accepted_idx]
+    metadata['resampled_timesteps'] = target_timesteps
+    
+    report.windows_created = len(accepted_idx)
+    report.windows_with_gyro = int(np.count_nonzero(gyro_success[accepted_idx]))
+    report.windows_accel_only = report.windows_created - report.windows_with_gyro
+    report.log()
+    
+    if report.windows_created == 0:
+        X, y, subjects, metadata = None, None, None, None
+    
+    if return_report:
+        return X, y, subjects, metadata, report
+    return X, y, subjects, metadata
+
+
+def _group_runs(df):
+    """
+    Localiza por run-length encoding el tramo de cada usuario/actividad en un
+    DataFrame Polars ya ordenado por (Subject-id, Activity Label, Timestamp)
+    
+    Returns:
+        subjects, activities: Arrays con la clave de cada grupo
+        group_lo, group_hi: Índices [inicio, fin) de cada grupo
+        times_ns: Array int64 de timestamps
+        values: Array (n_muestras, 3) con X, Y, Z
+    """
+    run_id = df.select(pl.struct(['Subject-id', 'Activity Label']).rle_id()).to_series().to_numpy()
+    group_lo, group_hi = run_bounds(run_id.astype(np.int64))
+    
+    return (
+        df['Subject-id'].to_numpy()[group_lo],
+        df['Activity Label'].to_numpy()[group_lo],
+        group_lo,
+        group_hi,
+        df['Timestamp'].cast(pl.Int64).to_numpy(),
+        df.select(['X', 'Y', 'Z']).to_numpy()
+    )
+
+
+def _resample_into(out, channels, rows, values, times_ns, lo, hi,
+                   target_timesteps, n_jobs, chunk_windows, dtype=np.float32):
+    """
+    Remuestrea ventanas por bloques y las escribe en out[rows, :, channels]
+    
+    Cada bloque solo lleva el tramo de muestras que cubre, de modo que puede
+    enviarse a otro proceso sin copiar la serie completa.
+    
+    Returns:
+        quality_ok: Array bool con el resultado de quality_gate_batch
+        quality_reason: Array uint8 con el motivo de rechazo
+    """
+    quality_ok = np.zeros(len(lo), dtype=bool)
+    quality_reason = np.zeros(len(lo), dtype=np.uint8)
+    if len(lo) == 0:
+        return quality_ok, quality_reason
+    
+    # Las ventanas están ordenadas por (grupo, inicio): cada bloque es un tramo contiguo
+    blocks = []
+    for begin in range(0, len(lo), chunk_windows):
+        end = min(begin + chunk_windows, len(lo))
+        first, last = lo[begin], hi[begin:end].max()
+        blocks.append((
+            slice(begin, end), values[first:last], times_ns[first:last],
+            lo[begin:end] - first, hi[begin:end] - first
+        ))
+    
+    if n_jobs == -1:
+        n_jobs = os.cpu_count()
+    
+    args = [block[1:] + (target_timesteps, dtype) for block in blocks]
+    if n_jobs is None or n_jobs <= 1 or len(blocks) == 1:
+        results = map(lambda a: _resample_quality_block(*a), args)
+        _store_blocks(out, channels, rows, blocks, results, quality_ok, quality_reason)
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            results = executor.map(_resample_quality_block, *zip(*args))
+            _store_blocks(out, channels, rows, blocks, results, quality_ok, quality_reason)
+    
+    return quality_ok, quality_reason
+
+
+def _store_blocks(out, channels, rows, blocks, results, quality_ok, quality_reason):
+    """Copia cada bloque remuestreado en su posición del tensor de salida"""
+    for block, (resampled, block_ok, block_reason) in zip(blocks, results):
+        block_slice = block[0]
+        out[rows[block_slice], :, channels] = resampled
+        quality_ok[block_slice] = block_ok
+        quality_reason[block_slice] = block_reason
+
+
+def _resample_quality_block(values, times_ns, lo, hi, target_timesteps, dtype=np.float32):
+    """Remuestrea un bloque de ventanas y aplica el control de calidad (ejecutable en un pool)"""
+    resampled = resample_windows_batch(values, times_ns, lo, hi, target_timesteps, dtype=dtype)
+    quality_ok, quality_reason = quality_gate_batch(resampled)
+    return resampled, quality_ok, quality_reason
+
+
 def prepare_sensor_dataframe(df, sensor_type):
     """Prepara y limpia DataFrame de sensor"""
     if df is None:
@@ -606,7 +922,7 @@ def prepare_sensor_dataframe(df, sensor_type):
     df_clean = df_clean.dropna(subset=['X', 'Y', 'Z', 'Timestamp'])
     df_clean = df_clean.sort_values('Timestamp').reset_index(drop=True)
     
-    print(f"  {sensor_type.upper()} preparado: {len(df_clean)} muestras")
+    logger.debug("{} preparado: {} muestras", sensor_type.upper(), len(df_clean))
     
     return df_clean
 
@@ -614,21 +930,24 @@ def prepare_sensor_dataframe(df, sensor_type):
 def synchronize_multimodal_data(df_accel, df_gyro, sync_tolerance_ms):
     """
     Sincroniza datos de acelerómetro y giroscopio con tolerancia temporal optimizada
+    
+    Recorta al rango común y empareja cada muestra de acelerómetro con el
+    giroscopio más cercano dentro de `sync_tolerance_ms` (align_gyro_to_accel)
     """
     
     # Convertir timestamps a nanosegundos para precisión
     accel_times_ns = df_accel['Timestamp'].astype('int64')
     gyro_times_ns = df_gyro['Timestamp'].astype('int64')
     
-    print(f"  📊 Datos originales:")
-    print(f"    Acelerómetro: {len(df_accel):,} muestras")
-    print(f"    Giroscopio: {len(df_gyro):,} muestras")
+    logger.debug("📊 Datos originales:")
+    logger.debug("Acelerómetro: {:,} muestras", len(df_accel))
+    logger.debug("Giroscopio: {:,} muestras", len(df_gyro))
     
     # Encontrar rango temporal común
     common_start = max(accel_times_ns.min(), gyro_times_ns.min())
     common_end = min(accel_times_ns.max(), gyro_times_ns.max())
     
-    print(f"  ⏰ Rango temporal común: {(common_end - common_start) / 1e9:.1f}s")
+    logger.debug("⏰ Rango temporal común: {:.1f}s", (common_end - common_start) / 1e9)
     
     # Filtrar datos al rango común
     accel_mask = (accel_times_ns >= common_start) & (accel_times_ns <= common_end)
@@ -637,9 +956,13 @@ def synchronize_multimodal_data(df_accel, df_gyro, sync_tolerance_ms):
     df_accel_sync = df_accel[accel_mask].copy()
     df_gyro_sync = df_gyro[gyro_mask].copy()
     
-    print(f"  📊 Datos sincronizados:")
-    print(f"    Acelerómetro: {len(df_accel_sync):,} muestras")
-    print(f"    Giroscopio: {len(df_gyro_sync):,} muestras")
+    # Emparejar giroscopio con acelerómetro sobre una rejilla común
+    df_gyro_sync, stats = align_gyro_to_accel(df_accel_sync, df_gyro_sync, sync_tolerance_ms)
+    
+    logger.debug("📊 Datos sincronizados:")
+    logger.debug("Acelerómetro: {:,} muestras", len(df_accel_sync))
+    logger.debug("Giroscopio: {:,} muestras emparejadas ({:.1f}%, diff. promedio: {:.1f}ms)",
+                 len(df_gyro_sync), stats['match_rate'] * 100, stats['mean_diff_ms'])
     
     # Análisis rápido de calidad de sincronización
     # analyze_sync_quality_fast(df_accel_sync, df_gyro_sync, sync_tolerance_ms)
@@ -650,10 +973,10 @@ def synchronize_multimodal_data(df_accel, df_gyro, sync_tolerance_ms):
 def analyze_sync_quality_fast(df_accel, df_gyro, tolerance_ms, sample_size=10000):
     """Análisis rápido de calidad de sincronización"""
     
-    print(f"  🔍 Análisis de sincronización (muestra de {sample_size:,})...")
+    logger.debug("🔍 Análisis de sincronización (muestra de {:,})...", sample_size)
     
     accel_times = df_accel['Timestamp'].values.astype('int64')
-    gyro_times = df_gyro['Timestamp'].values.astype('int64')
+    gyro_times = np.sort(df_gyro['Timestamp'].values.astype('int64'))
     
     # Muestreo estratificado
     total_accel = len(accel_times)
@@ -663,22 +986,18 @@ def analyze_sync_quality_fast(df_accel, df_gyro, tolerance_ms, sample_size=10000
     else:
         accel_sample = accel_times
     
-    # Análisis vectorizado en muestra
-    tolerance_ns = tolerance_ms * 1e6
-    diffs_ns = np.abs(accel_sample[:, None] - gyro_times[None, :])
-    min_diffs_ns = np.min(diffs_ns, axis=1)
-    min_diffs_ms = min_diffs_ns / 1e6
-    
-    valid_diffs = min_diffs_ms[min_diffs_ms <= tolerance_ms]
+    # Vecino más cercano por búsqueda binaria (sin matriz de distancias)
+    _, min_diffs_ns, matched = match_nearest(accel_sample, gyro_times, tolerance_ms * 1e6)
+    valid_diffs = min_diffs_ns[matched] / 1e6
     matched_pairs = len(valid_diffs)
     
     if matched_pairs > 0:
         sync_rate = (matched_pairs / len(accel_sample)) * 100
         avg_diff = float(np.mean(valid_diffs))
         
-        print(f"    ✅ Sincronización: {sync_rate:.1f}% (diff. promedio: {avg_diff:.1f}ms)")
+        logger.debug("✅ Sincronización: {:.1f}% (diff. promedio: {:.1f}ms)", sync_rate, avg_diff)
     else:
-        print(f"    ⚠️ Baja sincronización: <{tolerance_ms}ms")
+        logger.debug("⚠️ Baja sincronización: <{}ms", tolerance_ms)
 
 
 def process_multimodal_window_robust(window_accel, window_gyro, target_timesteps,
@@ -843,18 +1162,19 @@ def validate_window_data(window_data_df, window_seconds, sampling_rate,
     }
 
 
-def resample_window_robust(sensor_data, timestamps, target_timesteps, window_seconds):
-    """Versión robusta de remuestreo con múltiples estrategias"""
+def resample_window_robust(sensor_data, timestamps, target_timesteps, window_seconds,
+                           dtype=np.float32):
+    """Versión robusta de remuestreo con múltiples estrategias (salida en `dtype`)"""
     if len(sensor_data) == 0:
-        return np.zeros((target_timesteps, 3))
+        return np.zeros((target_timesteps, 3), dtype=dtype)
     
     original_timesteps = len(sensor_data)
     
     if original_timesteps == target_timesteps:
-        return sensor_data.copy()
+        return sensor_data.astype(dtype)
     
     if original_timesteps == 1:
-        return np.tile(sensor_data[0], (target_timesteps, 1))
+        return np.tile(sensor_data[0], (target_timesteps, 1)).astype(dtype)
     
     try:
         if hasattr(timestamps[0], 'timestamp'):
@@ -873,7 +1193,7 @@ def resample_window_robust(sensor_data, timestamps, target_timesteps, window_sec
             relative_times = np.linspace(0, 1, len(time_seconds))
         
         target_times = np.linspace(0, 1, target_timesteps)
-        resampled_data = np.zeros((target_timesteps, 3))
+        resampled_data = np.zeros((target_timesteps, 3), dtype=dtype)
         
         for axis in range(3):
             try:
@@ -902,7 +1222,7 @@ def resample_window_robust(sensor_data, timestamps, target_timesteps, window_sec
         return resampled_data
     
     except Exception:
-        return np.tile(sensor_data[0], (target_timesteps, 1))
+        return np.tile(sensor_data[0], (target_timesteps, 1)).astype(dtype)
 
 
 def is_window_quality_good(resampled_window, max_std_threshold=50.0):
@@ -924,7 +1244,7 @@ def create_synchronized_windows_robust(accel_group, gyro_group, window_seconds,
                                      overlap_percent, target_timesteps, 
                                      min_data_threshold, max_gap_seconds,
                                      sync_tolerance_ms, sampling_rate, 
-                                     target_channels, mode):
+                                     target_channels, mode, dtype=np.float32):
     """Crea ventanas sincronizadas de múltiples sensores con forma consistente"""
     
     windows_data = []
@@ -933,36 +1253,36 @@ def create_synchronized_windows_robust(accel_group, gyro_group, window_seconds,
     window_duration_ns = int(window_seconds * 1e9)
     step_duration_ns = int(window_duration_ns * (100 - overlap_percent) / 100)
     
-    # Rango temporal
-    accel_times_ns = accel_group['Timestamp'].astype('int64')
-    start_time_ns = accel_times_ns.min()
-    end_time_ns = accel_times_ns.max()
+    # Rango temporal (timestamps ya ordenados por prepare_sensor_dataframe)
+    accel_times_ns = accel_group['Timestamp'].astype('int64').to_numpy()
+    start_time_ns = accel_times_ns[0]
+    end_time_ns = accel_times_ns[-1]
     
     if gyro_group is not None:
-        gyro_times_ns = gyro_group['Timestamp'].astype('int64')
-        start_time_ns = max(start_time_ns, gyro_times_ns.min())
-        end_time_ns = min(end_time_ns, gyro_times_ns.max())
+        gyro_times_ns = gyro_group['Timestamp'].astype('int64').to_numpy()
+        start_time_ns = max(start_time_ns, gyro_times_ns[0])
+        end_time_ns = min(end_time_ns, gyro_times_ns[-1])
+    
+    # Calcular todos los límites de ventana de una sola vez
+    window_starts_ns, accel_lo, accel_hi = compute_window_bounds(
+        accel_times_ns, start_time_ns, end_time_ns,
+        window_duration_ns, step_duration_ns
+    )
     
-    # Crear ventanas deslizantes
-    current_start_ns = start_time_ns
+    if gyro_group is not None:
+        _, gyro_lo, gyro_hi = compute_window_bounds(
+            gyro_times_ns, start_time_ns, end_time_ns,
+            window_duration_ns, step_duration_ns
+        )
     
-    while current_start_ns + window_duration_ns <= end_time_ns:
+    # Crear ventanas deslizantes como vistas por rango de índices
+    for i, current_start_ns in enumerate(window_starts_ns):
         current_end_ns = current_start_ns + window_duration_ns
         
-        # Extraer datos de acelerómetro para esta ventana
-        accel_mask = (
-            (accel_times_ns >= current_start_ns) & 
-            (accel_times_ns < current_end_ns)
-        )
-        window_accel = accel_group[accel_mask]
+        window_accel = accel_group.iloc[accel_lo[i]:accel_hi[i]]
         
-        # Extraer datos de giroscopio si está disponible
         if gyro_group is not None:
-            gyro_mask = (
-                (gyro_times_ns >= current_start_ns) & 
-                (gyro_times_ns < current_end_ns)
-            )
-            window_gyro = gyro_group[gyro_mask]
+            window_gyro = gyro_group.iloc[gyro_lo[i]:gyro_hi[i]]
         else:
             window_gyro = None
         
@@ -971,11 +1291,10 @@ def create_synchronized_windows_robust(accel_group, gyro_group, window_seconds,
             window_accel, window_gyro, target_timesteps, 
             window_seconds, min_data_threshold, max_gap_seconds,
             current_start_ns, current_end_ns, sampling_rate,
-            target_channels, mode
+            target_channels, mode, dtype
         )
         
         windows_data.append(window_data)
-        current_start_ns += step_duration_ns
     
     return windows_data
 
@@ -983,7 +1302,7 @@ def create_synchronized_windows_robust(accel_group, gyro_group, window_seconds,
 def process_multimodal_window_consistent(window_accel, window_gyro, target_timesteps,
                                        window_seconds, min_data_threshold, max_gap_seconds,
                                        start_time_ns, end_time_ns, sampling_rate,
-                                       target_channels, mode):
+                                       target_channels, mode, dtype=np.float32):
     """
     Procesa una ventana multimodal con forma CONSISTENTE
     Siempre devuelve target_channels canales, rellenando con ceros si es necesario
@@ -1013,7 +1332,7 @@ def process_multimodal_window_consistent(window_accel, window_gyro, target_times
     
     try:
         accel_resampled = resample_window_robust(
-            accel_data, accel_timestamps, target_timesteps, window_seconds
+            accel_data, accel_timestamps, target_timesteps, window_seconds, dtype
         )
     except Exception as e:
         return {
@@ -1029,7 +1348,7 @@ def process_multimodal_window_consistent(window_accel, window_gyro, target_times
         }
     
     # CREAR ARRAY CON FORMA CONSISTENTE
-    final_data = np.zeros((target_timesteps, target_channels))
+    final_data = np.zeros((target_timesteps, target_channels), dtype=dtype)
     
     # Copiar datos de acelerómetro (primeras 3 columnas)
     final_data[:, 0:3] = accel_resampled
@@ -1050,7 +1369,7 @@ def process_multimodal_window_consistent(window_accel, window_gyro, target_times
             
             try:
                 gyro_resampled = resample_window_robust(
-                    gyro_data, gyro_timestamps, target_timesteps, window_seconds
+                    gyro_data, gyro_timestamps, target_timesteps, window_seconds, dtype
                 )
                 
                 # Verificar calidad del giroscopio
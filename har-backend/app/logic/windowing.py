@@ -0,0 +1,289 @@
+import numpy as np
+
+from logic.kernels import segment_max_gap
+
+
+# Códigos compactos de motivo de rechazo (mismos nombres que validate_window_data)
+REASON_VALID = 0
+REASON_EMPTY = 1
+REASON_INSUFFICIENT_DATA = 2
+REASON_LARGE_GAP = 3
+REASON_INVALID_VALUES = 4
+REASON_NON_FINITE = 5
+REASON_OUT_OF_RANGE = 6
+REASON_STD_OUT_OF_BAND = 7
+
+REASON_NAMES = (
+    'valid',
+    'empty',
+    'insufficient_data',
+    'large_gap',
+    'invalid_values',
+    'non_finite',
+    'out_of_range',
+    'std_out_of_band',
+)
+
+# Metadata columnar por ventana (timestamps en epoch-ns)
+WINDOW_METADATA_DTYPE = np.dtype([
+    ('window_start', np.int64),
+    ('window_end', np.int64),
+    ('window_idx', np.int32),
+    ('accel_samples', np.int32),
+    ('gyro_samples', np.int32),
+    ('sync_quality', np.float32),
+    ('channels', np.uint8),
+    ('actual_channels', np.uint8),
+    ('data_coverage', np.float64),
+    ('max_gap_s', np.float64),
+    ('resampled_timesteps', np.int32),
+    ('reason', np.uint8),
+])
+
+
+def compute_window_bounds(times_ns, start_time_ns, end_time_ns,
+                          window_duration_ns, step_duration_ns):
+    """
+    Calcula de forma vectorizada los límites de todas las ventanas deslizantes
+
+    Equivale al bucle `while start + duracion <= fin` con máscaras booleanas
+    por ventana, pero resuelve todos los offsets con dos `searchsorted` sobre
+    los timestamps ya ordenados (prepare_sensor_dataframe los ordena una vez).
+
+    Args:
+        times_ns: Array int64 de timestamps en nanosegundos, orden ascendente
+        start_time_ns: Inicio del rango temporal a ventanear
+        end_time_ns: Fin del rango temporal a ventanear
+        window_duration_ns: Duración de la ventana en nanosegundos
+        step_duration_ns: Paso entre ventanas en nanosegundos
+
+    Returns:
+        window_starts_ns: Array int64 con el inicio de cada ventana
+        lo: Índice de la primera muestra de cada ventana (inclusive)
+        hi: Índice de la última muestra de cada ventana (exclusivo)
+    """
+    if step_duration_ns <= 0:
+        raise ValueError("El paso entre ventanas debe ser positivo (overlap_percent < 100)")
+
+    times_ns = np.asarray(times_ns, dtype=np.int64)
+    span_ns = int(end_time_ns) - int(start_time_ns)
+
+    if span_ns < window_duration_ns:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty.copy(), empty.copy()
+
+    n_windows = (span_ns - window_duration_ns) // step_duration_ns + 1
+    window_starts_ns = int(start_time_ns) + np.arange(n_windows, dtype=np.int64) * step_duration_ns
+
+    # Ventana semiabierta [inicio, fin) igual que las máscaras originales
+    lo = np.searchsorted(times_ns, window_starts_ns, side='left')
+    hi = np.searchsorted(times_ns, window_starts_ns + window_duration_ns, side='left')
+
+    return window_starts_ns, lo, hi
+
+
+def validate_windows_batch(times_ns, values, lo, hi, window_seconds, sampling_rate,
+                           min_data_threshold, max_gap_seconds):
+    """
+    Valida todas las ventanas candidatas de una serie a la vez
+
+    Versión vectorizada de `validate_window_data`: un único `np.diff` sobre los
+    timestamps ordenados y reducciones por segmento (`np.maximum.reduceat`,
+    sumas acumuladas) en lugar de un slice de pandas por ventana.
+
+    Args:
+        times_ns: Array int64 de timestamps en nanosegundos, orden ascendente
+        values: Array (n_muestras, canales) con los valores del sensor
+        lo: Índice inicial (inclusive) de cada ventana
+        hi: Índice final (exclusivo) de cada ventana
+        window_seconds: Duración de la ventana en segundos
+        sampling_rate: Frecuencia de muestreo esperada en Hz
+        min_data_threshold: Cobertura mínima de datos (0-1)
+        max_gap_seconds: Máximo gap permitido en segundos
+
+    Returns:
+        dict con arrays por ventana: 'reason' (uint8, ver REASON_NAMES),
+        'data_coverage', 'max_gap' y 'actual_rate'
+    """
+    times_ns = np.asarray(times_ns, dtype=np.int64)
+    lo = np.asarray(lo, dtype=np.int64)
+    hi = np.asarray(hi, dtype=np.int64)
+    n_windows = len(lo)
+
+    counts = hi - lo
+    expected_samples = window_seconds * sampling_rate
+    data_coverage = counts / expected_samples
+
+    # Gap máximo entre muestras consecutivas dentro de [lo, hi)
+    max_gap = segment_max_gap(times_ns, lo, hi)
+    multi = counts > 1
+
+    # Tasa real de muestreo
+    actual_rate = np.full(n_windows, float(sampling_rate))
+    if np.any(multi):
+        span_s = (times_ns[hi[multi] - 1] - times_ns[lo[multi]]) / 1e9
+        with np.errstate(divide='ignore'):
+            actual_rate[multi] = counts[multi] / span_s
+
+    # Valores NaN/Inf contados con suma acumulada
+    invalid = ~np.isfinite(values).all(axis=1)
+    invalid_cumsum = np.concatenate([[0], np.cumsum(invalid)])
+    has_invalid = (invalid_cumsum[hi] - invalid_cumsum[lo]) > 0
+
+    # Mismo orden de comprobaciones que validate_window_data
+    reason = np.full(n_windows, REASON_VALID, dtype=np.uint8)
+    reason[has_invalid] = REASON_INVALID_VALUES
+    reason[max_gap > max_gap_seconds] = REASON_LARGE_GAP
+
+    insufficient = data_coverage < min_data_threshold
+    reason[insufficient] = REASON_INSUFFICIENT_DATA
+    max_gap[insufficient] = np.inf
+    actual_rate[insufficient] = 0
+
+    empty = counts == 0
+    reason[empty] = REASON_EMPTY
+    data_coverage[empty] = 0
+    max_gap[empty] = np.inf
+    actual_rate[empty] = 0
+
+    return {
+        'reason': reason,
+        'data_coverage': data_coverage,
+        'max_gap': max_gap,
+        'actual_rate': actual_rate,
+    }
+
+
+def quality_gate_batch(X, max_std_threshold=50.0, min_std_threshold=0.001, max_abs_value=1000):
+    """
+    Verifica la calidad de todas las ventanas remuestreadas a la vez
+
+    Versión vectorizada de `is_window_quality_good` sobre el tensor completo.
+
+    Args:
+        X: Array (n_ventanas, timesteps, canales) remuestreado
+        max_std_threshold: Desviación estándar máxima permitida por canal
+        min_std_threshold: Desviación estándar mínima por canal (señal plana)
+        max_abs_value: Valor absoluto máximo permitido
+
+    Returns:
+        mask: Array bool con True para las ventanas aceptadas
+        reason: Array uint8 con el motivo de rechazo (ver REASON_NAMES)
+    """
+    X = np.asarray(X)
+    reason = np.full(len(X), REASON_VALID, dtype=np.uint8)
+    if len(X) == 0:
+        return reason == REASON_VALID, reason
+
+    finite = np.isfinite(X).all(axis=(1, 2))
+    with np.errstate(invalid='ignore'):
+        in_range = np.abs(X).max(axis=(1, 2)) <= max_abs_value
+        std = X.std(axis=1, dtype=np.float64)
+        std_ok = ((std <= max_std_threshold) & (std >= min_std_threshold)).all(axis=1)
+
+    # Mismo orden de comprobaciones que is_window_quality_good
+    reason[~std_ok] = REASON_STD_OUT_OF_BAND
+    reason[~in_range] = REASON_OUT_OF_RANGE
+    reason[~finite] = REASON_NON_FINITE
+
+    return reason == REASON_VALID, reason
+
+
+def plan_group_windows(start_time_ns, end_time_ns, window_duration_ns, step_duration_ns):
+    """
+    Genera de forma vectorizada la rejilla de ventanas de todos los grupos
+
+    Aplica la misma regla que `compute_window_bounds` a cada grupo
+    (usuario/actividad) sin bucle de Python: el número de ventanas por grupo se
+    obtiene en bloque y los inicios se expanden con `np.repeat`.
+
+    Args:
+        start_time_ns: Array int64 (n_grupos,) con el inicio del rango de cada grupo
+        end_time_ns: Array int64 (n_grupos,) con el fin del rango de cada grupo
+        window_duration_ns: Duración de la ventana en nanosegundos
+        step_duration_ns: Paso entre ventanas en nanosegundos
+
+    Returns:
+        window_group: Array int64 con el índice de grupo de cada ventana
+        window_starts_ns: Array int64 con el inicio de cada ventana
+        first_window: Array int64 (n_grupos,) con la posición de la primera
+            ventana de cada grupo
+    """
+    if step_duration_ns <= 0:
+        raise ValueError("El paso entre ventanas debe ser positivo (overlap_percent < 100)")
+
+    start_time_ns = np.asarray(start_time_ns, dtype=np.int64)
+    end_time_ns = np.asarray(end_time_ns, dtype=np.int64)
+
+    span_ns = end_time_ns - start_time_ns
+    n_windows = np.where(
+        span_ns >= window_duration_ns,
+        (span_ns - window_duration_ns) // step_duration_ns + 1,
+        0
+    )
+
+    first_window = np.cumsum(n_windows) - n_windows
+    window_group = np.repeat(np.arange(len(n_windows)), n_windows)
+    position = np.arange(len(window_group)) - first_window[window_group]
+    window_starts_ns = start_time_ns[window_group] + position * step_duration_ns
+
+    return window_group, window_starts_ns, first_window
+
+
+def locate_group_windows(times_ns, group_lo, group_hi, window_group,
+                         window_starts_ns, window_duration_ns):
+    """
+    Resuelve los índices [lo, hi) de ventanas de varios grupos con un solo searchsorted
+
+    Los timestamps solo están ordenados dentro de cada grupo, así que cada
+    grupo se desplaza a su propio tramo de una clave compuesta monótona
+    (grupo * stride + tiempo relativo) y todas las búsquedas se resuelven a la vez.
+
+    Args:
+        times_ns: Array int64 de timestamps ordenados por (grupo, tiempo)
+        group_lo: Índice inicial de cada grupo; los grupos son contiguos y
+            cubren toda la serie (como tras ordenar por clave)
+        group_hi: Índice final (exclusivo) de cada grupo
+        window_group: Grupo de cada ventana (-1 si el grupo no tiene muestras)
+        window_starts_ns: Inicio de cada ventana en nanosegundos
+        window_duration_ns: Duración de la ventana en nanosegundos
+
+    Returns:
+        lo: Índice de la primera muestra de cada ventana (inclusive)
+        hi: Índice de la última muestra de cada ventana (exclusivo)
+    """
+    times_ns = np.asarray(times_ns, dtype=np.int64)
+    group_lo = np.asarray(group_lo, dtype=np.int64)
+    group_hi = np.asarray(group_hi, dtype=np.int64)
+    window_group = np.asarray(window_group, dtype=np.int64)
+    window_starts_ns = np.asarray(window_starts_ns, dtype=np.int64)
+
+    lo = np.zeros(len(window_group), dtype=np.int64)
+    hi = np.zeros(len(window_group), dtype=np.int64)
+    present = window_group >= 0
+    if len(times_ns) == 0 or not np.any(present):
+        return lo, hi
+
+    # Tiempo relativo al inicio de cada grupo
+    sample_group = np.repeat(np.arange(len(group_lo)), group_hi - group_lo)
+    base_ns = times_ns[group_lo]
+    relative_ns = times_ns - base_ns[sample_group]
+    stride = int(relative_ns.max()) + 2
+    if len(group_lo) * stride >= np.iinfo(np.int64).max:
+        raise ValueError("Rango temporal demasiado grande para la clave compuesta")
+
+    keys = sample_group * stride + relative_ns
+
+    # Consultas recortadas al tramo del grupo: antes del inicio -> lo del grupo,
+    # después del fin -> hi del grupo
+    groups = window_group[present]
+    offsets = groups * stride
+    query_start = np.clip(window_starts_ns[present] - base_ns[groups], 0, stride - 1)
+    query_end = np.clip(
+        window_starts_ns[present] + window_duration_ns - base_ns[groups], 0, stride - 1
+    )
+
+    lo[present] = np.searchsorted(keys, offsets + query_start, side='left')
+    hi[present] = np.searchsorted(keys, offsets + query_end, side='left')
+
+    return lo, hi
@@ -0,0 +1,99 @@
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import numpy as np
+from loguru import logger
+
+from logic.windowing import REASON_NAMES, REASON_VALID
+
+
+@dataclass
+class WindowingReport:
+    """
+    Estadísticas estructuradas de una ejecución de ventaneo
+
+    Reemplaza los prints del camino caliente: se devuelve junto a X/y/metadata
+    y solo se emite (a nivel DEBUG de loguru) si se llama a `log()`.
+    """
+    mode: str = 'monomodal'
+    groups_processed: int = 0
+    groups_skipped: int = 0
+    accel_samples: int = 0
+    gyro_samples: int = 0
+    windows_attempted: int = 0
+    windows_created: int = 0
+    windows_with_gyro: int = 0
+    windows_accel_only: int = 0
+    sync_pairs_matched: int = 0
+    sync_pairs_total: int = 0
+    rejections: dict = field(default_factory=dict)
+    stage_seconds: dict = field(default_factory=dict)
+
+    @contextmanager
+    def stage(self, name):
+        """Acumula el tiempo de pared de una etapa (prepare, sync, slice, ...)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + time.perf_counter() - start
+
+    def add_reasons(self, reason_codes):
+        """Cuenta los motivos de rechazo de un array de códigos uint8"""
+        counts = np.bincount(reason_codes, minlength=len(REASON_NAMES))
+        for code, count in enumerate(counts):
+            if code != REASON_VALID and count > 0:
+                name = REASON_NAMES[code]
+                self.rejections[name] = self.rejections.get(name, 0) + int(count)
+
+    @property
+    def success_rate(self):
+        if self.windows_attempted == 0:
+            return 0.0
+        return self.windows_created / self.windows_attempted
+
+    @property
+    def sync_match_rate(self):
+        """Fracción de muestras de acelerómetro con giroscopio emparejado"""
+        if self.sync_pairs_total == 0:
+            return 0.0
+        return self.sync_pairs_matched / self.sync_pairs_total
+
+    @property
+    def total_seconds(self):
+        return sum(self.stage_seconds.values())
+
+    def as_dict(self):
+        return {
+            'mode': self.mode,
+            'groups_processed': self.groups_processed,
+            'groups_skipped': self.groups_skipped,
+            'accel_samples': self.accel_samples,
+            'gyro_samples': self.gyro_samples,
+            'windows_attempted': self.windows_attempted,
+            'windows_created': self.windows_created,
+            'windows_with_gyro': self.windows_with_gyro,
+            'windows_accel_only': self.windows_accel_only,
+            'sync_pairs_matched': self.sync_pairs_matched,
+            'sync_pairs_total': self.sync_pairs_total,
+            'success_rate': self.success_rate,
+            'sync_match_rate': self.sync_match_rate,
+            'rejections': dict(self.rejections),
+            'stage_seconds': dict(self.stage_seconds),
+        }
+
+    def log(self):
+        """Emite el resumen a nivel DEBUG (sin coste si DEBUG está deshabilitado)"""
+        logger.opt(lazy=True).debug(
+            "Ventaneo {}: {} ventanas creadas de {} intentadas ({} con gyro, {} solo accel), "
+            "emparejamiento_gyro={}, rechazos={}, etapas_ms={}",
+            lambda: self.mode,
+            lambda: self.windows_created,
+            lambda: self.windows_attempted,
+            lambda: self.windows_with_gyro,
+            lambda: self.windows_accel_only,
+            lambda: f"{self.sync_match_rate:.1%}" if self.sync_pairs_total else '-',
+            lambda: self.rejections,
+            lambda: {name: round(seconds * 1000, 2) for name, seconds in self.stage_seconds.items()},
+        )
@@ -16,4 +16,5 @@ class InfoDataSchema(Schema):
 
 class DataRequestSchema(Schema):
     userId = fields.Str(required=True)
-    batches = fields.List(fields.Nested(InfoDataSchema), required=True)
\ No newline at end of file
+    batches = fields.List(fields.Nested(InfoDataSchema), required=True)
+    modelVersion = fields.Str(required=False, load_default=None)  # Fija una versión del registro
\ No newline at end of file
@@ -1,14 +1,21 @@
+import hmac
+import os
+
 from flask import Blueprint, request, jsonify
 from marshmallow import ValidationError
 from loguru import logger
 from models.request_models import DataRequestSchema
 from models.response_models import DataResponseSchema
-from services.data_processor import process_data
+from services.model_loader import model_loader
 
 bp = Blueprint('api', __name__, url_prefix='/api')
 
 @bp.route('/classify', methods=['POST'])
 def process_data_endpoint():
+    # Mientras el modelo carga en segundo plano el worker está vivo pero no listo
+    if not model_loader.ready:
+        return jsonify({'error': 'Servicio no listo', 'details': model_loader.state()}), 503
+
     try:
         # Validar datos de entrada
         schema = DataRequestSchema()
@@ -21,6 +28,8 @@ def process_data_endpoint():
         # logger.info(f"Datos recibidos: {data_request}")
         
         # Access to main data
+        user_id = data_request["userId"]
+        model_version = data_request.get("modelVersion")
         data_request = data_request["batches"]
 
         batches_joined = []
@@ -34,18 +43,99 @@ def process_data_endpoint():
 
         logger.info(f"Target timestamp: {principal_timestamp}")
         logger.info(f"Total readings to process: {number_of_batches} batches")
-        processed_data = process_data(batches_joined, principal_timestamp)
+        stream_key = (user_id, data_request[0]['deviceId']) if data_request else None
+        processed_data = model_loader.data_processor.process_data(
+            batches_joined, principal_timestamp, stream_key, model_version
+        )
         
         # Preparar respuesta
         response_schema = DataResponseSchema()
         response_data = response_schema.dump({'data': processed_data})
         
         return jsonify(response_data), 200
-        
+
+    except LookupError as e:
+        # Solo se sirven versiones ya cargadas; se cargan con las rutas /api/models/*
+        logger.warning(f"Versión de modelo no disponible: {str(e)}")
+        return jsonify({'error': 'Versión de modelo no cargada', 'details': str(e)}), 404
     except Exception as e:
         logger.error(f"Error procesando datos: {str(e)}")
         return jsonify({'error': 'Error interno del servidor', 'details': str(e)}), 500
 
 @bp.route('/health', methods=['GET'])
+@bp.route('/health/live', methods=['GET'])
 def health_check():
-    return jsonify({'status': 'healthy', 'service': 'flask-har-processor'}), 200
\ No newline at end of file
+    # Liveness: el proceso atiende HTTP, aunque el modelo siga cargando
+    return jsonify({'status': 'healthy', 'service': 'flask-har-processor'}), 200
+
+
+@bp.route('/health/ready', methods=['GET'])
+def readiness_check():
+    # Readiness: módulos pesados importados y versión por defecto cargada y calentada
+    state = model_loader.state()
+    return jsonify(state), 200 if model_loader.ready else 503
+
+@bp.route('/inference/stats', methods=['GET'])
+def inference_stats():
+    if not model_loader.ready:
+        return jsonify({'error': 'Modelo no disponible'}), 503
+    return jsonify(model_loader.data_processor.model_registry.stats()), 200
+
+
+def _admin_error():
+    """Respuesta de rechazo para las rutas de administración, o None si se autoriza"""
+    # Sin ADMIN_TOKEN configurado las rutas de administración quedan deshabilitadas
+    token = os.getenv('ADMIN_TOKEN')
+    if not token:
+        return jsonify({'error': 'Administración deshabilitada: ADMIN_TOKEN no configurado'}), 403
+    provided = request.headers.get('X-Admin-Token', '')
+    if not hmac.compare_digest(provided.encode(), token.encode()):
+        return jsonify({'error': 'No autorizado'}), 401
+    return None
+
+
+@bp.route('/models', methods=['GET'])
+def list_models():
+    if not model_loader.ready:
+        return jsonify({'error': 'Modelo no disponible'}), 503
+    registry = model_loader.data_processor.model_registry
+    return jsonify({
+        'default_version': registry.default_version,
+        'available': list(registry.discover()),
+    }), 200
+
+
+@bp.route('/models/default', methods=['POST'])
+def set_default_model():
+    admin_error = _admin_error()
+    if admin_error is not None:
+        return admin_error
+    if not model_loader.ready:
+        return jsonify({'error': 'Modelo no disponible'}), 503
+    version = (request.get_json(silent=True) or {}).get('version')
+    try:
+        model_loader.data_processor.model_registry.set_default(version)
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+    except Exception as e:
+        logger.error(f"Error cambiando la versión por defecto: {str(e)}")
+        return jsonify({'error': 'Error cargando el modelo', 'details': str(e)}), 500
+    return jsonify({'default_version': version}), 200
+
+
+@bp.route('/models/reload', methods=['POST'])
+def reload_model():
+    admin_error = _admin_error()
+    if admin_error is not None:
+        return admin_error
+    if not model_loader.ready:
+        return jsonify({'error': 'Modelo no disponible'}), 503
+    version = (request.get_json(silent=True) or {}).get('version')
+    try:
+        model = model_loader.data_processor.model_registry.reload(version)
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+    except Exception as e:
+        logger.error(f"Error recargando el modelo: {str(e)}")
+        return jsonify({'error': 'Error cargando el modelo', 'details': str(e)}), 500
+    return jsonify({'version': model.version, 'label': model.label}), 200
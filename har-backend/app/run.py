@@ -4,6 +4,7 @@ load_dotenv()  # Cargar variables de entorno desde el archivo .env
 from flask import Flask
 from loguru import logger
 from routes.endpoints import bp
+from services.model_loader import model_loader
 import signal
 import sys
 import os
@@ -19,6 +20,10 @@ def signal_handler(sig, frame):
 
 signal.signal(signal.SIGINT, signal_handler)
 
+# Nivel de log configurable (LOG_LEVEL=DEBUG emite el WindowingReport de cada petición)
+logger.remove()
+logger.add(sys.stderr, level=os.getenv('LOG_LEVEL', 'INFO'))
+
 def create_app():
     app = Flask(__name__)
     
@@ -28,6 +33,10 @@ def create_app():
     # Registrar blueprints
     app.register_blueprint(bp)
     
+    # TensorFlow y el modelo se cargan en segundo plano: /api/health/live responde
+    # ya y /api/health/ready pasa a 200 cuando el modelo está calentado
+    model_loader.start()
+
     logger.info("Flask HAR Processor iniciado")
     
     return app
@@ -1,28 +1,109 @@
 from logic.window_features_multimodal import create_multimodal_windows_with_features
-from logic.multimodal import create_multimodal_windows_robust
+from logic.multimodal import create_multimodal_windows_robust, prepare_sensor_dataframe_polars
+from logic.streaming import StreamingWindower
+from logic.fusion import FeatureFusionScaler
+from logic.window_cache import WindowCache, extract_features_cached
+from services.inference_runner import DEFAULT_BUCKETS
+from services.model_registry import ModelNotLoadedError, ModelRegistry
 from utils.common import normalize_columns, convert_timestamp
 from typing import Any, Dict, List
-from datetime import datetime
 import os
+import threading
 
-import tensorflow as tf
 import polars as pl
 import numpy as np
-import joblib
-
-# Configurar TensorFlow para evitar warnings adicionales
-tf.get_logger().setLevel('ERROR')
-
-try:
-    loaded_model = tf.saved_model.load(os.getenv("MODEL_PATH"))
-    infer = loaded_model.signatures["serving_default"]
-    label_encoder = joblib.load(os.getenv("ENCODER_PATH"))
-    print("Modelo y encoder cargados exitosamente")
-except Exception as e:
-    print(f"Error cargando modelo o encoder: {e}")
-    loaded_model = None
-    infer = None
-    label_encoder = None
+from loguru import logger
+
+# Registro de versiones de modelo: cada subdirectorio de MODEL_REGISTRY_DIR
+# (saved_model/ + label_encoder.joblib + classes.json + run_summary.json) es
+# una versión. Sin MODEL_REGISTRY_DIR se usa el directorio padre del modelo de
+# MODEL_PATH, con ese modelo como versión por defecto.
+model_registry = None
+model_load_error = None
+
+
+def load_models():
+    """
+    Crea el registro y carga (y calienta) la versión por defecto
+
+    Lo llama el cargador en segundo plano (services.model_loader) para que
+    el servidor HTTP no espere a TensorFlow ni al modelo al arrancar.
+    """
+    global model_registry, model_load_error
+    try:
+        registry_dir = os.getenv("MODEL_REGISTRY_DIR")
+        default_version = os.getenv("MODEL_DEFAULT_VERSION")
+        if os.getenv("MODEL_PATH"):
+            # MODEL_PATH apunta al saved_model/ de una versión: <registro>/<versión>/saved_model
+            model_dir = os.path.dirname(os.path.abspath(os.getenv("MODEL_PATH")))
+            registry_dir = registry_dir or os.path.dirname(model_dir)
+            default_version = default_version or os.path.basename(model_dir)
+        if not registry_dir:
+            raise ValueError("Configuración incompleta: define MODEL_REGISTRY_DIR o MODEL_PATH")
+        if os.getenv("ENCODER_PATH"):
+            logger.warning("ENCODER_PATH se ignora: cada versión usa el label_encoder.joblib de su directorio")
+
+        model_registry = ModelRegistry(
+            registry_dir,
+            default_version=default_version,
+            max_loaded=int(os.getenv("MODEL_MAX_LOADED", "2")),
+            memory_budget_mb=float(os.getenv("MODEL_MEMORY_BUDGET_MB", "0")),
+            poll_seconds=float(os.getenv("MODEL_REGISTRY_POLL_SECONDS", "10")),
+            # Backend: 'savedmodel' (TensorFlow completo) o 'tflite' (tflite/model_<variante>.tflite
+            # generado con tools.convert_tflite, menos memoria y arranque más rápido)
+            backend=os.getenv("INFERENCE_BACKEND", "savedmodel").lower(),
+            tflite_variant=os.getenv("TFLITE_VARIANT", "float32"),
+            num_threads=int(os.getenv("TFLITE_NUM_THREADS")) if os.getenv("TFLITE_NUM_THREADS") else None,
+            # Tamaños de batch fijos calentados al cargar cada versión
+            buckets=[int(b) for b in os.getenv("INFERENCE_BUCKETS", ",".join(map(str, DEFAULT_BUCKETS))).split(",")],
+            # Micro-batching entre peticiones concurrentes, desactivado por defecto: con
+            # un worker de un solo hilo (gunicorn sync) nada puede agruparse. Activarlo
+            # con INFERENCE_MAX_WAIT_MS > 0 (p. ej. 5) en despliegues con hilos
+            # (gunicorn --worker-class gthread --threads N). INFERENCE_MAX_BATCH=0 usa
+            # el bucket mayor como tamaño máximo del lote
+            max_batch=int(os.getenv("INFERENCE_MAX_BATCH", "0")) or None,
+            max_wait_ms=float(os.getenv("INFERENCE_MAX_WAIT_MS", "0"))
+        )
+        print(f"Modelo por defecto cargado exitosamente: {model_registry.default_version}")
+    except Exception as e:
+        print(f"Error cargando modelo o encoder: {e}")
+        model_registry = None
+        model_load_error = str(e)
+    return model_registry
+
+# Escalador de fusión crudos + características ajustado en entrenamiento (solo
+# para modelos entrenados con el tensor fusionado y sin feature_scaler.joblib propio)
+feature_scaler = None
+if os.getenv("FEATURE_SCALER_PATH"):
+    feature_scaler = FeatureFusionScaler.load(os.getenv("FEATURE_SCALER_PATH"))
+
+# Caché de ventanas remuestreadas y características por contenido: los reenvíos
+# del mismo batch y los reprocesados no repiten el remuestreo (0 = desactivada)
+window_cache = None
+if int(os.getenv("WINDOW_CACHE_SIZE", "0")) > 0:
+    window_cache = WindowCache(
+        max_entries=int(os.getenv("WINDOW_CACHE_SIZE")),
+        disk_dir=os.getenv("WINDOW_CACHE_DIR") or None
+    )
+
+# Ventaneo en streaming entre peticiones (opcional: el estado es local a cada
+# worker). Un windower por juego de parámetros de ventaneo de los modelos servidos
+STREAMING_WINDOWS = os.getenv("STREAMING_WINDOWS", "false").lower() == "true"
+stream_windowers = {}
+_stream_windowers_lock = threading.Lock()
+
+
+def get_stream_windower(window_params):
+    key = tuple(sorted(window_params.items()))
+    with _stream_windowers_lock:
+        if key not in stream_windowers:
+            stream_windowers[key] = StreamingWindower(
+                **window_params,
+                ttl_seconds=int(os.getenv("STREAM_TTL_SECONDS", "900")),
+                max_streams=int(os.getenv("STREAM_MAX_DEVICES", "10000")),
+                cache=window_cache
+            )
+        return stream_windowers[key]
 
 def adjust_timestamps_to_device_time(df, target_timestamp, timestamp_col='timestamp'):
     """
@@ -47,85 +128,109 @@ def adjust_timestamps_to_device_time(df, target_timestamp, timestamp_col='timest
     
     return df.with_columns(pl.Series(timestamp_col, relative_offsets))
 
-def process_data(data: Dict[str, Any], target_timestamp: int) -> Dict[str, Any]:
+def process_data(data: Dict[str, Any], target_timestamp: int, stream_key=None,
+                 model_version=None) -> Dict[str, Any]:
     try:
         # Validar que el modelo esté cargado
-        if infer is None or label_encoder is None:
+        if model_registry is None:
             raise Exception("Modelo o encoder no están disponibles")
 
-        # Timestamp definido por el dispositivo
-        
+        # Versión fijada por la petición o la por defecto; una recarga concurrente
+        # no cambia el modelo a mitad de la petición
+        with model_registry.use(model_version) as model:
+            # Timestamp definido por el dispositivo
         
-        # Crear DataFrames de Polars
-        accel_temp = pl.DataFrame(data)
-        # gyro_temp = pl.DataFrame(data['gyro'])
-
-        # Agregar columnas requeridas
-        accel_temp = accel_temp.with_columns([
-            pl.lit('_').alias('Usuario'),
-            pl.lit('-').alias('gt')
-        ])
-
-        # Normalizar columnas
-        df_accel = normalize_columns(
-            accel_temp,
-            user_col_name="Usuario",
-            timestamp_col_name="timestamp",
-            label_col_name="gt",
-            x_col_name="x",
-            y_col_name="y", 
-            z_col_name="z"
-        )
         
-        df_accel = adjust_timestamps_to_device_time(df_accel, target_timestamp, 'Timestamp')
-
-        # Convertir timestamps
-        df_accel = convert_timestamp(df_accel)
-        # df_gyro = convert_timestamp(df_gyro)
-
-        # Crear ventanas con características
-        X_all, _, subjects_all, metadata_all = create_multimodal_windows_robust(
-            df_accel = df_accel,
-            window_seconds=5,
-            overlap_percent=50,
-            sampling_rate=20,
-            target_timesteps=100,
-            min_data_threshold=0.8,  # 80% mínimo de datos
-            max_gap_seconds=1.0      # Máximo 1 segundo de gap
-        )
-
-        # Validar que se generaron ventanas
-        if len(X_all) == 0:
-            raise ValueError("No se pudieron generar ventanas de datos válidas")
-
-        # Convertir a tensores TensorFlow con tipo de dato específico
-        X_tensor = tf.constant(X_all, dtype=tf.float32)
-
-        # Realizar predicción
-        y_pred = infer(X_tensor)
-
-        # # Obtener probabilidades y convertir a clases
-        y_pred_probs = list(y_pred.values())[0].numpy()
-        y_pred_classes = np.argmax(y_pred_probs, axis=1)
-        y_pred_classes = label_encoder.inverse_transform(y_pred_classes)
-
-        # # Preparar respuesta
-        processed_data = []
-        current_time = datetime.now().isoformat()
-
-        for i in range(len(X_all)):
-            # Convert datetime objects back to epoch milliseconds
-            window_start_ms = int(metadata_all.loc[i, 'window_start'].timestamp() * 1000)
-            window_end_ms = int(metadata_all.loc[i, 'window_end'].timestamp() * 1000)
-            
-            processed_data.append({
-                'ts_start': window_start_ms,
-                'ts_end': window_end_ms,
-                'activity_label': str(y_pred_classes[i]),  # Asegurar que sea string
-                'model_version': 'CNNTEMP20ACCEL93',
-            })
-
-        return processed_data
+            # Crear DataFrames de Polars
+            accel_temp = pl.DataFrame(data)
+            # gyro_temp = pl.DataFrame(data['gyro'])
+
+            # Agregar columnas requeridas
+            accel_temp = accel_temp.with_columns([
+                pl.lit('_').alias('Usuario'),
+                pl.lit('-').alias('gt')
+            ])
+
+            # Normalizar columnas
+            df_accel = normalize_columns(
+                accel_temp,
+                user_col_name="Usuario",
+                timestamp_col_name="timestamp",
+                label_col_name="gt",
+                x_col_name="x",
+                y_col_name="y", 
+                z_col_name="z"
+            )
         
+            if STREAMING_WINDOWS and stream_key is not None:
+                # Ventaneo incremental: el offset de reloj y la cola de muestras viven en el stream
+                df_accel = prepare_sensor_dataframe_polars(df_accel, 'accel')
+                X_all, metadata_all = get_stream_windower(model.window_params).push(
+                    stream_key,
+                    df_accel['Timestamp'].cast(pl.Int64).to_numpy(),
+                    df_accel.select(['X', 'Y', 'Z']).to_numpy(),
+                    target_timestamp
+                )
+
+                # Sin ventanas nuevas completas: las muestras quedan a la espera del próximo envío
+                if len(X_all) == 0:
+                    return []
+            else:
+                df_accel = adjust_timestamps_to_device_time(df_accel, target_timestamp, 'Timestamp')
+
+                # Convertir timestamps
+                df_accel = convert_timestamp(df_accel)
+                # df_gyro = convert_timestamp(df_gyro)
+
+                # Crear ventanas con características
+                X_all, _, subjects_all, metadata_all = create_multimodal_windows_robust(
+                    df_accel = df_accel,
+                    **model.window_params,
+                    engine='polars',         # Sin conversión intermedia a pandas
+                    cache=window_cache
+                )
+
+                # Validar que se generaron ventanas
+                if X_all is None or len(X_all) == 0:
+                    raise ValueError("No se pudieron generar ventanas de datos válidas")
+
+            scaler = model.feature_scaler or feature_scaler
+            if scaler is not None:
+                # Mismas características y misma escala que en entrenamiento
+                X_features, _ = extract_features_cached(
+                    X_all, model.window_params['sampling_rate'], scaler.feature_names, window_cache
+                )
+                X_all = scaler.combine(X_all, X_features)
+
+            if window_cache is not None:
+                logger.opt(lazy=True).debug("Caché de ventanas: {}", lambda: window_cache.stats())
+
+            # Realizar predicción (relleno al bucket y recorte de la salida en el runner)
+            y_pred_probs = model.predict(X_all)
+
+            # # Obtener clases
+            y_pred_classes = np.argmax(y_pred_probs, axis=1)
+            y_pred_classes = model.label_encoder.inverse_transform(y_pred_classes)
+
+            # # Preparar respuesta
+            # Convertir epoch-ns a epoch-ms en una sola operación vectorizada
+            window_start_ms = (metadata_all['window_start'] // 1_000_000).tolist()
+            window_end_ms = (metadata_all['window_end'] // 1_000_000).tolist()
+
+            processed_data = [
+                {
+                    'ts_start': ts_start,
+                    'ts_end': ts_end,
+                    'activity_label': str(label),  # Asegurar que sea string
+                    'model_version': model.label,
+                }
+                for ts_start, ts_end, label in zip(window_start_ms, window_end_ms, y_pred_classes)
+            ]
+
+            return processed_data
+
+    except ModelNotLoadedError:
+        # Error del cliente, no del servidor: sale sin envolver para que la ruta responda 404
+        raise
     except Exception as e:
         raise Exception(f"Error procesando datos: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,135 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+_STOP = object()
+
+
+def _histogram_bin(value):
+    """Límite superior potencia de dos del bin de `value` (1, 2, 4, 8, ...)"""
+    return 1 << max(int(value) - 1, 0).bit_length()
+
+
+class MicroBatchingScheduler:
+    """
+    Agrupa las ventanas de peticiones concurrentes en una sola llamada al modelo
+
+    Los hilos de las peticiones encolan su array de ventanas y esperan un
+    Future; un hilo de inferencia dedicado junta lo encolado hasta
+    `max_batch` ventanas o `max_wait_ms` desde la primera petición, hace una
+    única predicción y reparte las filas de vuelta a cada Future. Una petición
+    nunca se divide entre lotes; si por sí sola supera `max_batch` va sola.
+
+    Solo se espera si hay concurrencia: una petición que encuentra la cola
+    vacía tras ella se despacha de inmediato, sin pagar `max_wait_ms`.
+    """
+
+    def __init__(self, predict, max_batch=512, max_wait_ms=5.0):
+        self.predict = predict
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+
+        self.requests = 0
+        self.batches = 0
+        self.batched_windows = 0
+        self.batch_size_histogram = {}
+        self.queue_depth_histogram = {}
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._loop, name='inference-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, X):
+        """Encola un batch de ventanas; el Future devuelve sus probabilidades"""
+        future = Future()
+        self._queue.put((np.asarray(X), future))
+        return future
+
+    def run(self, X):
+        """submit() y espera del resultado (misma interfaz que predict)"""
+        return self.submit(X).result()
+
+    def close(self):
+        """Detiene el hilo de inferencia tras vaciar lo ya encolado"""
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _loop(self):
+        carry = None
+        while True:
+            first = carry if carry is not None else self._queue.get()
+            carry = None
+            if first is _STOP:
+                return
+
+            pending = [first]
+            total = len(first[0])
+            deadline = time.monotonic() + self.max_wait
+
+            while total < self.max_batch:
+                timeout = deadline - time.monotonic()
+                try:
+                    if len(pending) == 1:
+                        # Sin otra petición ya encolada no hay con quién agrupar
+                        item = self._queue.get_nowait()
+                    elif timeout <= 0:
+                        break
+                    else:
+                        item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP or total + len(item[0]) > self.max_batch:
+                    # Se deja para el siguiente lote (o para terminar tras este)
+                    carry = item
+                    break
+                pending.append(item)
+                total += len(item[0])
+
+            self._dispatch(pending, total)
+
+    def _dispatch(self, pending, total):
+        with self._lock:
+            self.requests += len(pending)
+            self.batches += 1
+            self.batched_windows += total
+            size_bin = _histogram_bin(total)
+            depth_bin = _histogram_bin(len(pending) + self._queue.qsize())
+            self.batch_size_histogram[size_bin] = self.batch_size_histogram.get(size_bin, 0) + 1
+            self.queue_depth_histogram[depth_bin] = self.queue_depth_histogram.get(depth_bin, 0) + 1
+
+        try:
+            if len(pending) == 1:
+                outputs = self.predict(pending[0][0])
+            else:
+                outputs = self.predict(np.concatenate([X for X, _ in pending]))
+        except Exception as e:
+            for _, future in pending:
+                future.set_exception(e)
+            return
+
+        offset = 0
+        for X, future in pending:
+            future.set_result(outputs[offset:offset + len(X)])
+            offset += len(X)
+
+    def stats(self):
+        """Peticiones, lotes e histogramas (bins potencia de dos) de tamaño de lote y cola"""
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'batches': self.batches,
+                'mean_requests_per_batch': self.requests / self.batches if self.batches else 0.0,
+                'mean_windows_per_batch': self.batched_windows / self.batches if self.batches else 0.0,
+                'queue_depth': self._queue.qsize(),
+                'batch_size_histogram': {
+                    f'<={b}': n for b, n in sorted(self.batch_size_histogram.items())
+                },
+                'queue_depth_histogram': {
+                    f'<={b}': n for b, n in sorted(self.queue_depth_histogram.items())
+                },
+            }
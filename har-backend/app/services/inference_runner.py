@@ -0,0 +1,136 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+DEFAULT_BUCKETS = (8, 32, 128, 512)
+
+
+def saved_model_predict(infer):
+    """Adapta la firma serving_default a predict(array) -> array de probabilidades"""
+    import tensorflow as tf  # Solo el backend SavedModel necesita el runtime completo
+
+    def predict(X):
+        # El ventaneo ya produce float32: se entrega el buffer a TensorFlow sin cast
+        y_pred = infer(tf.convert_to_tensor(X))
+        return list(y_pred.values())[0].numpy()
+
+    return predict
+
+
+def window_shape_from_signature(infer):
+    """(timesteps, canales) de la entrada de la firma serving_default"""
+    input_spec = list(infer.structured_input_signature[1].values())[0]
+    return tuple(input_spec.shape[1:])
+
+
+class _BucketStats:
+    """Contadores de latencia de un bucket (ventana deslizante para percentiles)"""
+
+    def __init__(self, history=1000):
+        self.calls = 0
+        self.windows = 0
+        self.total_seconds = 0.0
+        self.recent = deque(maxlen=history)
+
+    def record(self, n_windows, seconds):
+        self.calls += 1
+        self.windows += n_windows
+        self.total_seconds += seconds
+        self.recent.append(seconds)
+
+    def as_dict(self):
+        recent_ms = np.array(self.recent) * 1000
+        return {
+            'calls': self.calls,
+            'windows': self.windows,
+            'mean_ms': self.total_seconds * 1000 / self.calls if self.calls else 0.0,
+            'p50_ms': float(np.percentile(recent_ms, 50)) if len(recent_ms) else 0.0,
+            'p99_ms': float(np.percentile(recent_ms, 99)) if len(recent_ms) else 0.0,
+        }
+
+
+class BucketedInferenceRunner:
+    """
+    Ejecuta el modelo solo con un conjunto fijo de tamaños de batch
+
+    Cada petición se rellena con ceros hasta el bucket más pequeño que la
+    contiene (y se trocea en bloques del bucket mayor si lo supera), de modo
+    que el modelo solo ve `len(buckets)` formas distintas, todas calentadas al
+    arrancar: ni la primera petición ni un tamaño nuevo pagan el trazado o la
+    preparación del grafo. Las filas de relleno se descartan de la salida.
+
+    `predict` recibe un array (bucket, timesteps, canales) y devuelve las
+    probabilidades (saved_model_predict o TFLitePredictor).
+    """
+
+    def __init__(self, predict, window_shape, buckets=DEFAULT_BUCKETS, dtype=np.float32):
+        self.model_predict = predict
+        self.window_shape = tuple(window_shape)
+        self.buckets = tuple(sorted(set(int(b) for b in buckets)))
+        self.dtype = dtype
+        self.warmed_up = False
+
+        self._stats = {bucket: _BucketStats() for bucket in self.buckets}
+        self._lock = threading.Lock()
+
+    def bucket_for(self, n_windows):
+        """Bucket más pequeño con capacidad para `n_windows` (el mayor si ninguno basta)"""
+        for bucket in self.buckets:
+            if n_windows <= bucket:
+                return bucket
+        return self.buckets[-1]
+
+    def warmup(self):
+        """Ejecuta una vez cada bucket para dejar trazadas todas las formas"""
+        for bucket in self.buckets:
+            self._run(np.zeros((bucket,) + self.window_shape, dtype=self.dtype), bucket, record=False)
+        self.warmed_up = True
+
+    def predict(self, X):
+        """
+        Probabilidades por ventana para un batch de cualquier tamaño
+
+        Args:
+            X: Array (n_ventanas, timesteps, canales)
+
+        Returns:
+            Array (n_ventanas, n_clases) con la primera salida del modelo
+        """
+        X = np.asarray(X, dtype=self.dtype)
+        outputs = []
+        largest = self.buckets[-1]
+
+        for start in range(0, len(X), largest):
+            chunk = X[start:start + largest]
+            bucket = self.bucket_for(len(chunk))
+
+            if len(chunk) == bucket:
+                padded = chunk
+            else:
+                padded = np.zeros((bucket,) + self.window_shape, dtype=self.dtype)
+                padded[:len(chunk)] = chunk
+
+            outputs.append(self._run(padded, bucket)[:len(chunk)])
+
+        return np.concatenate(outputs) if outputs else np.empty((0, 0), dtype=np.float32)
+
+    def _run(self, padded, bucket, record=True):
+        start = time.perf_counter()
+        probabilities = self.model_predict(padded)
+        seconds = time.perf_counter() - start
+
+        if record:
+            with self._lock:
+                self._stats[bucket].record(len(padded), seconds)
+        return probabilities
+
+    def stats(self):
+        """Latencia por bucket: llamadas, ventanas (con relleno), media, p50 y p99 en ms"""
+        with self._lock:
+            return {
+                'warmed_up': self.warmed_up,
+                'buckets': {str(bucket): stats.as_dict() for bucket, stats in self._stats.items()},
+            }
@@ -0,0 +1,97 @@
+import importlib
+import threading
+import time
+
+from loguru import logger
+
+
+# Referencia para el tiempo de arranque en frío: este módulo se importa al
+# crear la app, antes que cualquier librería pesada
+PROCESS_START = time.time()
+
+
+class ModelLoader:
+    """
+    Carga en segundo plano de los módulos pesados y del modelo por defecto
+
+    La app Flask solo importa este módulo, así que el servidor HTTP escucha
+    de inmediato; un hilo importa services.data_processor (TensorFlow,
+    sklearn, SciPy, pandas, Polars) y crea el registro de modelos, que carga
+    y calienta la versión por defecto. `ready` distingue "vivo" de "listo".
+    """
+
+    def __init__(self):
+        self.status = 'pending'
+        self.error = None
+        self.timings = {}
+        self.data_processor = None
+
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def start(self):
+        """Lanza la carga (idempotente)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.status = 'loading'
+            self._thread = threading.Thread(target=self._load, name='model-loader', daemon=True)
+            self._thread.start()
+
+    def wait(self, timeout=None):
+        """Espera a que el servicio esté listo; False si vence el timeout"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.ready
+
+    def _load(self):
+        try:
+            start = time.perf_counter()
+            data_processor = importlib.import_module('services.data_processor')
+            self.timings['import_seconds'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            if data_processor.load_models() is None:
+                raise RuntimeError(data_processor.model_load_error)
+            self.timings['model_load_seconds'] = time.perf_counter() - start
+
+            self.data_processor = data_processor
+            self.timings['cold_start_seconds'] = time.time() - PROCESS_START
+            self.status = 'ready'
+            self._ready.set()
+            logger.info(f"Servicio listo en {self.timings['cold_start_seconds']:.1f}s "
+                        f"(imports {self.timings['import_seconds']:.1f}s, "
+                        f"modelo {self.timings['model_load_seconds']:.1f}s)")
+        except Exception as e:
+            self.status = 'failed'
+            self.error = str(e)
+            logger.error(f"Error cargando el servicio de inferencia: {e}")
+
+    def state(self):
+        """Estado, tiempos de carga y calentamiento de las versiones cargadas"""
+        state = {
+            'status': self.status,
+            'uptime_seconds': time.time() - PROCESS_START,
+            'timings': dict(self.timings),
+        }
+        if self.error is not None:
+            state['error'] = self.error
+        if self.ready:
+            registry = self.data_processor.model_registry
+            state['default_version'] = registry.default_version
+            state['warm_up'] = {
+                version: {
+                    'warmed_up': model['inference']['warmed_up'],
+                    'buckets': [int(b) for b in model['inference']['buckets']],
+                }
+                for version, model in registry.stats()['loaded'].items()
+            }
+        return state
+
+
+model_loader = ModelLoader()
@@ -0,0 +1,390 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import joblib
+from loguru import logger
+
+from logic.fusion import FeatureFusionScaler
+from services.inference_batcher import MicroBatchingScheduler
+from services.inference_runner import (
+    BucketedInferenceRunner, DEFAULT_BUCKETS, saved_model_predict, window_shape_from_signature
+)
+from services.tflite_backend import TFLitePredictor
+
+
+# Umbrales de calidad del ventaneo (run_summary.json no los guarda)
+DEFAULT_WINDOW_PARAMS = {
+    'window_seconds': 5,
+    'overlap_percent': 50,
+    'sampling_rate': 20,
+    'target_timesteps': 100,
+    'min_data_threshold': 0.8,
+    'max_gap_seconds': 1.0,
+}
+
+# Fichero opcional en la raíz del registro con la versión por defecto
+DEFAULT_VERSION_FILE = 'default_version'
+
+
+class ModelNotLoadedError(LookupError):
+    """Versión fijada por una petición que no está cargada en el registro"""
+
+
+def window_params_from_summary(summary):
+    """Parámetros de ventaneo del entrenamiento; los ausentes toman el valor por defecto"""
+    return {key: summary.get(key, default) for key, default in DEFAULT_WINDOW_PARAMS.items()}
+
+
+def _directory_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path) for name in names
+    )
+
+
+def _fingerprint(model_dir):
+    """Hash de ruta, tamaño y mtime de todos los ficheros del directorio del modelo"""
+    h = hashlib.blake2b(digest_size=16)
+    for root, dirs, names in os.walk(model_dir):
+        dirs.sort()
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            stat = os.stat(path)
+            h.update(f"{os.path.relpath(path, model_dir)}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return h.hexdigest()
+
+
+class ModelVersion:
+    """
+    Una versión cargada: runner por buckets (+ micro-batching), encoder,
+    clases y parámetros de ventaneo derivados de su run_summary.json
+
+    `label` es el model_version devuelto al cliente (clave 'model_version'
+    del run_summary; si falta, el nombre del directorio).
+    """
+
+    def __init__(self, version, model_dir, backend='savedmodel', tflite_variant='float32',
+                 buckets=DEFAULT_BUCKETS, max_batch=None, max_wait_ms=0.0, num_threads=None):
+        self.version = version
+        self.model_dir = model_dir
+        self.backend = backend
+        self.fingerprint = _fingerprint(model_dir)
+        self.loaded_at = time.time()
+
+        with open(os.path.join(model_dir, 'run_summary.json')) as f:
+            self.summary = json.load(f)
+        self.label = self.summary.get('model_version', version)
+        self.window_params = window_params_from_summary(self.summary)
+        self.label_encoder = joblib.load(os.path.join(model_dir, 'label_encoder.joblib'))
+
+        self.classes = list(self.label_encoder.classes_)
+        with open(os.path.join(model_dir, 'classes.json')) as f:
+            classes = json.load(f)
+        if classes != self.classes:
+            raise ValueError(f"classes.json no coincide con label_encoder.joblib en {model_dir}")
+
+        # Escalador de fusión propio del modelo (solo modelos entrenados con el tensor fusionado)
+        scaler_path = os.path.join(model_dir, 'feature_scaler.joblib')
+        self.feature_scaler = FeatureFusionScaler.load(scaler_path) if os.path.exists(scaler_path) else None
+
+        if backend == 'tflite':
+            model_path = os.path.join(model_dir, 'tflite', f'model_{tflite_variant}.tflite')
+            predict = TFLitePredictor(model_path, num_threads=num_threads)
+            window_shape = predict.window_shape
+        else:
+            import tensorflow as tf  # Solo el backend SavedModel necesita el runtime completo
+            tf.get_logger().setLevel('ERROR')
+            model_path = os.path.join(model_dir, 'saved_model')
+            self._loaded_model = tf.saved_model.load(model_path)
+            infer = self._loaded_model.signatures['serving_default']
+            predict = saved_model_predict(infer)
+            window_shape = window_shape_from_signature(infer)
+
+        # Estimación de memoria para el presupuesto: tamaño en disco de los pesos
+        self.size_bytes = _directory_size(model_path)
+
+        self.runner = BucketedInferenceRunner(predict, window_shape, buckets=buckets)
+        self.runner.warmup()
+
+        self.batcher = None
+        if max_wait_ms > 0:
+            self.batcher = MicroBatchingScheduler(
+                self.runner.predict,
+                max_batch=max_batch or self.runner.buckets[-1],
+                max_wait_ms=max_wait_ms
+            )
+
+        # Peticiones en curso; una versión retirada se libera cuando llega a 0
+        self.in_use = 0
+        self.retired = False
+
+    def predict(self, X):
+        if self.batcher is not None:
+            return self.batcher.run(X)
+        return self.runner.predict(X)
+
+    def close(self):
+        if self.batcher is not None:
+            self.batcher.close()
+
+    def stats(self):
+        stats = {
+            'label': self.label,
+            'backend': self.backend,
+            'model_dir': self.model_dir,
+            'size_bytes': self.size_bytes,
+            'loaded_at': self.loaded_at,
+            'in_use': self.in_use,
+            'window_params': self.window_params,
+            'inference': self.runner.stats(),
+        }
+        if self.batcher is not None:
+            stats['inference']['batching'] = self.batcher.stats()
+        return stats
+
+
+class ModelRegistry:
+    """
+    Registro de versiones de modelo descubiertas en `root_dir`
+
+    Cada subdirectorio con run_summary.json, label_encoder.joblib, classes.json
+    y el modelo del backend (saved_model/ o tflite/model_<variante>.tflite) es una
+    versión con el nombre del directorio. Se mantienen cargadas como mucho
+    `max_loaded` versiones y `memory_budget_mb` MB (LRU; la versión por
+    defecto nunca se descarga). La versión por defecto se cambia de forma
+    atómica con set_default() o escribiendo su nombre en el fichero
+    `default_version` de la raíz; un hilo vigila ese fichero y recarga las
+    versiones cargadas cuyo directorio cambia, sin reiniciar el proceso.
+
+    Para publicar un modelo nuevo sin lecturas a medias: copiarlo a un
+    directorio nuevo y después cambiar `default_version`.
+
+    Las peticiones solo pueden fijar versiones ya cargadas: las cargas (y
+    con ellas las descargas LRU) quedan en manos de set_default(), reload()
+    y el fichero `default_version`.
+    """
+
+    def __init__(self, root_dir, default_version=None, max_loaded=2, memory_budget_mb=0,
+                 poll_seconds=10.0, **model_options):
+        self.root_dir = root_dir
+        self.max_loaded = max(1, max_loaded)
+        self.memory_budget_bytes = memory_budget_mb * 1024 * 1024
+        self.model_options = model_options
+
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._default = None
+
+        self.set_default(self._default_from_file() or default_version or self._first_version())
+
+        self._stop = threading.Event()
+        self._watcher = None
+        if poll_seconds > 0:
+            self._watcher = threading.Thread(
+                target=self._watch, args=(poll_seconds,), name='model-registry-watcher', daemon=True
+            )
+            self._watcher.start()
+
+    @property
+    def default_version(self):
+        return self._default
+
+    def discover(self):
+        """{versión: directorio} de los modelos completos bajo root_dir"""
+        backend = self.model_options.get('backend', 'savedmodel')
+        variant = self.model_options.get('tflite_variant', 'float32')
+        versions = {}
+        for name in sorted(os.listdir(self.root_dir)):
+            model_dir = os.path.join(self.root_dir, name)
+            if not os.path.isdir(model_dir):
+                continue
+            model_file = (
+                os.path.join('tflite', f'model_{variant}.tflite') if backend == 'tflite' else 'saved_model'
+            )
+            required = ('run_summary.json', 'label_encoder.joblib', 'classes.json', model_file)
+            if all(os.path.exists(os.path.join(model_dir, r)) for r in required):
+                versions[name] = model_dir
+        return versions
+
+    def _first_version(self):
+        versions = self.discover()
+        if not versions:
+            raise FileNotFoundError(f"No hay modelos en {self.root_dir}")
+        return next(iter(versions))
+
+    def _default_from_file(self):
+        path = os.path.join(self.root_dir, DEFAULT_VERSION_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return f.read().strip() or None
+
+    def _load(self, version):
+        """Carga (o devuelve) una versión; las cargas se serializan entre sí, no con las peticiones"""
+        with self._lock:
+            if version in self._models:
+                self._models.move_to_end(version)
+                return self._models[version]
+
+        with self._load_lock:
+            with self._lock:
+                if version in self._models:
+                    return self._models[version]
+
+            model_dir = self.discover().get(version)
+            if model_dir is None:
+                raise LookupError(f"Versión de modelo desconocida: {version}")
+
+            start = time.perf_counter()
+            model = ModelVersion(version, model_dir, **self.model_options)
+            logger.info(f"Modelo {version} ({model.label}) cargado en {time.perf_counter() - start:.1f}s")
+
+            with self._lock:
+                self._models[version] = model
+                to_close = self._evict()
+            self._close_all(to_close)
+            return model
+
+    def _evict(self):
+        """
+        Descarga LRU hasta cumplir el número máximo y el presupuesto (con el lock tomado)
+
+        Devuelve las versiones retiradas sin peticiones en curso, que el
+        llamador cierra fuera del lock.
+        """
+        def over_budget():
+            total = sum(m.size_bytes for m in self._models.values())
+            return len(self._models) > self.max_loaded or (
+                self.memory_budget_bytes > 0 and total > self.memory_budget_bytes
+            )
+
+        to_close = []
+        newest = next(reversed(self._models))
+        for version in list(self._models):
+            if not over_budget():
+                break
+            if version in (self._default, newest):
+                continue
+            to_close += self._retire(self._models.pop(version))
+            logger.info(f"Modelo {version} descargado (presupuesto del registro)")
+        return to_close
+
+    @staticmethod
+    def _retire(model):
+        """Marca la versión como retirada; [model] si ya se puede cerrar (con el lock tomado)"""
+        model.retired = True
+        return [model] if model.in_use == 0 else []
+
+    @staticmethod
+    def _close_all(models):
+        for model in models:
+            model.close()
+
+    def set_default(self, version):
+        """Carga `version` si hace falta y la convierte en la versión por defecto"""
+        self._load(version)
+        with self._lock:
+            previous, self._default = self._default, version
+        if previous != version:
+            logger.info(f"Versión por defecto: {previous} -> {version}")
+        return version
+
+    def reload(self, version=None):
+        """Vuelve a cargar una versión desde disco y la sustituye de forma atómica"""
+        version = version or self._default
+        model_dir = self.discover().get(version)
+        if model_dir is None:
+            raise LookupError(f"Versión de modelo desconocida: {version}")
+
+        with self._load_lock:
+            model = ModelVersion(version, model_dir, **self.model_options)
+            with self._lock:
+                previous = self._models.pop(version, None)
+                self._models[version] = model
+                to_close = self._evict()
+                if previous is not None:
+                    to_close += self._retire(previous)
+        self._close_all(to_close)
+        logger.info(f"Modelo {version} recargado ({model.label})")
+        return model
+
+    @contextmanager
+    def use(self, version=None):
+        """
+        Versión fijada (o la por defecto) durante una petición
+
+        Una versión fijada que no está cargada lanza ModelNotLoadedError sin
+        cargarla. Una recarga o descarga concurrente no afecta a la petición en
+        curso: la versión anterior se libera cuando la última petición la suelta.
+        """
+        while True:
+            if version is None:
+                model = self._load(self._default)
+            else:
+                with self._lock:
+                    model = self._models.get(version)
+                if model is None:
+                    raise ModelNotLoadedError(f"Versión de modelo no cargada: {version}")
+            with self._lock:
+                if not model.retired:
+                    model.in_use += 1
+                    break
+        try:
+            yield model
+        finally:
+            with self._lock:
+                model.in_use -= 1
+                close = model.retired and model.in_use == 0
+            if close:
+                model.close()
+
+    def refresh(self):
+        """Aplica cambios del fichero default_version y de los directorios cargados"""
+        default = self._default_from_file()
+        if default is not None and default != self._default:
+            self.set_default(default)
+
+        with self._lock:
+            loaded = list(self._models.values())
+        for model in loaded:
+            if not os.path.isdir(model.model_dir):
+                continue
+            if _fingerprint(model.model_dir) != model.fingerprint:
+                self.reload(model.version)
+
+    def _watch(self, poll_seconds):
+        while not self._stop.wait(poll_seconds):
+            try:
+                self.refresh()
+            except Exception as e:
+                # Un modelo a medio copiar o inválido no tumba el servicio: se reintenta
+                logger.warning(f"Recarga del registro de modelos fallida: {e}")
+
+    def close(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+        with self._lock:
+            to_close = []
+            for model in self._models.values():
+                to_close += self._retire(model)
+            self._models.clear()
+        self._close_all(to_close)
+
+    def stats(self):
+        with self._lock:
+            loaded = {version: model.stats() for version, model in self._models.items()}
+        return {
+            'root_dir': self.root_dir,
+            'default_version': self._default,
+            'available': list(self.discover()),
+            'loaded': loaded,
+        }
@@ -0,0 +1,79 @@
+import threading
+
+import numpy as np
+
+
+def _interpreter_class():
+    """Intérprete de LiteRT si está instalado; si no, el de TensorFlow completo"""
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+class TFLitePredictor:
+    """
+    predict(array) -> probabilidades servido con el intérprete TFLite
+
+    Admite las variantes float32, de rango dinámico e int8 completo: si la
+    entrada/salida del modelo está cuantizada, las ventanas se cuantizan con
+    la escala y el punto cero del modelo y la salida se decuantiza, de modo que
+    se usa igual que saved_model_predict. Mantiene un intérprete por tamaño de
+    batch (los buckets del runner) para no redimensionar tensores en cada
+    llamada; el acceso a los intérpretes se serializa con un lock.
+    """
+
+    def __init__(self, model_path, num_threads=None):
+        self.model_path = model_path
+        self.num_threads = num_threads
+
+        with open(model_path, 'rb') as f:
+            self._model_content = f.read()
+        self._interpreter_cls = _interpreter_class()
+        self._interpreters = {}
+        self._lock = threading.Lock()
+
+        probe = self._interpreter_cls(model_content=self._model_content)
+        input_details = probe.get_input_details()[0]
+        self.window_shape = tuple(int(d) for d in input_details['shape_signature'][1:])
+        self.input_dtype = input_details['dtype']
+        self.output_dtype = probe.get_output_details()[0]['dtype']
+
+    def _interpreter_for(self, batch_size):
+        interpreter = self._interpreters.get(batch_size)
+        if interpreter is None:
+            interpreter = self._interpreter_cls(
+                model_content=self._model_content, num_threads=self.num_threads
+            )
+            input_index = interpreter.get_input_details()[0]['index']
+            interpreter.resize_tensor_input(input_index, (batch_size,) + self.window_shape)
+            interpreter.allocate_tensors()
+            self._interpreters[batch_size] = interpreter
+        return interpreter
+
+    def __call__(self, X):
+        with self._lock:
+            interpreter = self._interpreter_for(len(X))
+            input_details = interpreter.get_input_details()[0]
+            output_details = interpreter.get_output_details()[0]
+
+            interpreter.set_tensor(input_details['index'], _quantize(X, input_details))
+            interpreter.invoke()
+            return _dequantize(interpreter.get_tensor(output_details['index']), output_details)
+
+
+def _quantize(X, details):
+    if details['dtype'] == np.float32:
+        return np.asarray(X, dtype=np.float32)
+    scale, zero_point = details['quantization']
+    info = np.iinfo(details['dtype'])
+    return np.clip(np.round(X / scale + zero_point), info.min, info.max).astype(details['dtype'])
+
+
+def _dequantize(y, details):
+    if details['dtype'] == np.float32:
+        return y
+    scale, zero_point = details['quantization']
+    return ((y.astype(np.float32) - zero_point) * scale).astype(np.float32)
@@ -0,0 +1,48 @@
+"""
+extract_features_parallel frente a extract_features_batch con memmaps troceados
+
+Ejecutar desde har-backend/app:  python -m pytest -q tests
+"""
+import numpy as np
+import pytest
+
+from logic.features import _memmap_offset, extract_features_batch, extract_features_parallel
+
+
+SAMPLING_RATE = 20
+
+
+@pytest.fixture
+def windows_file(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(1600, 100, 3)).astype(np.float32)
+    # Ventanas distintas entre sí para que leer filas equivocadas se note
+    X += np.arange(len(X), dtype=np.float32)[:, None, None] / 100
+    path = tmp_path / 'X.npy'
+    np.save(path, X)
+    return path
+
+
+@pytest.mark.parametrize('source', ['memmap_slice', 'memmap', 'memory'])
+def test_parallel_matches_batch(windows_file, source):
+    M = np.load(windows_file, mmap_mode='r')
+    X = {
+        'memmap_slice': M[1000:],
+        'memmap': M,
+        'memory': np.array(M[1000:]),
+    }[source]
+
+    features, names, _ = extract_features_parallel(X, SAMPLING_RATE, n_jobs=2, chunk_windows=250)
+    expected, _ = extract_features_batch(np.asarray(X), SAMPLING_RATE, names)
+
+    np.testing.assert_allclose(features, expected, rtol=1e-5, atol=1e-5)
+
+
+def test_memmap_offset_follows_slices(windows_file):
+    M = np.load(windows_file, mmap_mode='r')
+    row_bytes = M[0].nbytes
+
+    assert _memmap_offset(M) == M.offset
+    assert _memmap_offset(M[1000:]) == M.offset + 1000 * row_bytes
+    # Vistas no contiguas: se copian a memoria compartida
+    assert _memmap_offset(M[::2]) is None
@@ -0,0 +1,31 @@
+"""
+Preparación de DataFrames de sensor: Polars frente a Pandas
+
+Ejecutar desde har-backend/app:  python -m pytest -q tests
+"""
+import pandas as pd
+import polars as pl
+import pytest
+
+from logic.multimodal import prepare_sensor_dataframe, prepare_sensor_dataframe_polars
+
+
+@pytest.mark.parametrize('timestamps', [
+    ['2024-01-01 00:00:01.000', '2024-01-01 00:00:00.000', '2024-01-01 00:00:00.500'],
+    [2_000_000_000, 1_000_000_000, 1_500_000_000],
+])
+def test_polars_timestamps_match_pandas(timestamps):
+    data = {
+        'Subject-id': [1, 1, 1],
+        'Activity Label': ['A', 'A', 'A'],
+        'Timestamp': timestamps,
+        'X': [1.0, 2.0, 3.0],
+        'Y': [1.0, 2.0, 3.0],
+        'Z': [1.0, 2.0, 3.0],
+    }
+
+    expected = prepare_sensor_dataframe(pd.DataFrame(data), 'accel')['Timestamp']
+    result = prepare_sensor_dataframe_polars(pl.DataFrame(data), 'accel')['Timestamp']
+
+    assert result.dtype == pl.Datetime('ns')
+    assert result.cast(pl.Int64).to_list() == expected.astype('int64').tolist()
@@ -0,0 +1,100 @@
+"""
+Sumas prefijas de logic.sliding_stats frente a extract_features_batch
+
+Ejecutar desde har-backend/app:  python -m pytest -q tests
+"""
+import numpy as np
+import polars as pl
+import pytest
+
+from benchmarks.synthetic import generate_accelerometer_streams
+from logic.features import extract_features_batch
+from logic.window_features_multimodal import create_multimodal_windows_with_features
+from logic.sliding_stats import (
+    extract_sliding_stats, grid_window_offsets, resample_to_grid, sliding_feature_names
+)
+
+
+SAMPLING_RATE = 20
+WINDOW_TIMESTEPS = 100  # 5 s a 20 Hz
+
+
+def _group_series(gap_rate):
+    df = generate_accelerometer_streams(minutes=6, users=1, gap_rate=gap_rate, nan_rate=0.0, seed=3)
+    df = df.sort('Timestamp')
+    return df['Timestamp'].cast(pl.Int64).to_numpy(), df.select(['X', 'Y', 'Z']).to_numpy()
+
+
+@pytest.mark.parametrize('gap_rate', [0.0, 0.002])
+@pytest.mark.parametrize('overlap_percent', [50, 75, 90])
+def test_matches_extract_features_batch_on_same_windows(gap_rate, overlap_percent):
+    times_ns, values = _group_series(gap_rate)
+    grid_ns, stream = resample_to_grid(values, times_ns, SAMPLING_RATE)
+
+    step = WINDOW_TIMESTEPS * (100 - overlap_percent) // 100
+    window_start_ns = grid_ns[::step]
+    offsets, valid = grid_window_offsets(grid_ns, window_start_ns, WINDOW_TIMESTEPS)
+    offsets = offsets[valid]
+    assert len(offsets) > 10
+
+    names = sliding_feature_names(3)
+    features, _ = extract_sliding_stats(stream, offsets, WINDOW_TIMESTEPS, names)
+
+    X = np.stack([stream[o:o + WINDOW_TIMESTEPS] for o in offsets])
+    expected, _ = extract_features_batch(X, SAMPLING_RATE, names)
+
+    np.testing.assert_allclose(features, expected, rtol=1e-5, atol=1e-5)
+
+
+def test_grid_is_absolute_and_uniform():
+    times_ns, values = _group_series(0.002)
+    grid_ns, stream = resample_to_grid(values, times_ns, SAMPLING_RATE, origin_ns=0)
+
+    period_ns = int(1e9 / SAMPLING_RATE)
+    assert np.all(grid_ns % period_ns == 0)
+    assert np.all(np.diff(grid_ns) == period_ns)
+    assert grid_ns[0] >= times_ns[0] and grid_ns[-1] <= times_ns[-1]
+    assert stream.shape == (len(grid_ns), 3)
+
+
+def test_windows_outside_the_stream_are_rejected():
+    stream = np.zeros((150, 3))
+    with pytest.raises(IndexError):
+        extract_sliding_stats(stream, np.array([0, 60]), WINDOW_TIMESTEPS)
+
+
+@pytest.mark.parametrize('overlap_percent', [75, 90])
+def test_stats_mode_grid_adds_grid_columns_to_metadata(overlap_percent):
+    df = generate_accelerometer_streams(minutes=3, users=2, gap_rate=0.002, nan_rate=0.0, seed=5)
+    X, y, subjects, metadata = create_multimodal_windows_with_features(
+        df, window_seconds=5, overlap_percent=overlap_percent, sampling_rate=SAMPLING_RATE,
+        target_timesteps=WINDOW_TIMESTEPS, extract_features=False, stats_mode='grid'
+    )
+
+    names = sliding_feature_names(3)
+    grid = metadata[[f'grid_{name}' for name in names]].to_numpy()
+    assert len(grid) == len(X) and not np.isnan(grid).all()
+
+    # Referencia independiente: cada ventana interpolada en los instantes k / fs de la rejilla
+    period_ns = 10**9 // SAMPLING_RATE
+    data = df.sort('Timestamp')
+    for row in np.flatnonzero(~np.isnan(grid[:, 0]))[::7]:
+        group = data.filter(
+            (pl.col('Subject-id') == metadata['Subject-id'].iloc[row])
+            & (pl.col('Activity Label') == metadata['Activity Label'].iloc[row])
+        )
+        times_ns = group['Timestamp'].cast(pl.Int64).to_numpy()
+        start_ns = metadata['window_start'].iloc[row].value
+        first = -(-start_ns // period_ns) * period_ns
+        grid_t = (first + period_ns * np.arange(WINDOW_TIMESTEPS) - times_ns[0]).astype(np.float64)
+        t = (times_ns - times_ns[0]).astype(np.float64)
+        window = np.column_stack([np.interp(grid_t, t, group[c].to_numpy()) for c in ('X', 'Y', 'Z')])
+
+        expected, _ = extract_features_batch(window[None], SAMPLING_RATE, names)
+        np.testing.assert_allclose(grid[row], expected[0], rtol=1e-4, atol=1e-4)
+
+
+def test_stats_mode_rejects_unknown_modes():
+    df = generate_accelerometer_streams(minutes=1, users=1, seed=0)
+    with pytest.raises(ValueError):
+        create_multimodal_windows_with_features(df, stats_mode='window')
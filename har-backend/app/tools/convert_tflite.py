@@ -0,0 +1,235 @@
+"""
+Conversión del SavedModel a TFLite e informe de precisión y latencia
+
+Genera tres variantes del modelo (float32, rango dinámico e int8 completo
+calibrado con ventanas reales) y las compara con el SavedModel sobre
+ventanas reservadas: concordancia de la clase predicha, diferencia máxima de
+probabilidad, accuracy frente a las etiquetas y latencia por bucket.
+
+Uso (desde har-backend/app):
+    python -m tools.convert_tflite --model-dir models/model_with_stand_in_others --data datos.parquet
+    python -m tools.convert_tflite --model-dir models/model_with_stand_in_others --synthetic-minutes 30
+
+`--data` es un CSV/Parquet con las columnas del entrenamiento (Subject-id,
+Timestamp, Activity Label, X, Y, Z). Sin él se usan streams sintéticos: sirven
+para calibrar y medir latencia, pero su accuracy no es representativa.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import polars as pl
+
+from benchmarks.synthetic import generate_accelerometer_streams
+from logic.multimodal import create_multimodal_windows_robust
+from services.inference_runner import (
+    BucketedInferenceRunner, DEFAULT_BUCKETS, saved_model_predict, window_shape_from_signature
+)
+from services.model_registry import window_params_from_summary
+from services.tflite_backend import TFLitePredictor
+
+
+VARIANTS = ('float32', 'dynamic_range', 'int8')
+
+
+def _subject_key(subject):
+    """Mismo formato para '1619', 1619 y 1619.0 (run_summary guarda floats)"""
+    try:
+        return str(int(float(subject)))
+    except (TypeError, ValueError):
+        return str(subject)
+
+
+def load_windows(args, window_params):
+    """Ventanas, etiquetas y sujetos de --data o de streams sintéticos"""
+    if args.data:
+        if args.data.endswith('.parquet'):
+            df = pl.read_parquet(args.data)
+        else:
+            df = pl.read_csv(args.data, try_parse_dates=True)
+    else:
+        df = generate_accelerometer_streams(
+            minutes=args.synthetic_minutes, users=args.synthetic_users, seed=args.seed
+        )
+
+    X, labels, subjects, _ = create_multimodal_windows_robust(df, **window_params, engine='polars')
+    return X, np.asarray(labels), np.asarray(subjects)
+
+
+def split_windows(subjects, held_out_users, calibration_windows, seed):
+    """
+    Índices de calibración y de evaluación, separados por sujeto
+
+    Se reservan los usuarios de validación del entrenamiento si están en los
+    datos; si no, el último 20% de los sujetos. La calibración sale del resto.
+    """
+    keys = np.array([_subject_key(s) for s in subjects])
+    held_out = {_subject_key(u) for u in held_out_users}
+    held_out_mask = np.isin(keys, list(held_out))
+
+    if not held_out_mask.any():
+        unique = np.unique(keys)
+        n_held_out = max(1, len(unique) // 5) if len(unique) > 1 else 0
+        held_out_mask = np.isin(keys, unique[len(unique) - n_held_out:])
+    if held_out_mask.all():
+        held_out_mask[:] = False
+
+    rng = np.random.default_rng(seed)
+    train_idx = np.flatnonzero(~held_out_mask)
+    calibration_idx = rng.choice(train_idx, min(calibration_windows, len(train_idx)), replace=False)
+    eval_idx = np.flatnonzero(held_out_mask) if held_out_mask.any() else train_idx
+    return np.sort(calibration_idx), eval_idx
+
+
+def convert(saved_model_dir, variant, calibration):
+    """Bytes del modelo TFLite de la variante pedida"""
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_saved_model(saved_model_dir)
+    if variant in ('dynamic_range', 'int8'):
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if variant == 'int8':
+        def representative_dataset():
+            for window in calibration:
+                yield [window[None].astype(np.float32)]
+
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+    return converter.convert()
+
+
+def evaluate(predict, window_shape, X, buckets):
+    """Probabilidades sobre X con el mismo runner por buckets que el servicio"""
+    runner = BucketedInferenceRunner(predict, window_shape, buckets=buckets)
+    runner.warmup()
+    start = time.perf_counter()
+    probabilities = runner.predict(X)
+    seconds = time.perf_counter() - start
+    return probabilities, seconds, runner.stats()['buckets']
+
+
+def compare(reference, candidate, labels, label_encoder):
+    """Concordancia con el SavedModel, diferencia de probabilidades y accuracy"""
+    reference_classes = reference.argmax(axis=1)
+    candidate_classes = candidate.argmax(axis=1)
+
+    result = {
+        'agreement_with_savedmodel': float(np.mean(reference_classes == candidate_classes)),
+        'max_abs_probability_diff': float(np.max(np.abs(reference - candidate))),
+        'accuracy': None,
+    }
+
+    known = np.isin(labels, label_encoder.classes_)
+    if known.any():
+        predicted = label_encoder.inverse_transform(candidate_classes[known])
+        result['accuracy'] = float(np.mean(predicted == labels[known]))
+    return result
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Convierte el SavedModel a TFLite y compara las variantes")
+    parser.add_argument('--model-dir', default='models/model_with_stand_in_others',
+                        help="Directorio con saved_model/, label_encoder.joblib y run_summary.json")
+    parser.add_argument('--output-dir', help="Destino de los .tflite y el informe (por defecto <model-dir>/tflite)")
+    parser.add_argument('--data', help="CSV/Parquet con datos etiquetados para calibrar y evaluar")
+    parser.add_argument('--synthetic-minutes', type=float, default=30)
+    parser.add_argument('--synthetic-users', type=int, default=6)
+    parser.add_argument('--calibration-windows', type=int, default=500,
+                        help="Ventanas del conjunto representativo para int8")
+    parser.add_argument('--variants', default=','.join(VARIANTS))
+    parser.add_argument('--buckets', default=','.join(map(str, DEFAULT_BUCKETS)))
+    parser.add_argument('--num-threads', type=int, help="Hilos del intérprete TFLite")
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    output_dir = args.output_dir or os.path.join(args.model_dir, 'tflite')
+    os.makedirs(output_dir, exist_ok=True)
+    buckets = [int(b) for b in args.buckets.split(',')]
+
+    with open(os.path.join(args.model_dir, 'run_summary.json')) as f:
+        summary = json.load(f)
+    window_params = window_params_from_summary(summary)
+    label_encoder = joblib.load(os.path.join(args.model_dir, 'label_encoder.joblib'))
+
+    print("🪟 Generando ventanas...")
+    X, labels, subjects = load_windows(args, window_params)
+    calibration_idx, eval_idx = split_windows(
+        subjects, summary.get('val_users', []), args.calibration_windows, args.seed
+    )
+    print(f"  {len(X)} ventanas: {len(calibration_idx)} de calibración, {len(eval_idx)} de evaluación")
+    X_eval, labels_eval = X[eval_idx], labels[eval_idx]
+
+    import tensorflow as tf
+    saved_model_dir = os.path.join(args.model_dir, 'saved_model')
+    infer = tf.saved_model.load(saved_model_dir).signatures['serving_default']
+    window_shape = window_shape_from_signature(infer)
+
+    reference, seconds, latency = evaluate(saved_model_predict(infer), window_shape, X_eval, buckets)
+    report = {
+        'model_dir': args.model_dir,
+        'data': args.data or 'synthetic',
+        'windows_evaluated': int(len(eval_idx)),
+        'calibration_windows': int(len(calibration_idx)),
+        'variants': {
+            'savedmodel': {
+                'size_bytes': sum(
+                    os.path.getsize(os.path.join(root, name))
+                    for root, _, names in os.walk(saved_model_dir) for name in names
+                ),
+                'windows_per_second': len(X_eval) / seconds,
+                'latency_by_bucket': latency,
+                **compare(reference, reference, labels_eval, label_encoder),
+            }
+        },
+    }
+
+    for variant in args.variants.split(','):
+        print(f"🔄 Convirtiendo variante {variant}...")
+        try:
+            model_bytes = convert(saved_model_dir, variant, X[calibration_idx])
+        except Exception as e:
+            print(f"  ❌ Conversión fallida: {e}")
+            report['variants'][variant] = {'error': str(e)}
+            continue
+
+        path = os.path.join(output_dir, f'model_{variant}.tflite')
+        with open(path, 'wb') as f:
+            f.write(model_bytes)
+
+        predictor = TFLitePredictor(path, num_threads=args.num_threads)
+        probabilities, seconds, latency = evaluate(predictor, predictor.window_shape, X_eval, buckets)
+        report['variants'][variant] = {
+            'path': path,
+            'size_bytes': len(model_bytes),
+            'windows_per_second': len(X_eval) / seconds,
+            'latency_by_bucket': latency,
+            **compare(reference, probabilities, labels_eval, label_encoder),
+        }
+
+    print(f"\n{'variante':<14} {'tamaño (KB)':>11} {'ventanas/s':>11} {'concordancia':>12} {'accuracy':>9}")
+    for variant, entry in report['variants'].items():
+        if 'error' in entry:
+            print(f"{variant:<14} {'error':>11}")
+            continue
+        accuracy = f"{entry['accuracy']:.4f}" if entry['accuracy'] is not None else '-'
+        print(f"{variant:<14} {entry['size_bytes'] / 1024:>11.1f} {entry['windows_per_second']:>11,.0f} "
+              f"{entry['agreement_with_savedmodel']:>12.4f} {accuracy:>9}")
+
+    report_path = os.path.join(output_dir, 'report.json')
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Informe guardado en {report_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())